@@ -0,0 +1,138 @@
+import logging
+import threading
+
+import apsw
+
+from counterpartycore.lib import config
+from counterpartycore.lib.utils import database, helpers
+
+logger = logging.getLogger(config.LOGGER_NAME)
+
+# part of the cache freed when the maximum size is reached
+EVICTION_RATIO = 0.1
+
+DATABASE_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS responses (
+        cache_key TEXT PRIMARY KEY,
+        block_index INTEGER,
+        size INTEGER,
+        response BLOB
+    )""",
+    "CREATE TABLE IF NOT EXISTS cache_state (name TEXT PRIMARY KEY, value INTEGER)",
+)
+
+
+class APIResponseCache(metaclass=helpers.SingletonMeta):
+    """
+    Serialized API responses shared by all the API workers.
+    Entries are keyed by block index and the whole cache is invalidated
+    when the last parsed block changes. Entries without block index
+    (e.g. `/v2/blocks/<block_index>`) are only removed by the size-based eviction.
+    """
+
+    def __init__(self, database_file=None, max_size=None):
+        self.database_file = database_file or config.API_CACHE_DATABASE
+        self.max_size = max_size or config.API_CACHE_MAX_SIZE
+        self.lock = threading.Lock()
+        self.database = database.SideDatabase(self.database_file, DATABASE_SCHEMA)
+        # last block index seen by this process
+        self.block_index = None
+
+    def connection(self):
+        if not self.database.is_connected():
+            # the block index seen by the parent process is not the one of the database
+            self.block_index = None
+        return self.database.connection()
+
+    def invalidate(self, db, block_index):
+        # only the first worker to see a new block index purges the cache
+        if block_index is None or block_index == self.block_index:
+            return
+        with db:
+            row = db.execute("SELECT value FROM cache_state WHERE name = 'block_index'").fetchone()
+            if row is None or row[0] != block_index:
+                logger.trace("Invalidating API cache for block %s", block_index)
+                db.execute("DELETE FROM responses WHERE block_index IS NOT NULL")
+                db.execute(
+                    "INSERT OR REPLACE INTO cache_state (name, value) VALUES ('block_index', ?)",
+                    (block_index,),
+                )
+                # only the entries without block index are left
+                self.set_size(db, self.compute_size(db))
+        self.block_index = block_index
+
+    def compute_size(self, db):
+        return int(db.execute("SELECT total(size) FROM responses").fetchone()[0])
+
+    def get_size(self, db):
+        # the total size is kept in `cache_state` to not sum the whole table on each `set()`
+        row = db.execute("SELECT value FROM cache_state WHERE name = 'size'").fetchone()
+        if row is None:
+            return self.compute_size(db)
+        return row[0]
+
+    def set_size(self, db, size):
+        db.execute("INSERT OR REPLACE INTO cache_state (name, value) VALUES ('size', ?)", (size,))
+
+    def evict(self, db, size):
+        to_free = size - self.max_size * (1 - EVICTION_RATIO)
+        last_rowid = None
+        for rowid, entry_size in db.execute("SELECT rowid, size FROM responses ORDER BY rowid"):
+            last_rowid = rowid
+            to_free -= entry_size
+            size -= entry_size
+            if to_free <= 0:
+                break
+        if last_rowid is not None:
+            db.execute("DELETE FROM responses WHERE rowid <= ?", (last_rowid,))
+        return size
+
+    def get(self, cache_key, block_index):
+        try:
+            with self.lock:
+                db = self.connection()
+                self.invalidate(db, block_index)
+                row = db.execute(
+                    "SELECT response FROM responses WHERE cache_key = ? AND block_index IS ?",
+                    (cache_key, block_index),
+                ).fetchone()
+        except apsw.Error as e:
+            logger.debug("Error reading API cache: %s", e)
+            return None
+        if row is None:
+            return None
+        return row[0]
+
+    def set(self, cache_key, block_index, response):
+        try:
+            with self.lock:
+                db = self.connection()
+                self.invalidate(db, block_index)
+                with db:
+                    size = self.get_size(db) + len(response)
+                    replaced = db.execute(
+                        "SELECT size FROM responses WHERE cache_key = ?", (cache_key,)
+                    ).fetchone()
+                    if replaced is not None:
+                        size -= replaced[0]
+                    db.execute(
+                        "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?)",
+                        (cache_key, block_index, len(response), response),
+                    )
+                    if size > self.max_size:
+                        size = self.evict(db, size)
+                    self.set_size(db, size)
+        except apsw.Error as e:
+            logger.debug("Error writing API cache: %s", e)
+
+    def clear(self):
+        with self.lock:
+            db = self.connection()
+            with db:
+                db.execute("DELETE FROM responses")
+                db.execute("DELETE FROM cache_state")
+            self.block_index = None
+
+    def close(self):
+        with self.lock:
+            self.database.close()
@@ -0,0 +1,251 @@
+import logging
+import threading
+import time
+
+import apsw
+
+from counterpartycore.lib import config
+from counterpartycore.lib.utils import database, helpers
+
+logger = logging.getLogger(config.LOGGER_NAME)
+
+# upper bounds of the latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# metrics are kept in memory by each worker and added to the shared database every FLUSH_INTERVAL
+FLUSH_INTERVAL = 10
+
+DATABASE_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS routes_metrics (
+        route TEXT PRIMARY KEY,
+        count INTEGER,
+        duration REAL,
+        bytes INTEGER,
+        errors INTEGER
+    )""",
+    """CREATE TABLE IF NOT EXISTS routes_latency_buckets (
+        route TEXT,
+        bucket INTEGER,
+        count INTEGER,
+        PRIMARY KEY (route, bucket)
+    )""",
+    "CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER)",
+)
+
+
+class APIMetrics(metaclass=helpers.SingletonMeta):
+    """
+    Per-route request latencies, response sizes and errors, aggregated across
+    the API workers in a side database. Each worker buffers its observations
+    and adds them to the database at most every `FLUSH_INTERVAL` seconds.
+    """
+
+    def __init__(self, database_file=None):
+        self.database_file = database_file or config.API_METRICS_DATABASE
+        self.lock = threading.Lock()
+        self.database = database.SideDatabase(self.database_file, DATABASE_SCHEMA)
+        self.pending = {}
+        self.pending_counters = {}
+        self.last_flush = time.monotonic()
+
+    def connection(self):
+        return self.database.connection()
+
+    def observe(self, route, duration, size, http_code):
+        if self.database_file is None:
+            return
+        bucket = len(LATENCY_BUCKETS)
+        for index, upper_bound in enumerate(LATENCY_BUCKETS):
+            if duration <= upper_bound:
+                bucket = index
+                break
+        with self.lock:
+            metrics = self.pending.get(route)
+            if metrics is None:
+                metrics = self.pending[route] = {
+                    "count": 0,
+                    "duration": 0,
+                    "bytes": 0,
+                    "errors": 0,
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                }
+            metrics["count"] += 1
+            metrics["duration"] += duration
+            metrics["bytes"] += size
+            metrics["errors"] += 1 if http_code >= 500 else 0
+            metrics["buckets"][bucket] += 1
+        if time.monotonic() - self.last_flush >= FLUSH_INTERVAL:
+            self.flush()
+
+    def increment(self, counter, value=1):
+        if self.database_file is None:
+            return
+        with self.lock:
+            self.pending_counters[counter] = self.pending_counters.get(counter, 0) + value
+
+    def flush(self):
+        try:
+            with self.lock:
+                self.last_flush = time.monotonic()
+                db = self.connection()
+                pending, self.pending = self.pending, {}
+                counters, self.pending_counters = self.pending_counters, {}
+                with db:
+                    for route, metrics in pending.items():
+                        db.execute(
+                            """INSERT INTO routes_metrics VALUES (?, ?, ?, ?, ?)
+                               ON CONFLICT (route) DO UPDATE SET
+                                   count = count + excluded.count,
+                                   duration = duration + excluded.duration,
+                                   bytes = bytes + excluded.bytes,
+                                   errors = errors + excluded.errors""",
+                            (
+                                route,
+                                metrics["count"],
+                                metrics["duration"],
+                                metrics["bytes"],
+                                metrics["errors"],
+                            ),
+                        )
+                        for bucket, count in enumerate(metrics["buckets"]):
+                            if count == 0:
+                                continue
+                            db.execute(
+                                """INSERT INTO routes_latency_buckets VALUES (?, ?, ?)
+                                   ON CONFLICT (route, bucket) DO UPDATE SET
+                                       count = count + excluded.count""",
+                                (route, bucket, count),
+                            )
+                    for name, value in counters.items():
+                        db.execute(
+                            """INSERT INTO counters VALUES (?, ?)
+                               ON CONFLICT (name) DO UPDATE SET value = value + excluded.value""",
+                            (name, value),
+                        )
+        except apsw.Error as e:
+            logger.debug("Error saving API metrics: %s", e)
+
+    def get_metrics(self):
+        if self.database_file is None:
+            return {}, {}
+        self.flush()
+        with self.lock:
+            db = self.connection()
+            routes = {
+                row[0]: {
+                    "count": row[1],
+                    "duration": row[2],
+                    "bytes": row[3],
+                    "errors": row[4],
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                }
+                for row in db.execute("SELECT * FROM routes_metrics ORDER BY route")
+            }
+            for route, bucket, count in db.execute("SELECT * FROM routes_latency_buckets"):
+                if route in routes:
+                    routes[route]["buckets"][bucket] = count
+            counters = dict(db.execute("SELECT name, value FROM counters ORDER BY name"))
+        return routes, counters
+
+    def close(self):
+        with self.lock:
+            self.database.close()
+
+
+def quantile(buckets, q):
+    """Estimate a quantile from the histogram buckets, like Prometheus' `histogram_quantile()`."""
+    total = sum(buckets)
+    if total == 0:
+        return None
+    rank = q * total
+    cumulative = 0
+    for index, count in enumerate(buckets):
+        if cumulative + count >= rank and count > 0:
+            if index == len(LATENCY_BUCKETS):
+                # the last bucket has no upper bound
+                return LATENCY_BUCKETS[-1]
+            lower_bound = LATENCY_BUCKETS[index - 1] if index > 0 else 0
+            upper_bound = LATENCY_BUCKETS[index]
+            return lower_bound + (upper_bound - lower_bound) * (rank - cumulative) / count
+        cumulative += count
+    return LATENCY_BUCKETS[-1]
+
+
+def check_slow_query(db, query, bindings, duration):
+    """Log the query with its query plan if it took more than `config.API_SLOW_QUERY_THRESHOLD`."""
+    if not config.API_SLOW_QUERY_THRESHOLD or duration * 1000 < config.API_SLOW_QUERY_THRESHOLD:
+        return
+    APIMetrics().increment("slow_queries")
+    try:
+        plan = db.execute(f"EXPLAIN QUERY PLAN {query}", bindings).fetchall()
+        plan = "\n".join(f"  {row['id']} {row['parent']} {row['detail']}" for row in plan)
+    except apsw.Error as e:
+        plan = f"  unavailable ({e})"
+    logger.warning(
+        "Slow query (%dms): %s %s\nQuery plan:\n%s",
+        duration * 1000,
+        " ".join(query.split()),
+        bindings,
+        plan,
+    )
+
+
+def get_api_stats():
+    """
+    Returns the request count, latency percentiles, response sizes and errors of each API route, and the counters (slow queries, compose cache hits and misses), for all the API workers.
+    """
+    routes, counters = APIMetrics().get_metrics()
+    return {
+        "routes": {
+            route: {
+                "count": metrics["count"],
+                "p50": quantile(metrics["buckets"], 0.5),
+                "p95": quantile(metrics["buckets"], 0.95),
+                "p99": quantile(metrics["buckets"], 0.99),
+                "average": metrics["duration"] / metrics["count"] if metrics["count"] else None,
+                "bytes": metrics["bytes"],
+                "errors": metrics["errors"],
+            }
+            for route, metrics in routes.items()
+        },
+        "counters": counters,
+    }
+
+
+def prometheus_metrics():
+    routes, counters = APIMetrics().get_metrics()
+    lines = [
+        "# HELP counterparty_api_request_duration_seconds API request latency by route.",
+        "# TYPE counterparty_api_request_duration_seconds histogram",
+    ]
+    for route, metrics in routes.items():
+        cumulative = 0
+        for index, count in enumerate(metrics["buckets"]):
+            cumulative += count
+            upper_bound = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else "+Inf"
+            lines.append(
+                f'counterparty_api_request_duration_seconds_bucket{{route="{route}",le="{upper_bound}"}} {cumulative}'
+            )
+        lines.append(
+            f'counterparty_api_request_duration_seconds_sum{{route="{route}"}} {metrics["duration"]}'
+        )
+        lines.append(
+            f'counterparty_api_request_duration_seconds_count{{route="{route}"}} {metrics["count"]}'
+        )
+    lines += [
+        "# HELP counterparty_api_response_bytes_total Bytes sent by route.",
+        "# TYPE counterparty_api_response_bytes_total counter",
+    ]
+    for route, metrics in routes.items():
+        lines.append(f'counterparty_api_response_bytes_total{{route="{route}"}} {metrics["bytes"]}')
+    lines += [
+        "# HELP counterparty_api_errors_total Responses with a 5xx status by route.",
+        "# TYPE counterparty_api_errors_total counter",
+    ]
+    for route, metrics in routes.items():
+        lines.append(f'counterparty_api_errors_total{{route="{route}"}} {metrics["errors"]}')
+    for name, value in counters.items():
+        lines += [
+            f"# TYPE counterparty_api_{name}_total counter",
+            f"counterparty_api_{name}_total {value}",
+        ]
+    return "\n".join(lines) + "\n"
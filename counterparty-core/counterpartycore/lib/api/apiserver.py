@@ -1,4 +1,5 @@
 import argparse
+import ctypes
 import logging
 import multiprocessing
 import os
@@ -6,7 +7,6 @@ import signal
 import sys
 import threading
 import time
-from collections import OrderedDict
 from multiprocessing import Process, Value
 
 import flask
@@ -19,7 +19,17 @@ from sentry_sdk import configure_scope as configure_sentry_scope
 from sentry_sdk import start_span as start_sentry_span
 
 from counterpartycore.lib import config, exceptions
-from counterpartycore.lib.api import apiwatcher, dbbuilder, healthz, queries, verbose, wsgi
+from counterpartycore.lib.api import (
+    apimetrics,
+    apiwatcher,
+    dbbuilder,
+    healthz,
+    queries,
+    verbose,
+    wsgi,
+)
+from counterpartycore.lib.api.apicache import APIResponseCache
+from counterpartycore.lib.api.apimetrics import APIMetrics
 from counterpartycore.lib.api.routes import ROUTES, function_needs_db
 from counterpartycore.lib.cli.initialise import initialise_log_and_config
 from counterpartycore.lib.cli.log import init_api_access_log
@@ -34,10 +44,6 @@ multiprocessing.set_start_method("spawn", force=True)
 logger = logging.getLogger(config.LOGGER_NAME)
 auth = HTTPBasicAuth()
 
-
-BLOCK_CACHE = OrderedDict()
-MAX_BLOCK_CACHE_SIZE = 1000
-
 CURR_DIR = os.path.dirname(os.path.realpath(__file__))
 BLUEPRINT_FILEPATH = os.path.join(CURR_DIR, "..", "..", "..", "..", "apiary.apib")
 
@@ -88,13 +94,17 @@ def api_root():
 
 
 def is_cachable(rule, route=None, result=None):
+    if result is None:
+        return False
+    return is_cachable_request(rule, route)
+
+
+def is_cachable_request(rule, route=None):
     if config.DISABLE_API_CACHE or request.method == "POST":
         return False
-    for no_cachable in ["/compose/", "/mempool/", "healthz"]:
+    for no_cachable in ["/compose/", "/mempool/", "healthz", "/debug/"]:
         if no_cachable in rule:
             return False
-    if result is None:
-        return False
     if route and route["function"].__name__ == "redirect_to_api_v1":
         return False
     if request.path.startswith("/v2/mempool/"):
@@ -143,6 +153,7 @@ def return_result(
     result_count=None,
     start_time=None,
     query_args=None,
+    cache_key=None,
 ):
     assert result is None or error is None
     api_result = {}
@@ -153,7 +164,16 @@ def return_result(
             api_result["result_count"] = result_count
     if error is not None:
         api_result["error"] = error
-    response = flask.make_response(helpers.to_json(api_result), http_code)
+    body = helpers.to_json(api_result).encode("utf-8")
+    if cache_key is not None:
+        with start_sentry_span(op="cache.put") as sentry_put_span:
+            sentry_put_span.set_data("cache.key", cache_key[0])
+            APIResponseCache().set(cache_key[0], cache_key[1], body)
+    return make_response(http_code, body, error, start_time, query_args)
+
+
+def make_response(http_code, body, error=None, start_time=None, query_args=None):
+    response = flask.make_response(body, http_code)
     response.headers["X-COUNTERPARTY-HEIGHT"] = CurrentState().current_block_index()
     response.headers["X-COUNTERPARTY-READY"] = is_server_ready()
     response.headers["X-COUNTERPARTY-VERSION"] = config.VERSION_STRING
@@ -175,6 +195,11 @@ def return_result(
 
     logger.debug(message)
 
+    if start_time and request.url_rule is not None:
+        APIMetrics().observe(
+            str(request.url_rule.rule), time.time() - start_time, len(body), http_code
+        )
+
     return response
 
 
@@ -183,7 +208,7 @@ def prepare_args(route, **kwargs):
     # inject args from request.args
     for arg in route["args"]:
         arg_name = arg["name"]
-        if arg_name in ["verbose"] and "compose" not in route["function"].__name__:
+        if arg_name in ["verbose", "count"] and "compose" not in route["function"].__name__:
             continue
         if arg_name in function_args:
             continue
@@ -231,45 +256,67 @@ def prepare_args(route, **kwargs):
     return function_args
 
 
-def execute_api_function(rule, route, function_args):
-    # cache everything for one block
-    with StateDBConnectionPool().connection() as state_db:
-        current_block_index = apiwatcher.get_last_block_parsed(state_db)
-    cache_key = f"{current_block_index}:{request.url}"
-    # except for blocks
+def get_cache_key(rule, route):
+    if not is_cachable_request(rule, route):
+        return None
+    # cache everything for one block except for blocks
     if request.path.startswith("/v2/blocks/") and not request.path.startswith("/v2/blocks/last"):
-        cache_key = request.url
+        return request.url, None
+    current_block_index = CurrentState().last_block_parsed()
+    if not current_block_index:
+        # last parsed block not published by the API Watcher
+        with StateDBConnectionPool().connection() as state_db:
+            current_block_index = apiwatcher.get_last_block_parsed(state_db)
+    return request.url, current_block_index
+
 
+def get_cached_response(cache_key):
+    if cache_key is None:
+        return None
     with start_sentry_span(op="cache.get") as sentry_get_span:
-        sentry_get_span.set_data("cache.key", cache_key)
-        if cache_key in BLOCK_CACHE:
-            result = BLOCK_CACHE[cache_key]
-            sentry_get_span.set_data("cache.hit", True)
-            return result
-        sentry_get_span.set_data("cache.hit", False)
-
-    with start_sentry_span(op="cache.put") as sentry_put_span:
-        needed_db = function_needs_db(route["function"])
-        if needed_db == "ledger_db":
-            with LedgerDBConnectionPool().connection() as ledger_db:
-                result = route["function"](ledger_db, **function_args)
-        elif needed_db == "state_db":
+        sentry_get_span.set_data("cache.key", cache_key[0])
+        response = APIResponseCache().get(*cache_key)
+        sentry_get_span.set_data("cache.hit", response is not None)
+        return response
+
+
+def get_result_count_mode():
+    count_mode = request.args.get("count", "true").lower()
+    if count_mode in ["true", "1"]:
+        return "true"
+    if count_mode in ["false", "0"]:
+        return "false"
+    if count_mode == "estimate":
+        return "estimate"
+    raise ValueError(f"Invalid count: {count_mode}")
+
+
+def call_api_function(route, function_args):
+    needed_db = function_needs_db(route["function"])
+    if needed_db == "ledger_db":
+        with LedgerDBConnectionPool().connection() as ledger_db:
+            return route["function"](ledger_db, **function_args)
+    if needed_db == "state_db":
+        with StateDBConnectionPool().connection() as state_db:
+            return route["function"](state_db, **function_args)
+    if needed_db == "ledger_db state_db":
+        with LedgerDBConnectionPool().connection() as ledger_db:
             with StateDBConnectionPool().connection() as state_db:
-                result = route["function"](state_db, **function_args)
-        elif needed_db == "ledger_db state_db":
-            with LedgerDBConnectionPool().connection() as ledger_db:
-                with StateDBConnectionPool().connection() as state_db:
-                    result = route["function"](ledger_db, state_db, **function_args)
-        else:
-            result = route["function"](**function_args)
-        # don't cache API v1 and mempool queries
-        if is_cachable(rule, route, result):
-            sentry_put_span.set_data("cache.key", cache_key)
-            BLOCK_CACHE[cache_key] = result
-            if len(BLOCK_CACHE) > MAX_BLOCK_CACHE_SIZE:
-                BLOCK_CACHE.popitem(last=False)
+                return route["function"](ledger_db, state_db, **function_args)
+    return route["function"](**function_args)
+
 
-        return result
+def execute_api_function(route, function_args):
+    # `result_count` is memoized for one block
+    count_mode_token = queries.RESULT_COUNT_MODE.set(get_result_count_mode())
+    block_index_token = queries.RESULT_COUNT_BLOCK_INDEX.set(
+        CurrentState().last_block_parsed() or None
+    )
+    try:
+        return call_api_function(route, function_args)
+    finally:
+        queries.RESULT_COUNT_BLOCK_INDEX.reset(block_index_token)
+        queries.RESULT_COUNT_MODE.reset(count_mode_token)
 
 
 def get_transaction_name(rule):
@@ -337,9 +384,15 @@ def handle_route(**kwargs):
 
         logger.trace(f"API Request - Arguments: {function_args}")
 
+        # serialized responses are shared by all the workers for one block
+        cache_key = get_cache_key(rule, route)
+        cached_response = get_cached_response(cache_key)
+        if cached_response is not None:
+            return make_response(200, cached_response, start_time=start_time, query_args=query_args)
+
         # call the function
         try:
-            result = execute_api_function(rule, route, function_args)
+            result = execute_api_function(route, function_args)
         except (
             exceptions.JSONRPCInvalidRequest,
             flask.wrappers.BadRequest,
@@ -373,10 +426,17 @@ def handle_route(**kwargs):
             message += f" - Response {result.status_code}"
             message += f" - {int((time.time() - start_time) * 1000)}ms"
             logger.debug(message)
+            APIMetrics().observe(
+                rule, time.time() - start_time, len(result.content), result.status_code
+            )
             headers = dict(result.headers)
             del headers["Connection"]  # remove "hop-by-hop" headers
             return result.content, result.status_code, headers
 
+        # don't cache API v1 and mempool queries
+        if cache_key is not None and not is_cachable(rule, route, result):
+            cache_key = None
+
         # clean up and return the result
         if result is None:
             return return_result(
@@ -408,6 +468,7 @@ def handle_route(**kwargs):
             result_count=result_count,
             start_time=start_time,
             query_args=query_args,
+            cache_key=cache_key,
         )
     except Exception as e:  # pylint: disable=broad-except
         # import traceback
@@ -425,6 +486,10 @@ def handle_doc():
     return flask.send_file(BLUEPRINT_FILEPATH)
 
 
+def handle_metrics():
+    return flask.Response(apimetrics.prometheus_metrics(), mimetype="text/plain; version=0.0.4")
+
+
 def handle_options():
     response = flask.Response("", 204)
     set_cors_headers(response)
@@ -457,6 +522,13 @@ def init_flask_app():
             strict_slashes=False,
             provide_automatic_options=False,
         )
+        app.add_url_rule(
+            "/v2/metrics",
+            view_func=handle_metrics,
+            methods=methods,
+            strict_slashes=False,
+            provide_automatic_options=False,
+        )
         app.add_url_rule(
             "/rate-limited",
             view_func=healthz.rate_limited,
@@ -530,7 +602,13 @@ class ConnectionPoolMonitor(threading.Thread):
 
 
 def run_apiserver(
-    args, server_ready_value, stop_event, shared_backend_height, parent_pid, log_stream
+    args,
+    server_ready_value,
+    stop_event,
+    shared_backend_height,
+    parent_pid,
+    log_stream,
+    ledger_updated_event=None,
 ):
     logger.info("Starting API Server process...")
 
@@ -580,7 +658,15 @@ def run_apiserver(
         )
         check_database_version(state_db)
 
-        watcher = apiwatcher.APIWatcher(state_db)
+        watcher = apiwatcher.APIWatcher(state_db, ledger_updated_event=ledger_updated_event)
+
+        # last parsed block shared with the API workers (forked after this point)
+        shared_last_block_parsed = Value(ctypes.c_ulong, 0)
+        CurrentState().set_last_block_parsed_value(shared_last_block_parsed)
+        CurrentState().set_last_block_parsed(apiwatcher.get_last_block_parsed(state_db))
+        if not config.DISABLE_API_CACHE:
+            APIResponseCache().clear()
+
         watcher.start()
 
         app = init_flask_app()
@@ -616,6 +702,8 @@ def run_apiserver(
         logger.trace("Closing Ledger DB and State DB Connection Pool...")
         LedgerDBConnectionPool().close()
         StateDBConnectionPool().close()
+        APIResponseCache().close()
+        APIMetrics().close()
 
         if watcher is not None:
             watcher.stop()
@@ -652,11 +740,12 @@ class ParentProcessChecker(threading.Thread):
 
 
 class APIServer:
-    def __init__(self, stop_event, shared_backend_height):
+    def __init__(self, stop_event, shared_backend_height, ledger_updated_event=None):
         self.process = None
         self.server_ready_value = Value("I", 0)
         self.stop_event = stop_event
         self.shared_backend_height = shared_backend_height
+        self.ledger_updated_event = ledger_updated_event
 
     def start(self, args, log_stream):
         if self.process is not None:
@@ -671,6 +760,7 @@ class APIServer:
                 self.shared_backend_height,
                 os.getpid(),
                 log_stream,
+                self.ledger_updated_event,
             ),
         )
         try:
@@ -5,6 +5,7 @@ import time
 
 from counterpartycore.lib import config, exceptions
 from counterpartycore.lib.api import dbbuilder
+from counterpartycore.lib.ledger.currentstate import CurrentState
 from counterpartycore.lib.parser import utxosinfo
 from counterpartycore.lib.utils import database
 from counterpartycore.lib.utils.helpers import format_duration
@@ -104,6 +105,13 @@ STATE_DB_TABLES = [
 
 SKIP_EVENTS = ["NEW_TRANSACTION_OUTPUT"]
 
+# maximum number of events applied in a single State DB transaction
+EVENTS_BATCH_SIZE = 5000
+# polling interval when the ledger doesn't notify the watcher
+POLLING_INTERVAL = 0.1
+# fallback polling interval when the ledger notifies the watcher
+LEDGER_UPDATED_TIMEOUT = 1
+
 
 def fetch_all(db, query, bindings=None):
     cursor = db.cursor()
@@ -124,11 +132,14 @@ def delete_all(db, query, bindings=None):
     return changes["deleted"]
 
 
-def get_next_event_to_parse(ledger_db, state_db):
+def get_next_events_to_parse(ledger_db, state_db, limit=None):
+    if limit is None:
+        limit = EVENTS_BATCH_SIZE
     last_parsed_message_index = get_last_parsed_event_index(state_db)
-    sql = "SELECT * FROM messages WHERE message_index > ? ORDER BY message_index ASC LIMIT 1"
-    next_event = fetch_one(ledger_db, sql, (last_parsed_message_index,))
-    return next_event
+    sql = "SELECT * FROM messages WHERE message_index > ? ORDER BY message_index ASC LIMIT ?"
+    cursor = ledger_db.cursor()
+    cursor.execute(sql, (last_parsed_message_index, limit))
+    return cursor.fetchall()
 
 
 def get_event_to_parse_count(ledger_db, state_db):
@@ -524,7 +535,6 @@ def update_last_parsed_events(state_db, event):
     """
     cursor = state_db.cursor()
     cursor.execute(sql, event)
-    update_last_parsed_events_cache(state_db, event)
 
     # Clear the BALANCES_COPIED_AT_BLOCK marker once we've caught up.
     # This marker was set during rollback to prevent double-counting of
@@ -565,14 +575,29 @@ def get_last_block_parsed(state_db, no_cache=False):
     return 0
 
 
-def parse_event(state_db, event):
+def parse_events(state_db, events):
+    """Apply a batch of events in a single State DB transaction."""
+    if len(events) == 0:
+        return
     with state_db:
-        logger.trace(f"Parsing event: {event}")
-        update_state_db_tables(state_db, event)
-        update_last_parsed_events(state_db, event)
-        update_events_count(state_db, event)
-        update_transaction_types_count(state_db, event)
-        logger.event(f"Event parsed: {event['message_index']} {event['event']}")
+        last_block_parsed_event = None
+        for event in events:
+            logger.trace(f"Parsing event: {event}")
+            update_state_db_tables(state_db, event)
+            update_last_parsed_events(state_db, event)
+            update_events_count(state_db, event)
+            update_transaction_types_count(state_db, event)
+            if event["event"] == "BLOCK_PARSED":
+                last_block_parsed_event = event
+            logger.event(f"Event parsed: {event['message_index']} {event['event']}")
+        # last parsed markers are updated once per batch
+        if last_block_parsed_event is not None:
+            update_last_parsed_events_cache(state_db, last_block_parsed_event)
+        if events[-1] is not last_block_parsed_event:
+            update_last_parsed_events_cache(state_db, events[-1])
+    # published after the commit so API workers never cache a block before it's visible
+    if last_block_parsed_event is not None:
+        CurrentState().set_last_block_parsed(last_block_parsed_event["block_index"])
 
 
 def catch_up(ledger_db, state_db, watcher=None):
@@ -582,11 +607,12 @@ def catch_up(ledger_db, state_db, watcher=None):
         logger.debug("%s events to catch up...", event_to_parse_count)
         start_time = time.time()
         event_parsed = 0
-        next_event = get_next_event_to_parse(ledger_db, state_db)
-        while next_event and (watcher is None or not watcher.stop_event.is_set()):
-            parse_event(state_db, next_event)
-            event_parsed += 1
-            if event_parsed % 50000 == 0:
+        next_events = get_next_events_to_parse(ledger_db, state_db)
+        while next_events and (watcher is None or not watcher.stop_event.is_set()):
+            parse_events(state_db, next_events)
+            previous_event_parsed = event_parsed
+            event_parsed += len(next_events)
+            if event_parsed // 50000 > previous_event_parsed // 50000:
                 duration = time.time() - start_time
                 logger.debug(
                     "%s / %s events parsed. (%s)",
@@ -594,7 +620,7 @@ def catch_up(ledger_db, state_db, watcher=None):
                     event_to_parse_count,
                     format_duration(duration),
                 )
-            next_event = get_next_event_to_parse(ledger_db, state_db)
+            next_events = get_next_events_to_parse(ledger_db, state_db)
         if watcher is None or not watcher.stop_event.is_set():
             duration = time.time() - start_time
             logger.info("Catch up completed. (%s)", format_duration(duration))
@@ -643,25 +669,30 @@ def check_reorg(ledger_db, state_db):
         logger.warning("Blockchain reorganization detected at Block %s", target_block_index)
         logger.info("Rolling back to block: %s", target_block_index)
         dbbuilder.rollback_state_db(state_db, block_index=target_block_index)
+        # last parsed markers are not in the rolled back tables
+        update_last_parsed_events_cache(state_db, event=None)
+        CurrentState().set_last_block_parsed(get_last_block_parsed(state_db))
 
 
-def parse_next_event(ledger_db, state_db):
-    next_event = get_next_event_to_parse(ledger_db, state_db)
+def parse_next_events(ledger_db, state_db):
+    next_events = get_next_events_to_parse(ledger_db, state_db)
 
-    if next_event is None:
+    if len(next_events) == 0:
         raise exceptions.NoEventToParse("No event to parse")
 
-    parse_event(state_db, next_event)
+    parse_events(state_db, next_events)
 
 
 class APIWatcher(threading.Thread):
-    def __init__(self, state_db):
+    def __init__(self, state_db, ledger_updated_event=None):
         threading.Thread.__init__(self, name="Watcher")
         logger.debug("Initializing API Watcher...")
         self.state_db = None
         self.ledger_db = None
         self.current_state_thread = None
         self.stop_event = threading.Event()  # Add stop event
+        # set by the ledger process after each commit
+        self.ledger_updated_event = ledger_updated_event
         self.state_db = state_db
         self.ledger_db = database.get_db_connection(
             config.DATABASE, read_only=True, check_wal=False
@@ -679,12 +710,12 @@ class APIWatcher(threading.Thread):
             no_check_reorg_since = 0
             while not self.stop_event.is_set():
                 try:
-                    parse_next_event(self.ledger_db, self.state_db)
+                    parse_next_events(self.ledger_db, self.state_db)
                 except exceptions.NoEventToParse:
                     if time.time() - no_check_reorg_since > 5:
                         check_reorg(self.ledger_db, self.state_db)
                         no_check_reorg_since = time.time()
-                    self.stop_event.wait(timeout=0.1)
+                    self.wait_for_ledger_update()
                 if self.stop_event.is_set():
                     break
         finally:
@@ -695,9 +726,21 @@ class APIWatcher(threading.Thread):
             if self.current_state_thread is not None:
                 self.current_state_thread.stop()
 
+    def wait_for_ledger_update(self):
+        if self.ledger_updated_event is None:
+            self.stop_event.wait(timeout=POLLING_INTERVAL)
+            return
+        # keep polling, slowly, in case a notification is lost
+        self.ledger_updated_event.wait(timeout=LEDGER_UPDATED_TIMEOUT)
+        # cleared before parsing so a commit during parsing wakes up the next wait
+        self.ledger_updated_event.clear()
+
     def stop(self):
         logger.info("Stopping API Watcher thread...")
         self.stop_event.set()
+        if self.ledger_updated_event is not None:
+            # wake up the watcher
+            self.ledger_updated_event.set()
         self.join(timeout=5)
         if self.is_alive():
             logger.warning("API Watcher thread did not stop in time, continuing...")
@@ -1,5 +1,7 @@
 import binascii
 import decimal
+import inspect
+import json
 
 from counterpartycore.lib import (
     backend,
@@ -12,9 +14,34 @@ from counterpartycore.lib.ledger.currentstate import CurrentState
 from counterpartycore.lib.messages import gas
 from counterpartycore.lib.messages.attach import ID as UTXO_ID
 from counterpartycore.lib.parser import deserialize, gettxinfo, messagetype
+from counterpartycore.lib.utils import helpers
 
 D = decimal.Decimal
 
+# maximum number of transactions composed by one batch request
+MAX_BATCH_SIZE = 500
+# type names used in the errors, as in `apiserver.prepare_args()`
+BATCH_PARAM_TYPE_NAMES = {
+    bool: "boolean",
+    int: "integer",
+    float: "float",
+    str: "string",
+    list: "list",
+}
+# errors of one transaction returned with its index, the API returns a 400 for all of them
+BATCH_TRANSACTION_ERRORS = (
+    exceptions.ComposeError,
+    exceptions.AddressError,
+    exceptions.AssetNameError,
+    exceptions.BalanceError,
+    exceptions.UnknownPubKeyError,
+    exceptions.TransactionError,
+    exceptions.UnpackError,
+    OverflowError,
+    TypeError,
+    ValueError,
+)
+
 
 def compose_bet(
     db,
@@ -562,6 +589,137 @@ def compose_movetoutxo(db, utxo: str, destination: str, utxo_value: int = None,
     return composer.compose_transaction(db, "move", params, construct_params)
 
 
+def prepare_batch_param(name, annotation, value):
+    """Converts a JSON parameter of a batch transaction like `apiserver.prepare_args()` converts the query string"""
+    type_name = BATCH_PARAM_TYPE_NAMES.get(annotation, annotation.__name__)
+    if annotation is list and not isinstance(value, list):
+        value = [value]
+    if isinstance(value, str) and annotation is bool:
+        value = value.lower() in ["true", "1"]
+    elif isinstance(value, str) and annotation in [int, float]:
+        try:
+            value = annotation(value)
+        except ValueError as e:
+            raise ValueError(f"Invalid {type_name}: {name}") from e
+    elif annotation is float and isinstance(value, int) and not isinstance(value, bool):
+        value = float(value)
+
+    # booleans are `int` for `isinstance()`
+    if not isinstance(value, annotation) or (isinstance(value, bool) and annotation is not bool):
+        raise ValueError(f"Invalid {type_name}: {name}")
+    if annotation is list and not all(isinstance(item, str) for item in value):
+        raise ValueError(f"Invalid {type_name}: {name}")
+
+    # `address` is the address of the batch
+    if name.endswith("_hash") and not helpers.is_valid_tx_hash(value):
+        raise ValueError(f"Invalid transaction hash: {value}")
+    return value
+
+
+def compose_batch(
+    db, address: str, transactions: str, chain_change: bool = False, **construct_params
+):
+    """
+    Composes several transactions from the same address at once, without spending the same UTXO twice. The UTXOs of the address and the fee rate are fetched once for all the transactions and the construct parameters apply to all of them.
+    :param address: The address that will be the source of all the transactions (e.g. $ADDRESS_1)
+    :param transactions: JSON list of the transactions to compose, each one an object with the name of the compose route in `type` and the parameters of this route except `address` (e.g. [{"type": "send", "destination": "$ADDRESS_2", "asset": "XCP", "quantity": 1000}])
+    :param chain_change: Use the change output of each transaction as an input for the next ones, only if the change is sent back to a segwit address; the transactions must then be broadcast in order
+    """
+    try:
+        transaction_list = json.loads(transactions)
+    except json.JSONDecodeError as e:
+        raise exceptions.ComposeError("transactions must be a JSON list") from e
+    if not isinstance(transaction_list, list) or len(transaction_list) == 0:
+        raise exceptions.ComposeError("transactions must be a non-empty JSON list")
+    if len(transaction_list) > MAX_BATCH_SIZE:
+        raise exceptions.ComposeError(
+            f"too many transactions (max. {MAX_BATCH_SIZE}): {len(transaction_list)}"
+        )
+
+    batch_transactions = []
+    for index, transaction in enumerate(transaction_list):
+        if not isinstance(transaction, dict) or transaction.get("type") not in BATCH_COMPOSERS:
+            raise exceptions.ComposeError(
+                f"transaction {index}: `type` must be one of {', '.join(BATCH_COMPOSERS)}"
+            )
+        compose_function = BATCH_COMPOSERS[transaction["type"]]
+        # `null` gives the default value, as in the query string
+        params = {
+            key: value
+            for key, value in transaction.items()
+            if key != "type"
+            and value is not None
+            and not (isinstance(value, str) and value.lower() in ["none", "null"])
+        }
+        function_params = inspect.signature(compose_function).parameters
+        allowed_params = [
+            name for name in function_params if name not in ["db", "address", "construct_params"]
+        ]
+        unknown_params = [name for name in params if name not in allowed_params]
+        if len(unknown_params) > 0:
+            raise exceptions.ComposeError(
+                f"transaction {index}: unknown parameters: {', '.join(unknown_params)}"
+            )
+        missing_params = [
+            name
+            for name in allowed_params
+            if name not in params and function_params[name].default is inspect.Parameter.empty
+        ]
+        if len(missing_params) > 0:
+            raise exceptions.ComposeError(
+                f"transaction {index}: missing parameters: {', '.join(missing_params)}"
+            )
+        try:
+            params = {
+                name: prepare_batch_param(name, function_params[name].annotation, value)
+                for name, value in params.items()
+            }
+        except ValueError as e:
+            raise exceptions.ComposeError(f"transaction {index}: {e}") from e
+        batch_transactions.append((compose_function, params))
+
+    # the fee rate and the unspent list are shared by all the transactions
+    construct_params, warnings = composer.prepare_construct_params(construct_params)
+    if not construct_params.get("return_only_data", False):
+        if construct_params.get("exact_fee") is None:
+            construct_params["sat_per_vbyte"] = composer.get_sat_per_vbyte(construct_params)
+        unspent_list = composer.prepare_unspent_list(db, address, construct_params)
+        construct_params["batch"] = composer.ComposeBatch(unspent_list, chain_change)
+
+    results = []
+    for index, (compose_function, params) in enumerate(batch_transactions):
+        try:
+            results.append(compose_function(db, address, **params, **construct_params))
+        except BATCH_TRANSACTION_ERRORS as e:
+            raise exceptions.ComposeError(f"transaction {index}: {e}") from e
+
+    result = {"transactions": results}
+    if len(warnings) > 0:
+        result["warnings"] = warnings
+    return result
+
+
+BATCH_COMPOSERS = {
+    "bet": compose_bet,
+    "broadcast": compose_broadcast,
+    "btcpay": compose_btcpay,
+    "burn": compose_burn,
+    "cancel": compose_cancel,
+    "destroy": compose_destroy,
+    "dispenser": compose_dispenser,
+    "dividend": compose_dividend,
+    "issuance": compose_issuance,
+    "mpma": compose_mpma,
+    "order": compose_order,
+    "send": compose_send,
+    "sweep": compose_sweep,
+    "dispense": compose_dispense,
+    "fairminter": compose_fairminter,
+    "fairmint": compose_fairmint,
+    "attach": compose_attach,
+}
+
+
 def info_by_tx_hash(db, tx_hash: str):
     """
     Returns Counterparty information from a transaction hash.
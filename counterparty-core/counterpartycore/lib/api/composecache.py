@@ -0,0 +1,111 @@
+import logging
+import threading
+from collections import OrderedDict
+
+from counterpartycore.lib import backend, config
+from counterpartycore.lib.api.apimetrics import APIMetrics
+from counterpartycore.lib.ledger.currentstate import CurrentState
+from counterpartycore.lib.utils import helpers
+
+logger = logging.getLogger(config.LOGGER_NAME)
+
+# maximum number of addresses whose unspent list is kept
+UNSPENT_LISTS_CACHE_SIZE = 1000
+
+
+class ComposeCache(metaclass=helpers.SingletonMeta):
+    """
+    Results of the backend calls made by the compose pipeline, kept by each API worker.
+    Everything is dropped on a new block. An unspent list is also dropped when a
+    transaction from its address enters or leaves the mempool; the UTXOs used by
+    recent composes are excluded by the UTXO locks.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.block_key = None
+        self.fee_estimates = {}
+        self.unspent_lists = OrderedDict()
+
+    def check_block(self):
+        block_key = (
+            CurrentState().current_block_index(),
+            CurrentState().current_backend_height(),
+        )
+        if block_key != self.block_key:
+            self.block_key = block_key
+            self.fee_estimates = {}
+            self.unspent_lists = OrderedDict()
+
+    def count(self, cache_name, hit):
+        APIMetrics().increment(f"compose_cache_{cache_name}_{'hits' if hit else 'misses'}")
+
+    def get_fee_estimate(self, confirmation_target):
+        with self.lock:
+            self.check_block()
+            sat_per_vbyte = self.fee_estimates.get(confirmation_target)
+        self.count("fee_estimates", sat_per_vbyte is not None)
+        if sat_per_vbyte is None:
+            sat_per_vbyte = fetch_fee_estimate(confirmation_target)
+            with self.lock:
+                self.fee_estimates[confirmation_target] = sat_per_vbyte
+        return sat_per_vbyte
+
+    def get_unspent_list(self, db, address, allow_unconfirmed_inputs):
+        key = (address, allow_unconfirmed_inputs)
+        mempool_state = get_mempool_state(db, address)
+        with self.lock:
+            self.check_block()
+            cached = self.unspent_lists.get(key)
+            if cached is not None and cached[0] != mempool_state:
+                del self.unspent_lists[key]
+                cached = None
+        self.count("unspent_lists", cached is not None)
+        if cached is None:
+            unspent_list = backend.list_unspent(address, allow_unconfirmed_inputs)
+            with self.lock:
+                self.unspent_lists[key] = (mempool_state, unspent_list)
+                if len(self.unspent_lists) > UNSPENT_LISTS_CACHE_SIZE:
+                    self.unspent_lists.popitem(last=False)
+        else:
+            unspent_list = cached[1]
+        # the composer completes the UTXOs in place
+        return [dict(utxo) for utxo in unspent_list]
+
+    def invalidate_unspent_list(self, address):
+        with self.lock:
+            for allow_unconfirmed_inputs in (True, False):
+                self.unspent_lists.pop((address, allow_unconfirmed_inputs), None)
+
+
+def fetch_fee_estimate(confirmation_target):
+    if confirmation_target is not None:
+        return backend.bitcoind.satoshis_per_vbyte(confirmation_target)
+    return backend.bitcoind.satoshis_per_vbyte()
+
+
+def get_mempool_state(db, address):
+    """Changes each time a transaction from the address is added to or removed from the mempool"""
+    # uses the `mempool_transactions_source_idx` index
+    state = db.execute(
+        """SELECT COUNT(*) AS count, MAX(tx_index) AS last_tx_index
+           FROM mempool_transactions WHERE source = ?""",
+        (address,),
+    ).fetchone()
+    return state["count"], state["last_tx_index"]
+
+
+def satoshis_per_vbyte(confirmation_target=None, use_cache=True):
+    if not use_cache:
+        return fetch_fee_estimate(confirmation_target)
+    return ComposeCache().get_fee_estimate(confirmation_target)
+
+
+def list_unspent(db, address, allow_unconfirmed_inputs, use_cache=True):
+    if not use_cache:
+        return backend.list_unspent(address, allow_unconfirmed_inputs)
+    return ComposeCache().get_unspent_list(db, address, allow_unconfirmed_inputs)
+
+
+def invalidate_unspent_list(address):
+    ComposeCache().invalidate_unspent_list(address)
@@ -1,12 +1,13 @@
 import binascii
+import functools
 import hashlib
 import inspect
 import logging
 import math
 import string
 import sys
+import threading
 import time
-from collections import OrderedDict
 from decimal import Decimal as D
 
 import cbor2
@@ -21,7 +22,7 @@ from bitcoinutils.keys import (
 )
 from bitcoinutils.script import Script, b_to_h
 from bitcoinutils.transactions import Transaction, TxInput, TxOutput, TxWitnessInput
-from bitcoinutils.utils import ControlBlock
+from bitcoinutils.utils import ControlBlock, encode_varint
 
 from counterpartycore.lib import (
     backend,
@@ -30,10 +31,22 @@ from counterpartycore.lib import (
     ledger,
     messages,
 )
+from counterpartycore.lib.api import composecache
 from counterpartycore.lib.parser import deserialize, messagetype, utxosinfo
-from counterpartycore.lib.utils import helpers, multisig, opcodes, script
+from counterpartycore.lib.utils import database, helpers, multisig, opcodes, script
 
 MAX_INPUTS_SET = 100
+# number of UTXOs bound in each `IN (...)` query, below the SQLite default limit
+UTXO_LOCKS_QUERY_CHUNK_SIZE = 500
+# rowids are increasing: the oldest locks have the smallest ones
+UTXO_LOCKS_DATABASE_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS utxo_locks (
+        id INTEGER PRIMARY KEY,
+        utxo TEXT UNIQUE,
+        locked_at REAL
+    )""",
+    "CREATE INDEX IF NOT EXISTS utxo_locks_locked_at_idx ON utxo_locks (locked_at)",
+)
 
 logger = logging.getLogger(config.LOGGER_NAME)
 
@@ -557,39 +570,102 @@ def prepare_outputs(db, source, destinations, data, unspent_list, construct_para
 
 
 class UTXOLocks(metaclass=helpers.SingletonMeta):
-    def __init__(self):
+    """
+    UTXOs selected by recent compose requests, shared by all the API workers
+    through a side database so that concurrent requests don't use the same inputs.
+    Locks expire after `max_age` seconds and only the last `max_size` are kept.
+    """
+
+    def __init__(self, database_file=None):
+        # without database file (e.g. in tests) locks are only shared by the threads of the process
+        self.database_file = database_file or config.UTXO_LOCKS_DATABASE or ":memory:"
+        self.thread_lock = threading.Lock()
+        self.database = database.SideDatabase(
+            self.database_file, UTXO_LOCKS_DATABASE_SCHEMA, busy_timeout=5000
+        )
         self.max_age = None
         self.max_size = None
-        self.init()
-
-    def init(self):
-        self.locks = OrderedDict()
-        self.locks = OrderedDict()
         self.set_limits(config.UTXO_LOCKS_MAX_AGE, config.UTXO_LOCKS_MAX_ADDRESSES)
 
     def set_limits(self, max_age, max_size):
         self.max_age = max_age
         self.max_size = max_size
 
+    def connection(self):
+        return self.database.connection()
+
+    def lock_utxos(self, utxos, forced_utxo=None):
+        """
+        Atomically locks all the `utxos` and returns an empty set, or locks nothing and returns
+        the ones already locked by another request. `forced_utxo` is locked in any case.
+        """
+        now = time.time()
+        with self.thread_lock:
+            db = self.connection()
+            cursor = db.cursor()
+            # take the write lock before reading so that two workers can't lock the same UTXOs
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                cursor.execute("DELETE FROM utxo_locks WHERE locked_at < ?", (now - self.max_age,))
+                already_locked = self.select_locked(
+                    cursor, [utxo for utxo in utxos if utxo != forced_utxo], now
+                )
+                if not already_locked:
+                    cursor.executemany(
+                        "INSERT OR REPLACE INTO utxo_locks (utxo, locked_at) VALUES (?, ?)",
+                        [(utxo, now) for utxo in utxos],
+                    )
+                    cursor.execute(
+                        "DELETE FROM utxo_locks WHERE id <= (SELECT MAX(id) FROM utxo_locks) - ?",
+                        (self.max_size,),
+                    )
+                cursor.execute("COMMIT")
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+        return already_locked
+
     def lock(self, utxo):
-        self.locks[utxo] = time.time()
-        if len(self.locks) > self.max_size:
-            self.locks.popitem(last=False)
+        self.lock_utxos([utxo], forced_utxo=utxo)
+
+    def select_locked(self, cursor, utxos, now):
+        # primary key lookups of the candidate UTXOs only
+        locked_utxos = set()
+        for chunk in helpers.chunkify(utxos, UTXO_LOCKS_QUERY_CHUNK_SIZE):
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT utxo FROM utxo_locks WHERE utxo IN ({placeholders}) AND locked_at >= ?"  # noqa: S608 # nosec B608
+            cursor.execute(query, (*chunk, now - self.max_age))
+            locked_utxos.update(row[0] for row in cursor)
+        return locked_utxos
 
     def locked(self, utxo):
-        if utxo not in self.locks:
-            return False
-        if time.time() - self.locks[utxo] > self.max_age:
-            del self.locks[utxo]
-            return False
-        return True
+        with self.thread_lock:
+            return (
+                self.connection()
+                .execute(
+                    "SELECT 1 FROM utxo_locks WHERE utxo = ? AND locked_at >= ?",
+                    (utxo, time.time() - self.max_age),
+                )
+                .fetchone()
+                is not None
+            )
 
     def filter_unspent_list(self, unspent_list):
-        return [utxo for utxo in unspent_list if not self.locked(f"{utxo['txid']}:{utxo['vout']}")]
+        utxos = [f"{utxo['txid']}:{utxo['vout']}" for utxo in unspent_list]
+        with self.thread_lock:
+            locked_utxos = self.select_locked(self.connection().cursor(), utxos, time.time())
+        return [
+            utxo for utxo in unspent_list if f"{utxo['txid']}:{utxo['vout']}" not in locked_utxos
+        ]
+
+    def lock_inputs(self, inputs, source=None):
+        return self.lock_utxos(
+            [f"{tx_input.txid}:{tx_input.txout_index}" for tx_input in inputs], forced_utxo=source
+        )
 
-    def lock_inputs(self, inputs):
-        for tx_input in inputs:
-            self.lock(f"{tx_input.txid}:{tx_input.txout_index}")
+    def close(self):
+        with self.thread_lock:
+            self.database.close()
 
 
 def complete_unspent_list(unspent_list):
@@ -716,6 +792,9 @@ def filter_utxos_with_balances(db, source, unspent_list, construct_params):
         return unspent_list
 
     exclude_utxos_with_balances = construct_params.get("exclude_utxos_with_balances", False)
+    utxos_with_balances = ledger.balances.get_utxos_with_balances(
+        db, [f"{utxo['txid']}:{utxo['vout']}" for utxo in unspent_list]
+    )
     new_unspent_list = []
     with_balance_utxos = []
     for utxo in unspent_list:
@@ -723,10 +802,7 @@ def filter_utxos_with_balances(db, source, unspent_list, construct_params):
         if str_input == source:
             new_unspent_list.append(utxo)
             continue
-        utxo_balances = ledger.balances.get_utxo_balances(db, str_input)
-        with_balances = len(utxo_balances) > 0 and any(
-            balance["quantity"] > 0 for balance in utxo_balances
-        )
+        with_balances = str_input in utxos_with_balances
         if exclude_utxos_with_balances and with_balances:
             continue
         if with_balances:
@@ -740,17 +816,24 @@ def filter_utxos_with_balances(db, source, unspent_list, construct_params):
     return new_unspent_list
 
 
+def get_source_address(db, source):
+    if utxosinfo.is_utxo_format(source):
+        return utxo_to_address(db, source)
+    return source
+
+
 def prepare_unspent_list(db, source, construct_params):
     inputs_set = construct_params.get("inputs_set")
 
     if inputs_set is None:
         # get unspent list from Bitcoin Core or Electrs
         allow_unconfirmed_inputs = construct_params.get("allow_unconfirmed_inputs", False)
-        if utxosinfo.is_utxo_format(source):
-            source_address = utxo_to_address(db, source)
-        else:
-            source_address = source
-        unspent_list = backend.list_unspent(source_address, allow_unconfirmed_inputs)
+        unspent_list = composecache.list_unspent(
+            db,
+            get_source_address(db, source),
+            allow_unconfirmed_inputs,
+            use_cache=not construct_params.get("disable_compose_cache", False),
+        )
         # exclude silentely utxos with balances
         unspent_list = filter_utxos_with_balances(
             db, source, unspent_list, construct_params | {"exclude_utxos_with_balances": True}
@@ -779,7 +862,9 @@ def prepare_unspent_list(db, source, construct_params):
         unspent_list = UTXOLocks().filter_unspent_list(unspent_list)
 
     # exclude utxos with balances if needed
-    unspent_list = filter_utxos_with_balances(db, source, unspent_list, construct_params)
+    # (UTXOs from the backend have already been filtered)
+    if inputs_set is not None:
+        unspent_list = filter_utxos_with_balances(db, source, unspent_list, construct_params)
 
     if len(unspent_list) == 0:
         raise exceptions.ComposeError(
@@ -932,6 +1017,77 @@ def get_size_info(tx, selected_utxos, signed=False):
     return adjusted_vsize, virtual_size, sigops_count
 
 
+# txid, vout and sequence
+TX_INPUT_FIXED_SIZE = 32 + 4 + 4
+# version and locktime
+TX_FIXED_SIZE = 4 + 4
+SEGWIT_MARKER_SIZE = 2
+
+
+@functools.lru_cache(maxsize=1024)
+def get_input_size_info(script_pub_key):
+    """Returns the size, the witness size and the sigops count of an input once dummy-signed"""
+    dummy_script_sig = get_dummy_script_sig(script_pub_key)
+    script_sig = dummy_script_sig.to_bytes() if dummy_script_sig is not None else b""
+    size = TX_INPUT_FIXED_SIZE + len(encode_varint(len(script_sig))) + len(script_sig)
+    witness_size = 0
+    dummy_witness = get_dummy_witness(script_pub_key)
+    if dummy_witness is not None:
+        witness_size = len(encode_varint(len(dummy_witness.stack))) + len(dummy_witness.to_bytes())
+    sigops_count = get_input_sigops_count(b_to_h(script_sig), script_pub_key)
+    return size, witness_size, sigops_count
+
+
+class TransactionSizeEstimator:
+    """
+    Computes the same values as `get_size_info()` for a transaction built with the given
+    outputs and the inputs added so far, without building nor serializing it.
+    """
+
+    def __init__(self, outputs):
+        self.inputs_count = 0
+        self.inputs_size = 0
+        self.witnesses_size = 0
+        self.has_segwit = False
+        self.sigops_count = 0
+        self.outputs_count = 0
+        self.outputs_size = 0
+        for output in outputs:
+            self.add_output(output)
+
+    def add_input(self, utxo):
+        size, witness_size, sigops_count = get_input_size_info(utxo["script_pub_key"])
+        self.inputs_count += 1
+        self.inputs_size += size
+        self.witnesses_size += witness_size
+        self.has_segwit = self.has_segwit or utxo["is_segwit"] or witness_size > 0
+        self.sigops_count += sigops_count
+
+    def add_inputs(self, utxos):
+        for utxo in utxos:
+            self.add_input(utxo)
+
+    def add_output(self, output):
+        self.outputs_count += 1
+        self.outputs_size += len(output.to_bytes())
+        self.sigops_count += get_output_sigops_count(output.script_pubkey.to_hex())
+
+    def get_size_info(self):
+        size = (
+            TX_FIXED_SIZE
+            + len(encode_varint(self.inputs_count))
+            + self.inputs_size
+            + len(encode_varint(self.outputs_count))
+            + self.outputs_size
+        )
+        virtual_size = size
+        if self.has_segwit:
+            # marker, flag and witnesses count for a quarter
+            virtual_size += math.ceil((SEGWIT_MARKER_SIZE + self.witnesses_size) / 4)
+        adjusted_vsize = max(self.sigops_count * 5, virtual_size)
+        return adjusted_vsize, virtual_size, self.sigops_count
+
+
 def prepare_fee_parameters(construct_params):
     exact_fee = construct_params.get("exact_fee")
     sat_per_vbyte = construct_params.get("sat_per_vbyte")
@@ -940,21 +1096,19 @@ def prepare_fee_parameters(construct_params):
     if exact_fee is not None:
         sat_per_vbyte, confirmation_target, max_fee = None, None, None
     elif sat_per_vbyte is None:
-        if confirmation_target is not None:
-            sat_per_vbyte = backend.bitcoind.satoshis_per_vbyte(confirmation_target)
-        else:
-            sat_per_vbyte = backend.bitcoind.satoshis_per_vbyte()
+        sat_per_vbyte = composecache.satoshis_per_vbyte(
+            confirmation_target, use_cache=not construct_params.get("disable_compose_cache", False)
+        )
     return exact_fee, sat_per_vbyte, max_fee
 
 
 def get_sat_per_vbyte(construct_params):
     _exact_fee, sat_per_vbyte, _max_fee = prepare_fee_parameters(construct_params)
     if sat_per_vbyte is None:
-        confirmation_target = construct_params.get("confirmation_target")
-        if confirmation_target is not None:
-            sat_per_vbyte = backend.bitcoind.satoshis_per_vbyte(confirmation_target)
-        else:
-            sat_per_vbyte = backend.bitcoind.satoshis_per_vbyte()
+        sat_per_vbyte = composecache.satoshis_per_vbyte(
+            construct_params.get("confirmation_target"),
+            use_cache=not construct_params.get("disable_compose_cache", False),
+        )
     return sat_per_vbyte
 
 
@@ -969,10 +1123,13 @@ def prepare_inputs_and_change(db, source, outputs, unspent_list, construct_param
     change_outputs = []
     btc_in = 0
     needed_fee = 0
-    size_info = (0, 0, 0)
+    # sizes are updated input by input instead of serializing a new transaction each time
+    estimator = None
+    change_output = None
     # try with one input and increase until the change is enough for the fee
     use_all_inputs_set = construct_params.get("use_all_inputs_set", False)
     input_count = len(unspent_list) if use_all_inputs_set else 1
+    selected_count = 0
     while True:
         if input_count > len(unspent_list):
             total_needed = outputs_total + (exact_fee or needed_fee)
@@ -980,9 +1137,9 @@ def prepare_inputs_and_change(db, source, outputs, unspent_list, construct_param
                 f"Insufficient funds for the target amount: {btc_in} < {total_needed}"
             )
 
-        selected_utxos = unspent_list[:input_count]
-        inputs = utxos_to_txins(selected_utxos)
-        btc_in = sum(utxo["value"] for utxo in selected_utxos)
+        # unspent list is sorted by value: the largest UTXOs are selected first
+        btc_in += sum(utxo["value"] for utxo in unspent_list[selected_count:input_count])
+        selected_count = input_count
         change_amount = int(btc_in - outputs_total)
 
         # if change is negative, try with more inputs
@@ -1003,18 +1160,15 @@ def prepare_inputs_and_change(db, source, outputs, unspent_list, construct_param
                 )
             break
 
-        # else calculate needed fee
-        has_segwit = any(utxo["is_segwit"] for utxo in selected_utxos)
-
-        tx = Transaction(
-            inputs,
-            outputs
-            + [create_tx_output(change_amount, change_address, unspent_list, construct_params)],
-            has_segwit=has_segwit,
-        )
+        # else calculate needed fee, with a change output whose size doesn't depend on the amount
+        if estimator is None:
+            change_output = create_tx_output(
+                change_amount, change_address, unspent_list, construct_params
+            )
+            estimator = TransactionSizeEstimator(outputs + [change_output])
+        estimator.add_inputs(unspent_list[estimator.inputs_count : input_count])
 
-        size_info = get_size_info(tx, selected_utxos)
-        adjusted_vsize = size_info[0]
+        adjusted_vsize = estimator.get_size_info()[0]
         needed_fee = sat_per_vbyte * adjusted_vsize
         if max_fee is not None:
             needed_fee = min(needed_fee, max_fee)
@@ -1031,6 +1185,7 @@ def prepare_inputs_and_change(db, source, outputs, unspent_list, construct_param
         # else try with more inputs
         input_count += 1
 
+    selected_utxos = unspent_list[:input_count]
     return selected_utxos, btc_in, change_outputs
 
 
@@ -1067,11 +1222,52 @@ def compose_data(db, name, params, accept_missing_params=False, skip_validation=
     return compose_method(db, **params)
 
 
+class ComposeBatch:
+    """
+    Unspent list shared by the transactions of a batch: the inputs of each transaction
+    are removed from it and, with `chain_change`, its change output is added to it.
+    """
+
+    def __init__(self, unspent_list, chain_change=False):
+        self.unspent_list = unspent_list
+        self.chain_change = chain_change
+
+    def use_utxos(self, tx, selected_utxos, change_outputs):
+        used_utxos = {f"{utxo['txid']}:{utxo['vout']}" for utxo in selected_utxos}
+        self.unspent_list = [
+            utxo for utxo in self.unspent_list if f"{utxo['txid']}:{utxo['vout']}" not in used_utxos
+        ]
+
+        if not self.chain_change or len(change_outputs) == 0:
+            return
+        # the txid of a transaction spending non-segwit inputs changes when it is signed
+        if not all(utxo["is_segwit"] for utxo in selected_utxos):
+            return
+        # only a change sent back to the source can be spent by the next transactions
+        script_pub_key = change_outputs[0].script_pubkey.to_hex()
+        if script_pub_key not in [utxo["script_pub_key"] for utxo in selected_utxos]:
+            return
+        self.unspent_list.append(
+            {
+                "txid": tx.get_txid(),
+                "vout": len(tx.outputs) - 1,
+                "value": change_outputs[0].amount,
+                "script_pub_key": script_pub_key,
+                "is_segwit": True,
+            }
+        )
+        self.unspent_list = sorted(self.unspent_list, key=lambda x: x["value"], reverse=True)
+
+
 def construct(db, tx_info, construct_params):
     source, destinations, data = tx_info
 
     # prepare unspent list
-    unspent_list = prepare_unspent_list(db, source, construct_params)
+    batch = construct_params.get("batch")
+    if batch is not None:
+        unspent_list = batch.unspent_list
+    else:
+        unspent_list = prepare_unspent_list(db, source, construct_params)
 
     # prepare outputs
     outputs, reveal_tx_info = prepare_outputs(
@@ -1079,13 +1275,29 @@ def construct(db, tx_info, construct_params):
     )
 
     # prepare inputs and change
-    selected_utxos, btc_in, change_outputs = prepare_inputs_and_change(
-        db, source, outputs, unspent_list, construct_params
-    )
-    inputs = utxos_to_txins(selected_utxos)
+    while True:
+        selected_utxos, btc_in, change_outputs = prepare_inputs_and_change(
+            db, source, outputs, unspent_list, construct_params
+        )
+        inputs = utxos_to_txins(selected_utxos)
 
-    if not construct_params.get("disable_utxo_locks", False):
-        UTXOLocks().lock_inputs(inputs)
+        if construct_params.get("disable_utxo_locks", False):
+            break
+        # the source UTXO is explicitly requested: it is used even if already locked
+        source_utxo = source if utxosinfo.is_utxo_format(source) else None
+        already_locked = UTXOLocks().lock_inputs(inputs, source=source_utxo)
+        if not already_locked:
+            break
+        # another request has locked some of these UTXOs since the unspent list was filtered
+        unspent_list = [
+            utxo for utxo in unspent_list if f"{utxo['txid']}:{utxo['vout']}" not in already_locked
+        ]
+
+    # without locks, nothing excludes the selected UTXOs from the cached unspent list
+    if construct_params.get("inputs_set") is None and construct_params.get(
+        "disable_utxo_locks", False
+    ):
+        composecache.invalidate_unspent_list(get_source_address(db, source))
 
     # construct transaction
     btc_out = sum(output.amount for output in outputs)
@@ -1095,6 +1307,8 @@ def construct(db, tx_info, construct_params):
     tx = Transaction(inputs, outputs + change_outputs)
     unsigned_tx_hex = tx.serialize()
     adjusted_vsize, virtual_size, sigops_count = get_size_info(tx, selected_utxos)
+    if batch is not None:
+        batch.use_utxos(tx, selected_utxos, change_outputs)
 
     result = {
         "rawtransaction": unsigned_tx_hex,
@@ -1246,6 +1460,11 @@ CONSTRUCT_PARAMS = {
         "By default, UTXOs utilized when creating a transaction are 'locked' for a few seconds, to prevent a case where rapidly generating create_ calls reuse UTXOs due to their spent status not being updated in bitcoind yet. Specify true for this parameter to disable this behavior, and not temporarily lock UTXOs",
     ),
     "use_all_inputs_set": (bool, False, "Use all UTXOs provide with `inputs_set` parameter"),
+    "disable_compose_cache": (
+        bool,
+        False,
+        "By default, fee estimates and unspent lists are cached until the next block or a new mempool transaction from the source address. Specify true for this parameter to always query the backend",
+    ),
     # outputs parameters
     "multisig_pubkey": (
         str,
@@ -1,12 +1,18 @@
 # pylint: disable=too-many-lines
 
+import contextvars
 import json
+import threading
+import time
 import typing
+from collections import OrderedDict
 from typing import Literal
 
 from sentry_sdk import start_span as start_sentry_span
 
-from counterpartycore.lib.utils.helpers import divide
+from counterpartycore.lib.api.apimetrics import check_slow_query
+from counterpartycore.lib.utils.database import StateDBConnectionPool
+from counterpartycore.lib.utils.helpers import SingletonMeta, divide
 
 OrderStatus = Literal["all", "open", "expired", "filled", "cancelled"]
 OrderMatchesStatus = Literal["all", "pending", "completed", "expired"]
@@ -156,6 +162,28 @@ SUPPORTED_SORT_FIELDS = {
 
 ADDRESS_FIELDS = ["source", "address", "issuer", "destination"]
 
+ResultCount = Literal["true", "false", "estimate"]
+
+# tables with unconfirmed transactions: their counts change without new block
+UNCONFIRMED_TABLES = [
+    "mempool",
+    "mempool_transactions",
+    "all_transactions",
+    "all_transactions_with_status",
+]
+# unfiltered counts can be estimated with the State DB counters
+COUNTER_TABLES = {
+    "messages": ("events_count", "event"),
+    "transactions_with_status": ("transaction_types_count", "transaction_type"),
+}
+# `count=estimate` stops counting after this number of rows
+ESTIMATED_COUNT_LIMIT = 10000
+MAX_RESULT_COUNT_CACHE_SIZE = 10000
+
+# set by the API server for the current request
+RESULT_COUNT_MODE = contextvars.ContextVar("result_count_mode", default="true")
+RESULT_COUNT_BLOCK_INDEX = contextvars.ContextVar("result_count_block_index", default=None)
+
 
 class QueryResult:
     def __init__(self, result, next_cursor, table, result_count=None):
@@ -165,6 +193,94 @@ class QueryResult:
         self.table = table
 
 
+class ResultCountCache(metaclass=SingletonMeta):
+    """`result_count` of the paginated queries, memoized for one block."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.block_index = None
+        self.counts = OrderedDict()
+
+    def get(self, block_index, key):
+        with self.lock:
+            if block_index != self.block_index:
+                self.block_index = block_index
+                self.counts.clear()
+                return None
+            return self.counts.get(key)
+
+    def set(self, block_index, key, count):
+        with self.lock:
+            if block_index != self.block_index:
+                return
+            self.counts[key] = count
+            if len(self.counts) > MAX_RESULT_COUNT_CACHE_SIZE:
+                self.counts.popitem(last=False)
+
+
+def get_counter_values(table, where, select, group_by, wrap_where):
+    """
+    Returns the values to sum in the State DB counters ([] for all)
+    or None if the count can't be read from the counters.
+    """
+    if table not in COUNTER_TABLES or group_by or wrap_where is not None or "COUNT(" in select:
+        return None
+    counter_field = COUNTER_TABLES[table][1]
+    values = []
+    for where_dict in where:
+        # the `where` dicts are ORed: one without filter selects all the rows
+        if not where_dict:
+            return []
+        if list(where_dict.keys()) == [counter_field]:
+            values.append(where_dict[counter_field])
+        elif list(where_dict.keys()) == [f"{counter_field}__in"]:
+            values += where_dict[f"{counter_field}__in"]
+        else:
+            return None
+    return values
+
+
+def get_counter_count(table, values):
+    counter_table, counter_field = COUNTER_TABLES[table]
+    query = f"SELECT COALESCE(SUM(count), 0) AS count FROM {counter_table}"  # nosec B608  # noqa: S608
+    if values:
+        query += f" WHERE {counter_field} IN ({','.join(['?'] * len(values))})"
+    with StateDBConnectionPool().connection() as state_db:
+        return state_db.execute(query, values).fetchone()["count"]
+
+
+def get_result_count(db, table, count_from, bindings, counter_values=None):
+    count_mode = RESULT_COUNT_MODE.get()
+    if count_mode == "false":
+        return None
+
+    block_index = None if table in UNCONFIRMED_TABLES else RESULT_COUNT_BLOCK_INDEX.get()
+    cache_key = (db.filename, count_from, tuple(bindings))
+    if block_index is not None:
+        result_count = ResultCountCache().get(block_index, cache_key)
+        if result_count is not None:
+            return result_count
+
+    if count_mode == "estimate":
+        if counter_values is not None:
+            return get_counter_count(table, counter_values)
+        query_count = f"SELECT COUNT(*) AS count FROM (SELECT 1 FROM {count_from} LIMIT ?)"  # nosec B608  # noqa: S608
+        bindings = bindings + [ESTIMATED_COUNT_LIMIT]
+    else:
+        query_count = f"SELECT COUNT(*) AS count FROM {count_from}"  # nosec B608  # noqa: S608
+
+    with start_sentry_span(op="db.sql.execute", description=query_count) as sql_span:
+        sql_span.set_tag("db.system", "sqlite3")
+        start_time = time.perf_counter()
+        result_count = db.execute(query_count, bindings).fetchone()["count"]
+        check_slow_query(db, query_count, bindings, time.perf_counter() - start_time)
+
+    # estimated counts are never memoized
+    if block_index is not None and count_mode != "estimate":
+        ResultCountCache().set(block_index, cache_key, result_count)
+    return result_count
+
+
 def select_rows(
     db,
     table,
@@ -192,6 +308,8 @@ def select_rows(
     if isinstance(where, dict):
         where = [where]
 
+    counter_values = get_counter_values(table, where, select, group_by, wrap_where)
+
     bindings = []
 
     or_where = []
@@ -292,9 +410,9 @@ def select_rows(
         wrap_where_clause = " AND ".join(wrap_where_field)
         wrap_where_clause = f"WHERE {wrap_where_clause}"
         query = f"SELECT * FROM ({query}) {wrap_where_clause}"  # nosec B608  # noqa: S608 # nosec B608
-        query_count = f"SELECT COUNT(*) AS count FROM ({query_count}) {wrap_where_clause}"  # nosec B608  # noqa: S608 # nosec B608
+        count_from = f"({query_count}) {wrap_where_clause}"
     else:
-        query_count = f"SELECT COUNT(*) AS count FROM ({query_count})"  # nosec B608  # noqa: S608 # nosec B608
+        count_from = f"({query_count})"
 
     order_by = []
     if sort is not None:
@@ -324,13 +442,12 @@ def select_rows(
 
     with start_sentry_span(op="db.sql.execute", description=query) as sql_span:
         sql_span.set_tag("db.system", "sqlite3")
+        start_time = time.perf_counter()
         cursor.execute(query, bindings)
         result = cursor.fetchall()
+        check_slow_query(db, query, bindings, time.perf_counter() - start_time)
 
-    with start_sentry_span(op="db.sql.execute", description=query_count) as sql_span:
-        sql_span.set_tag("db.system", "sqlite3")
-        cursor.execute(query_count, bindings_count)
-        result_count = cursor.fetchone()["count"]
+    result_count = get_result_count(db, table, count_from, bindings_count, counter_values)
 
     if result and len(result) > limit:
         # Don't return a cursor when using sort or offset
@@ -3,8 +3,9 @@ import typing
 
 from docstring_parser import parse as parse_docstring
 
-from counterpartycore.lib.api import apiv1, compose, composer, healthz, queries
+from counterpartycore.lib.api import apimetrics, apiv1, compose, composer, healthz, queries
 from counterpartycore.lib.backend import bitcoind, electrs
+from counterpartycore.lib.monitors import parsestats
 
 
 def get_routes():
@@ -166,6 +167,7 @@ ALL_ROUTES = {
         compose.get_attach_estimate_xcp_fee,
         "compose",
     ),
+    "/v2/addresses/<address>/compose/batch": (compose.compose_batch, "compose"),
     "/v2/utxos/<utxo>/compose/detach": (compose.compose_detach, "compose"),
     "/v2/utxos/<utxo>/compose/movetoutxo": (compose.compose_movetoutxo, "compose"),
     "/v2/compose/attach/estimatexcpfees": (compose.get_attach_estimate_xcp_fee, "compose"),
@@ -264,6 +266,9 @@ ALL_ROUTES = {
     "/v2/mempool/transactions/<tx_hash>/events": (queries.get_mempool_events_by_tx_hash, "mempool"),
     ### /routes ###
     "/v2/routes": (get_routes, "routes"),
+    ### /debug ###
+    "/v2/debug/parse_stats": (parsestats.get_parse_stats, "debug"),
+    "/v2/debug/api_stats": (apimetrics.get_api_stats, "debug"),
     ### /healthz ###
     "/v2/healthz": (healthz.check_server_health, "healthz"),
     "/healthz": (healthz.check_server_health, "healthz"),
@@ -339,6 +344,18 @@ def prepare_route_args(function):
                 "category": "tertiary",
             }
         )
+    if "limit" in function_args:
+        args.append(
+            {
+                "name": "count",
+                "type": "enum[str]",
+                "members": list(typing.get_args(queries.ResultCount)),
+                "default": "true",
+                "description": "Return the total number of results (`true`), skip it (`false`) or return a cheap estimate (`estimate`).",
+                "required": False,
+                "category": "tertiary",
+            }
+        )
     return args
 
 
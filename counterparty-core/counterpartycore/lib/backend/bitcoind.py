@@ -1,15 +1,20 @@
 import binascii
+import bisect
 import functools
 import json
 import logging
+import os
 import re
+import threading
 import time
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from multiprocessing import current_process
 from threading import current_thread
 
 import requests
 from bitcoinutils.keys import PublicKey
+from requests.adapters import HTTPAdapter
 from requests.exceptions import (  # pylint: disable=redefined-builtin
     ChunkedEncodingError,
     ConnectionError,
@@ -21,6 +26,7 @@ from counterpartycore.lib import config, exceptions
 from counterpartycore.lib.api import composer
 from counterpartycore.lib.ledger.currentstate import CurrentState
 from counterpartycore.lib.parser import deserialize, utxosinfo
+from counterpartycore.lib.utils import helpers
 
 logger = logging.getLogger(config.LOGGER_NAME)
 
@@ -32,6 +38,9 @@ TRANSACTIONS_CACHE_MAX_SIZE = 10000
 
 URL_USERNAMEPASS_REGEX = re.compile(".+://(.+)@")
 
+# upper bounds (in seconds) of the RPC latency histograms buckets
+RPC_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
 
 def clean_url_for_log(url):
     m = URL_USERNAMEPASS_REGEX.match(url)
@@ -41,6 +50,107 @@ def clean_url_for_log(url):
     return url
 
 
+class RPCSession(metaclass=helpers.SingletonMeta):
+    """
+    HTTP session shared by all the threads of a process: connections to
+    Bitcoin Core are kept alive and reused between RPC calls.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.session = None
+        self.pid = None
+
+    def get(self):
+        with self.lock:
+            # never reuse the connections of the parent process after a fork
+            if self.session is None or self.pid != os.getpid():
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=config.BACKEND_RPC_POOL_SIZE)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                self.session = session
+                self.pid = os.getpid()
+            return self.session
+
+    def close(self):
+        with self.lock:
+            if self.session is not None and self.pid == os.getpid():
+                self.session.close()
+            self.session = None
+
+
+class RPCLatencyHistograms(metaclass=helpers.SingletonMeta):
+    """Latency histograms of the RPC calls to Bitcoin Core, by method."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+
+    def observe(self, method, elapsed):
+        with self.lock:
+            if method not in self.histograms:
+                self.histograms[method] = {
+                    "buckets": [0] * (len(RPC_LATENCY_BUCKETS) + 1),
+                    "count": 0,
+                    "sum": 0.0,
+                }
+            histogram = self.histograms[method]
+            histogram["buckets"][bisect.bisect_left(RPC_LATENCY_BUCKETS, elapsed)] += 1
+            histogram["count"] += 1
+            histogram["sum"] += elapsed
+
+    def get(self):
+        # cumulative buckets, like Prometheus histograms
+        result = {}
+        with self.lock:
+            for method, histogram in self.histograms.items():
+                buckets = {}
+                total = 0
+                for bound, count in zip(
+                    [*RPC_LATENCY_BUCKETS, "+Inf"], histogram["buckets"], strict=True
+                ):
+                    total += count
+                    buckets[str(bound)] = total
+                result[method] = {
+                    "buckets": buckets,
+                    "count": histogram["count"],
+                    "sum": histogram["sum"],
+                }
+        return result
+
+    def clear(self):
+        with self.lock:
+            self.histograms = {}
+
+
+def get_rpc_latency_histograms():
+    return RPCLatencyHistograms().get()
+
+
+def get_payload_method(payload):
+    if isinstance(payload, dict):
+        return payload["method"]
+    if isinstance(payload, list) and len(payload) > 0:
+        return payload[0]["method"]
+    return "unknown"
+
+
+def post_payload(payload):
+    return (
+        RPCSession()
+        .get()
+        .post(
+            config.BACKEND_URL,
+            data=json.dumps(payload),
+            headers={"content-type": "application/json"},
+            verify=(not config.BACKEND_SSL_NO_VERIFY),
+            timeout=config.REQUESTS_TIMEOUT,
+            auth=("__cookie__", config.BACKEND_COOKIE) if config.BACKEND_COOKIE else None,
+        )
+    )
+
+
 # for testing
 def should_retry():
     if CurrentState().stopping():
@@ -93,14 +203,7 @@ def rpc_call(payload, retry=0):
     while True:
         try:
             tries += 1
-            response = requests.post(
-                url,
-                data=json.dumps(payload),
-                headers={"content-type": "application/json"},
-                verify=(not config.BACKEND_SSL_NO_VERIFY),
-                timeout=config.REQUESTS_TIMEOUT,
-                auth=("__cookie__", config.BACKEND_COOKIE) if config.BACKEND_COOKIE else None,
-            )
+            response = post_payload(payload)
 
             if response is None:  # noqa: E711
                 raise exceptions.BitcoindRPCError(
@@ -178,14 +281,10 @@ def rpc_call(payload, retry=0):
     else:
         raise exceptions.BitcoindRPCError(response_json["error"]["message"])
 
+    method = get_payload_method(payload)
+    elapsed = time.time() - start_time
+    RPCLatencyHistograms().observe(method, elapsed)
     if hasattr(logger, "trace"):
-        if isinstance(payload, dict):
-            method = payload["method"]
-        elif isinstance(payload, list):
-            method = payload[0]["method"]
-        else:
-            method = "unknown"
-        elapsed = time.time() - start_time
         logger.trace(f"Bitcoin Core RPC call {method} took {elapsed:.3f}s")
 
     return result
@@ -217,16 +316,9 @@ def rpc(method, params, no_retry=False):
 
 def safe_rpc_payload(payload):
     start_time = time.time()
-    method = payload["method"] if isinstance(payload, dict) else payload[0]["method"]
+    method = get_payload_method(payload)
     try:
-        response = requests.post(
-            config.BACKEND_URL,
-            data=json.dumps(payload),
-            headers={"content-type": "application/json"},
-            verify=(not config.BACKEND_SSL_NO_VERIFY),
-            timeout=config.REQUESTS_TIMEOUT,
-            auth=("__cookie__", config.BACKEND_COOKIE) if config.BACKEND_COOKIE else None,
-        )
+        response = post_payload(payload)
         if response is None:
             raise exceptions.BitcoindRPCError(
                 f"Cannot communicate with Bitcoin Core at `{clean_url_for_log(config.BACKEND_URL)}`. (server is set to run on {config.NETWORK_NAME}, is backend?)"
@@ -249,6 +341,7 @@ def safe_rpc_payload(payload):
         raise exceptions.BitcoindRPCError(f"Error calling {method}: {str(e)}") from e
     finally:
         elapsed = time.time() - start_time
+        RPCLatencyHistograms().observe(method, elapsed)
         logger.trace(f"Bitcoin Core RPC call {method} took {elapsed:.3f}s")
 
 
@@ -294,12 +387,12 @@ def getrawtransaction_batch(tx_hashes, verbose=False, return_dict=False, no_retr
         return {}
 
     # Process transactions in batches of MAX_RPC_BATCH_SIZE
-    all_raw_transactions = {} if return_dict else []
-
-    for i in range(0, len(tx_hashes), config.MAX_RPC_BATCH_SIZE):
-        batch = tx_hashes[i : i + config.MAX_RPC_BATCH_SIZE]
-
-        payload = [
+    batches = [
+        tx_hashes[i : i + config.MAX_RPC_BATCH_SIZE]
+        for i in range(0, len(tx_hashes), config.MAX_RPC_BATCH_SIZE)
+    ]
+    payloads = [
+        [
             {
                 "method": "getrawtransaction",
                 "params": [tx_hash, 1 if verbose else 0],
@@ -308,12 +401,20 @@ def getrawtransaction_batch(tx_hashes, verbose=False, return_dict=False, no_retr
             }
             for j, tx_hash in enumerate(batch)
         ]
+        for batch in batches
+    ]
 
-        if no_retry:
-            batch_results = safe_rpc_payload(payload)
-        else:
-            batch_results = rpc_call(payload)
+    call = safe_rpc_payload if no_retry else rpc_call
+    num_workers = min(len(payloads), config.BACKEND_RPC_BATCH_NUM_WORKERS)
+    if num_workers <= 1:
+        batches_results = [call(payload) for payload in payloads]
+    else:
+        # batches are sent concurrently, `map` keeps the results in order
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            batches_results = list(executor.map(call, payloads))
 
+    all_raw_transactions = {} if return_dict else []
+    for batch, batch_results in zip(batches, batches_results, strict=True):
         # Process results for this batch
         if return_dict:
             for result in batch_results:
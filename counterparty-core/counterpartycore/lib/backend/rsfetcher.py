@@ -4,6 +4,7 @@ import queue
 import shutil
 import threading
 import time
+from collections.abc import MutableMapping
 from concurrent.futures import ThreadPoolExecutor
 
 from counterparty_rs import indexer  # pylint: disable=no-name-in-module
@@ -17,6 +18,19 @@ logger = logging.getLogger(config.LOGGER_NAME)
 WORKER_THREADS = 3
 PREFETCH_QUEUE_SIZE = 20
 
+TRANSACTION_FIELDS = (
+    "version",
+    "segwit",
+    "coinbase",
+    "lock_time",
+    "tx_id",
+    "tx_hash",
+    "vtxinwit",
+    "parsed_vouts",
+    "vin",
+    "vout",
+)
+
 
 def delete_database_directory():
     if os.path.isdir(config.FETCHER_DB_OLD):
@@ -28,6 +42,69 @@ def delete_database_directory():
         logger.debug("RSFetcher - Reset database at %s", config.FETCHER_DB)
 
 
+class LazyTransaction(MutableMapping):
+    """
+    Transaction of a `BlockView` returned by the Rust indexer. Behaves like the dict
+    returned by `get_block_non_blocking()` but each field is converted to a Python
+    object only on first access. Fields set from Python are stored in `fields`.
+    """
+
+    __slots__ = ("block_view", "index", "fields")
+
+    def __init__(self, block_view, index):
+        self.block_view = block_view
+        self.index = index
+        self.fields = {}
+
+    def __getitem__(self, key):
+        try:
+            return self.fields[key]
+        except KeyError:
+            if self.block_view is None or key not in TRANSACTION_FIELDS:
+                raise
+        value = self.block_view.transaction_field(self.index, key)
+        self.fields[key] = value
+        return value
+
+    def __setitem__(self, key, value):
+        self.fields[key] = value
+
+    def __delitem__(self, key):
+        self.materialize()
+        del self.fields[key]
+
+    def __contains__(self, key):
+        return key in self.fields or (self.block_view is not None and key in TRANSACTION_FIELDS)
+
+    def __iter__(self):
+        yield from list(self.fields)
+        if self.block_view is not None:
+            yield from [key for key in TRANSACTION_FIELDS if key not in self.fields]
+
+    def __len__(self):
+        return len(list(iter(self)))
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+    def materialize(self):
+        # convert all the remaining fields and release the block view
+        if self.block_view is None:
+            return
+        for key in TRANSACTION_FIELDS:
+            if key not in self.fields:
+                self.fields[key] = self.block_view.transaction_field(self.index, key)
+        self.block_view = None
+
+
+def block_from_view(block_view):
+    block = block_view.header()
+    block["transactions"] = [
+        LazyTransaction(block_view, index) for index in range(block_view.transaction_count())
+    ]
+    return block
+
+
 class RSFetcher(metaclass=helpers.SingletonMeta):
     thread_index_counter = 0  # Add a thread index counter
 
@@ -78,6 +155,8 @@ class RSFetcher(metaclass=helpers.SingletonMeta):
         self.prefetch_queue = queue.Queue(maxsize=PREFETCH_QUEUE_SIZE)
         self.prefetch_queue_initialized = False
         self.next_height = 0
+        # called on each block in the prefetch thread, before it is queued
+        self.prepare_block = None
 
     def start(self, start_height=0):
         logger.info("Starting RSFetcher thread...")
@@ -151,9 +230,17 @@ class RSFetcher(metaclass=helpers.SingletonMeta):
         retry = 0
         while not self.stopped_event.is_set():
             try:
-                block = self.fetcher.get_block_non_blocking()
+                # keep decoded blocks on the Rust side and convert fields on demand
+                if config.LAZY_BLOCKS:
+                    block = self.fetcher.get_block_view_non_blocking()
+                    if block is not None:
+                        block = block_from_view(block)
+                else:
+                    block = self.fetcher.get_block_non_blocking()
                 if block is not None:
                     retry = 0
+                    if self.prepare_block is not None:
+                        self.prepare_block(block)
                     while not self.stopped_event.is_set():
                         try:
                             self.prefetch_queue.put(block, timeout=1)
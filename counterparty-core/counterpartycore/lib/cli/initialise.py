@@ -116,6 +116,7 @@ def initialise_config(
     api_no_allow_cors=False,
     force=False,
     requests_timeout=config.DEFAULT_REQUESTS_TIMEOUT,
+    backend_rpc_pool_size=config.DEFAULT_BACKEND_RPC_POOL_SIZE,
     rpc_batch_size=config.DEFAULT_RPC_BATCH_SIZE,
     skip_asset_conservation_check=False,
     backend_ssl_verify=None,
@@ -128,6 +129,8 @@ def initialise_config(
     no_telemetry=False,
     enable_zmq_publisher=False,
     zmq_publisher_port=None,
+    event_queue_size=config.DEFAULT_EVENT_QUEUE_SIZE,
+    event_queue_overflow=config.DEFAULT_EVENT_QUEUE_OVERFLOW,
     db_connection_pool_size=config.DEFAULT_DB_CONNECTION_POOL_SIZE,
     db_max_connections=config.DEFAULT_DB_MAX_CONNECTIONS,
     wsgi_server=None,
@@ -140,6 +143,7 @@ def initialise_config(
     profile=False,
     memory_profile=False,
     enable_all_protocol_changes=False,
+    lazy_blocks=False,
 ):
     # log config already initialized
 
@@ -210,6 +214,10 @@ def initialise_config(
 
     config.FETCHER_DB_OLD = os.path.join(os.path.dirname(config.DATABASE), f"fetcherdb{network}")
     config.FETCHER_DB = os.path.join(config.CACHE_DIR, f"fetcherdb{network}")
+    config.API_CACHE_DATABASE = os.path.join(config.CACHE_DIR, f"apicache{network}.db")
+    config.API_METRICS_DATABASE = os.path.join(config.CACHE_DIR, f"apimetrics{network}.db")
+    config.UTXO_LOCKS_DATABASE = os.path.join(config.CACHE_DIR, f"utxolocks{network}.db")
+    config.PARSE_STATS_DATABASE = os.path.join(config.CACHE_DIR, f"parsestats{network}.db")
 
     config.STATE_DATABASE = os.path.join(os.path.dirname(config.DATABASE), f"state{network}.db")
 
@@ -443,6 +451,14 @@ def initialise_config(
             "Please specific a valid port number rpc-port configuration parameter"
         ) from e
 
+    # Event queue
+    if event_queue_size < 0:
+        raise exceptions.ConfigurationError("invalid event queue size")
+    config.EVENT_QUEUE_SIZE = event_queue_size
+    if event_queue_overflow not in config.EVENT_QUEUE_OVERFLOW_POLICIES:
+        raise exceptions.ConfigurationError("invalid event queue overflow policy")
+    config.EVENT_QUEUE_OVERFLOW = event_queue_overflow
+
     # Server API user
     if api_user:
         config.API_USER = api_user
@@ -513,6 +529,7 @@ def initialise_config(
     # Misc
     config.P2SH_DUST_RETURN_PUBKEY = p2sh_dust_return_pubkey
     config.REQUESTS_TIMEOUT = requests_timeout
+    config.BACKEND_RPC_POOL_SIZE = backend_rpc_pool_size
     config.CHECK_ASSET_CONSERVATION = not skip_asset_conservation_check
     config.UTXO_LOCKS_MAX_ADDRESSES = utxo_locks_max_addresses
     config.UTXO_LOCKS_MAX_AGE = utxo_locks_max_age
@@ -551,6 +568,7 @@ def initialise_config(
     config.PROFILE = profile
     config.MEMORY_PROFILE = memory_profile
     config.ENABLE_ALL_PROTOCOL_CHANGES = enable_all_protocol_changes
+    config.LAZY_BLOCKS = lazy_blocks
 
 
 def initialise_log_and_config(args, api=False, log_stream=None):
@@ -581,6 +599,7 @@ def initialise_log_and_config(args, api=False, log_stream=None):
         "api_password": args.api_password,
         "api_no_allow_cors": args.api_no_allow_cors,
         "requests_timeout": args.requests_timeout,
+        "backend_rpc_pool_size": args.backend_rpc_pool_size,
         "rpc_batch_size": args.rpc_batch_size,
         "skip_asset_conservation_check": args.skip_asset_conservation_check,
         "force": args.force,
@@ -591,6 +610,8 @@ def initialise_log_and_config(args, api=False, log_stream=None):
         "no_telemetry": args.no_telemetry,
         "enable_zmq_publisher": args.enable_zmq_publisher,
         "zmq_publisher_port": args.zmq_publisher_port,
+        "event_queue_size": args.event_queue_size,
+        "event_queue_overflow": args.event_queue_overflow,
         "db_connection_pool_size": args.db_connection_pool_size,
         "db_max_connections": args.db_max_connections,
         "wsgi_server": args.wsgi_server,
@@ -602,6 +623,7 @@ def initialise_log_and_config(args, api=False, log_stream=None):
         "profile": args.profile,
         "memory_profile": args.memory_profile,
         "enable_all_protocol_changes": args.enable_all_protocol_changes,
+        "lazy_blocks": args.lazy_blocks,
     }
     # for tests
     if "database_file" in args:
@@ -1,5 +1,7 @@
+import atexit
 import decimal
 import logging
+import queue
 import sys
 import threading
 import time
@@ -64,7 +66,8 @@ def get_full_topic(record):
     process_name = "Ledger"
     if current_process().name != "MainProcess":
         process_name = "API"
-    thread_name = threading.current_thread().name
+    # the thread that created the record, not the one emitting it (see `EventPublisher`)
+    thread_name = record.threadName or threading.current_thread().name
     if thread_name == "MainThread":
         thread_name = "Main"
     topic = getattr(record, "topic", None)
@@ -328,27 +331,158 @@ def truncate_fields(bindings):
     return truncated_bindings
 
 
-def log_event(block_index, event_index, event_name, bindings):
-    block_name = "Mempool" if CurrentState().parsing_mempool() else f"Block {block_index}"
-    log_bindings = truncate_fields(bindings)
-    log_bindings = " ".join([f"{key}={value}" for key, value in log_bindings.items()])
-    log_message = f"{block_name} - {event_name} [{log_bindings}]"
-    logger.event(
-        log_message,
+class EventBindings:
+    """Bindings of an event, truncated and formatted only when a handler emits the record."""
+
+    def __init__(self, bindings):
+        self.bindings = bindings
+
+    def __str__(self):
+        log_bindings = truncate_fields(self.bindings)
+        return " ".join([f"{key}={value}" for key, value in log_bindings.items()])
+
+
+def make_event_record(block_index, event_name, bindings, parsing_mempool):
+    block_name = "Mempool" if parsing_mempool else f"Block {block_index}"
+    return logger.makeRecord(
+        logger.name,
+        logging.EVENT,
+        __file__,
+        0,
+        "%s - %s [%s]",
+        (block_name, event_name, EventBindings(bindings)),
+        None,
+        func="log_event",
         extra={"event": {"name": event_name, "block_index": block_index, **bindings}},
     )
-    # Publish event to ZMQ
+
+
+def make_zmq_event(block_index, event_index, event_name, bindings, parsing_mempool):
+    zmq_event = {
+        "event": event_name,
+        "params": bindings,
+        "mempool": parsing_mempool,
+    }
+    if not parsing_mempool:
+        zmq_event["block_index"] = block_index
+        zmq_event["event_index"] = event_index
+    return zmq_event
+
+
+def log_event(block_index, event_index, event_name, bindings):
+    log_enabled = logger.isEnabledFor(logging.EVENT)
+    if not log_enabled and not config.ENABLE_ZMQ_PUBLISHER:
+        return
+
+    parsing_mempool = CurrentState().parsing_mempool()
+    if config.EVENT_QUEUE_SIZE > 0:
+        # the caller may reuse the bindings after the event is queued
+        bindings = bindings.copy()
+    record = None
+    if log_enabled:
+        record = make_event_record(block_index, event_name, bindings, parsing_mempool)
+    zmq_event = None
     if config.ENABLE_ZMQ_PUBLISHER:
-        zmq_publisher = ZmqPublisher()
-        zmq_event = {
-            "event": event_name,
-            "params": bindings,
-            "mempool": CurrentState().parsing_mempool(),
+        zmq_event = make_zmq_event(block_index, event_index, event_name, bindings, parsing_mempool)
+
+    if config.EVENT_QUEUE_SIZE > 0:
+        EventPublisher().put(record, zmq_event)
+    else:
+        EventPublisher.publish(record, zmq_event)
+
+
+class EventPublisher(metaclass=helpers.SingletonMeta):
+    """
+    Log the events and publish them to ZeroMQ from a background thread, in the
+    order they are inserted in the journal. Records are created by the caller
+    so that their time and thread are those of the event.
+    """
+
+    def __init__(self):
+        self.queue = queue.Queue(maxsize=config.EVENT_QUEUE_SIZE)
+        self.overflow_policy = config.EVENT_QUEUE_OVERFLOW
+        self.max_depth = 0
+        self.dropped_count = 0
+        if config.ENABLE_ZMQ_PUBLISHER:
+            # bind the socket here to fail early
+            ZmqPublisher()
+        self.thread = threading.Thread(target=self.run, name="EventPublisher", daemon=True)
+        self.thread.start()
+        # commands like `reparse` exit without stopping the server
+        atexit.register(self.stop)
+
+    @staticmethod
+    def publish(record, zmq_event):
+        if record is not None:
+            logger.handle(record)
+        if zmq_event is not None:
+            ZmqPublisher().publish_event(zmq_event)
+
+    def put(self, record, zmq_event):
+        if self.overflow_policy == "block":
+            self.queue.put((record, zmq_event))
+        else:
+            try:
+                self.queue.put_nowait((record, zmq_event))
+            except queue.Full:
+                self.dropped_count += 1
+                if self.overflow_policy == "drop-oldest":
+                    try:
+                        self.queue.get_nowait()
+                        self.queue.task_done()
+                        self.queue.put_nowait((record, zmq_event))
+                    except (queue.Empty, queue.Full):
+                        pass
+        self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                if item is None:
+                    return
+                self.publish(*item)
+            except Exception as e:  # pylint: disable=broad-except
+                # a failing handler or socket must not stop the publication of the next events
+                logger.error("Error publishing event: %s", e)
+            finally:
+                self.queue.task_done()
+
+    def get_stats(self):
+        return {
+            "depth": self.queue.qsize(),
+            "max_depth": self.max_depth,
+            "dropped": self.dropped_count,
         }
-        if not CurrentState().parsing_mempool():
-            zmq_event["block_index"] = block_index
-            zmq_event["event_index"] = event_index
-        zmq_publisher.publish_event(zmq_event)
+
+    def stop(self, timeout=10):
+        if not self.thread.is_alive():
+            return
+        # queued events are published before the sentinel
+        self.queue.put(None)
+        self.thread.join(timeout=timeout)
+        if self.thread.is_alive():
+            logger.warning("Event publisher thread did not stop in time, continuing...")
+
+
+def get_event_publisher():
+    """Returns None until the first event is queued: the publisher thread is not started"""
+    return EventPublisher._instances.get(EventPublisher)  # pylint: disable=protected-access
+
+
+def get_event_publisher_stats():
+    publisher = get_event_publisher()
+    if publisher is None:
+        return None
+    return publisher.get_stats()
+
+
+def stop_event_publisher():
+    publisher = get_event_publisher()
+    if publisher is not None:
+        publisher.stop()
+        # the next events will be published by a new thread
+        EventPublisher.reset_instance()
 
 
 class Spinner:
@@ -391,6 +525,7 @@ class Spinner:
 
 def shutdown():
     logger.info("Shutting down logging...")
+    stop_event_publisher()
     logging.shutdown()
 
 
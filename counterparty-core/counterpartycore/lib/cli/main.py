@@ -10,7 +10,7 @@ from counterpartycore.lib import config
 from counterpartycore.lib.api import dbbuilder
 from counterpartycore.lib.cli import bootstrap, server, setup
 from counterpartycore.lib.cli.initialise import initialise_log_and_config
-from counterpartycore.lib.monitors import sentry
+from counterpartycore.lib.monitors import parsestats, sentry
 
 logger = logging.getLogger(config.LOGGER_NAME)
 
@@ -237,6 +237,14 @@ CONFIG_ARGS = [
             "help": "timeout value (in seconds) used for all HTTP requests (default: 5)",
         },
     ],
+    [
+        ("--backend-rpc-pool-size",),
+        {
+            "type": int,
+            "default": config.DEFAULT_BACKEND_RPC_POOL_SIZE,
+            "help": "maximum number of keep-alive connections to the backend per process",
+        },
+    ],
     [
         ("--force",),
         {
@@ -326,6 +334,22 @@ CONFIG_ARGS = [
             "help": "port on which Counterparty server will publish ZeroMQ notificiations for every event",
         },
     ],
+    [
+        ("--event-queue-size",),
+        {
+            "type": int,
+            "default": config.DEFAULT_EVENT_QUEUE_SIZE,
+            "help": "max number of events waiting to be logged and published by the background thread (0 to log and publish them synchronously)",
+        },
+    ],
+    [
+        ("--event-queue-overflow",),
+        {
+            "default": config.DEFAULT_EVENT_QUEUE_OVERFLOW,
+            "choices": config.EVENT_QUEUE_OVERFLOW_POLICIES,
+            "help": "what to do with a new event when the event queue is full",
+        },
+    ],
     [
         ("--db-connection-pool-size",),
         {
@@ -447,6 +471,14 @@ CONFIG_ARGS = [
             "help": "Enable all protocol changes. For testing only.",
         },
     ],
+    [
+        ("--lazy-blocks",),
+        {
+            "action": "store_true",
+            "default": False,
+            "help": "Convert the blocks decoded by the Rust fetcher to Python objects on demand (experimental)",
+        },
+    ],
 ]
 
 
@@ -563,6 +595,17 @@ def arg_parser(no_config_file=False, app_name=APP_NAME):
     )
     setup.add_config_arguments(parser_show_config, CONFIG_ARGS, configfile)
 
+    parser_parse_stats = subparsers.add_parser(
+        "parse-stats", help="Show the time spent by the parser on the last parsed blocks"
+    )
+    parser_parse_stats.add_argument(
+        "--blocks", type=int, default=100, help="the number of last parsed blocks to summarize"
+    )
+    parser_parse_stats.add_argument(
+        "--top", type=int, default=10, help="the number of slowest blocks to show"
+    )
+    setup.add_config_arguments(parser_parse_stats, CONFIG_ARGS, configfile)
+
     return parser
 
 
@@ -620,5 +663,8 @@ def main():
     elif args.action == "build-state-db":
         dbbuilder.build_state_db()
 
+    elif args.action == "parse-stats":
+        parsestats.print_report(blocks=args.blocks, top=args.top)
+
     else:
         parser.print_help()
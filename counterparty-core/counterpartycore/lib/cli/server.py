@@ -33,6 +33,10 @@ D = decimal.Decimal
 OK_GREEN = colored("[OK]", "green")
 SPINNER_STYLE = "bouncingBar"
 
+ASSET_CONSERVATION_AUDIT_INTERVAL = 60 * 60 * 12
+# beyond this number of new blocks, they are left to the audit
+ASSET_CONSERVATION_MAX_BLOCKS_BEHIND = 10
+
 
 def ensure_backend_is_up():
     if not config.FORCE:
@@ -44,21 +48,49 @@ class AssetConservationChecker(threading.Thread):
         threading.Thread.__init__(self, name="AssetConservationChecker")
         self.daemon = True
         self.last_check = 0
+        # last asset checked by an interrupted audit
+        self.audit_from_asset = None
+        self.last_checked_block = None
         self.db = None
         self.stop_event = threading.Event()
 
+    def check_new_blocks(self):
+        last_block_index = ledger.blocks.last_db_index(self.db)
+        # on first run, after a rollback or while catching up, skip to the last block:
+        # these blocks are covered by the audit
+        if (
+            self.last_checked_block is None
+            or last_block_index < self.last_checked_block
+            or last_block_index - self.last_checked_block > ASSET_CONSERVATION_MAX_BLOCKS_BEHIND
+        ):
+            self.last_checked_block = last_block_index
+            return
+        for block_index in range(self.last_checked_block + 1, last_block_index + 1):
+            if self.stop_event.is_set():
+                return
+            check.asset_conservation_in_block(self.db, block_index)
+            self.last_checked_block = block_index
+
     def run(self):
         self.db = database.get_db_connection(config.DATABASE, read_only=True, check_wal=False)
         while not self.stop_event.is_set():
-            if time.time() - self.last_check > 60 * 60 * 12:
-                try:
-                    check.asset_conservation(self.db, self.stop_event)
-                except exceptions.SanityError as e:
-                    logger.error("Asset conservation check failed: %s", e)
-                    _thread.interrupt_main()
-                except apsw.InterruptError:
-                    break
+            try:
+                self.check_new_blocks()
+                if time.time() - self.last_check > ASSET_CONSERVATION_AUDIT_INTERVAL:
+                    self.audit_from_asset = check.asset_conservation_audit(
+                        self.db, self.audit_from_asset, self.stop_event
+                    )
+                    if self.audit_from_asset is None:
+                        self.last_check = time.time()
+            except exceptions.SanityError as e:
+                logger.error("Asset conservation check failed: %s", e)
+                _thread.interrupt_main()
+                # don't report the same error again
+                self.last_checked_block = None
+                self.audit_from_asset = None
                 self.last_check = time.time()
+            except apsw.InterruptError:
+                break
             time.sleep(1)
 
     def stop(self):
@@ -88,6 +120,7 @@ class CounterpartyServer(threading.Thread):
         self.asset_conservation_checker = None
         self.db = None
         self.api_stop_event = None
+        self.ledger_updated_event = None
         self.backend_height_thread = None
         self.log_stream = log_stream
         self.periodic_profiler = None
@@ -137,6 +170,15 @@ class CounterpartyServer(threading.Thread):
                             state_stats["utilization"],
                             state_stats["peak"],
                         )
+                        event_stats = log.get_event_publisher_stats()
+                        if event_stats is not None:
+                            logger.info(
+                                "EVENT_QUEUE depth=%d/%d (peak=%d) dropped=%d",
+                                event_stats["depth"],
+                                config.EVENT_QUEUE_SIZE,
+                                event_stats["max_depth"],
+                                event_stats["dropped"],
+                            )
                     except Exception as e:
                         logger.error("Error logging MainProcess pool stats: %s", e)
 
@@ -182,8 +224,13 @@ class CounterpartyServer(threading.Thread):
 
         # API Server v2
         self.api_stop_event = multiprocessing.Event()
+        # set by the ledger after each commit to wake up the API Watcher
+        self.ledger_updated_event = multiprocessing.Event()
+        CurrentState().set_ledger_updated_event(self.ledger_updated_event)
         self.apiserver_v2 = api_v2.APIServer(
-            self.api_stop_event, self.backend_height_thread.shared_backend_height
+            self.api_stop_event,
+            self.backend_height_thread.shared_backend_height,
+            self.ledger_updated_event,
         )
         self.apiserver_v2.start(self.args, self.log_stream)
         while not self.apiserver_v2.is_ready():
@@ -259,6 +306,8 @@ class CounterpartyServer(threading.Thread):
         # Ensure all threads are stopped
         if self.follower_daemon:
             self.follower_daemon.stop()
+        # publish the events still in the queue
+        log.stop_event_publisher()
         if self.asset_conservation_checker:
             self.asset_conservation_checker.stop()
         if self.backend_height_thread:
@@ -211,6 +211,7 @@ DEFAULT_FEE_FRACTION_PROVIDED = 0.01  # 1.00%
 DEFAULT_REQUESTS_TIMEOUT = 20  # 20 seconds
 DEFAULT_RPC_BATCH_SIZE = 20  # A 1 MB block can hold about 4200 transactions.
 MAX_RPC_BATCH_SIZE = 100  # Maximum number of transactions to send in a single RPC call.
+DEFAULT_BACKEND_RPC_POOL_SIZE = 10  # Keep-alive connections to the backend per process.
 
 # Custom exit codes
 EXITCODE_UPDATE_REQUIRED = 5
@@ -292,6 +293,10 @@ INFLUX_DB_BUCKET = "node-telemetry"
 
 LOG_IN_CONSOLE = False
 
+DEFAULT_EVENT_QUEUE_SIZE = 10000  # 0 = log and publish the events synchronously
+DEFAULT_EVENT_QUEUE_OVERFLOW = "block"
+EVENT_QUEUE_OVERFLOW_POLICIES = ["block", "drop-newest", "drop-oldest"]
+
 DEFAULT_DB_CONNECTION_POOL_SIZE = 10
 # Maximum total connections across all threads (0 = unlimited)
 DEFAULT_DB_MAX_CONNECTIONS = 50
@@ -306,4 +311,16 @@ PROFILE_INTERVAL_MINUTES = 15
 
 CURRENT_COMMIT = "Unknown"
 ENABLE_ALL_PROTOCOL_CHANGES = False
+# experimental, requires `BlockView` support in counterparty-rs
+LAZY_BLOCKS = False
 DISABLE_API_CACHE = False
+# maximum size of the serialized responses in the API cache (bytes)
+API_CACHE_MAX_SIZE = 256 * 1024 * 1024
+API_CACHE_DATABASE = None
+API_METRICS_DATABASE = None
+UTXO_LOCKS_DATABASE = None
+# API queries slower than this are logged with their query plan (milliseconds, 0 to disable)
+API_SLOW_QUERY_THRESHOLD = 1000
+PARSE_STATS_DATABASE = None
+# number of blocks kept in the parse stats database
+PARSE_STATS_HISTORY_SIZE = 10000
@@ -1,7 +1,7 @@
 import logging
 
 from counterpartycore.lib import config, exceptions
-from counterpartycore.lib.ledger.caches import UTXOBalancesCache
+from counterpartycore.lib.ledger.caches import BalancesCache, UTXOBalancesCache
 from counterpartycore.lib.parser import protocol, utxosinfo
 
 logger = logging.getLogger(config.LOGGER_NAME)
@@ -9,27 +9,39 @@ logger = logging.getLogger(config.LOGGER_NAME)
 
 def get_balance(db, address, asset, raise_error_if_no_balance=False, return_list=False):
     """Get balance of contract or address."""
-    cursor = db.cursor()
+    balances_cache = BalancesCache()
+    use_cache = not return_list and balances_cache.enabled(db)
 
-    field_name = "address"
-    if protocol.enabled("utxo_support") and utxosinfo.is_utxo_format(address):
-        field_name = "utxo"
+    found = False
+    if use_cache:
+        found, quantity = balances_cache.get(address, asset)
 
-    query = f"""
-        SELECT * FROM balances
-        WHERE ({field_name} = ? AND asset = ?)
-        ORDER BY rowid DESC LIMIT 1
-    """  # noqa: S608 # nosec B608
-    bindings = (address, asset)
-    balances = list(cursor.execute(query, bindings))
-    cursor.close()
-    if return_list:
-        return balances
-    if not balances and raise_error_if_no_balance:
+    if not found:
+        cursor = db.cursor()
+
+        field_name = "address"
+        if protocol.enabled("utxo_support") and utxosinfo.is_utxo_format(address):
+            field_name = "utxo"
+
+        query = f"""
+            SELECT * FROM balances
+            WHERE ({field_name} = ? AND asset = ?)
+            ORDER BY rowid DESC LIMIT 1
+        """  # noqa: S608 # nosec B608
+        bindings = (address, asset)
+        balances = list(cursor.execute(query, bindings))
+        cursor.close()
+        if return_list:
+            return balances
+        quantity = balances[0]["quantity"] if balances else None
+        if use_cache:
+            balances_cache.set(address, asset, quantity)
+
+    if quantity is None and raise_error_if_no_balance:
         raise exceptions.BalanceError(f"No balance for this address and asset: {address}, {asset}.")
-    if not balances:
+    if quantity is None:
         return 0
-    return balances[0]["quantity"]
+    return quantity
 
 
 def utxo_has_balance(db, utxo):
@@ -62,6 +74,30 @@ def get_utxo_balances(db, utxo: str):
     return get_address_balances(db, utxo)
 
 
+def get_utxos_with_balances(db, utxos):
+    """Returns the UTXOs of `utxos` with a positive balance, in a single query"""
+    if len(utxos) == 0 or not protocol.enabled("utxo_support"):
+        return set()
+    cursor = db.cursor()
+    # temporary tables are private to the connection and writable on read-only connections
+    cursor.execute("CREATE TEMP TABLE IF NOT EXISTS checked_utxos (utxo TEXT PRIMARY KEY)")
+    cursor.execute("DELETE FROM checked_utxos")
+    cursor.executemany(
+        "INSERT OR IGNORE INTO checked_utxos (utxo) VALUES (?)", [(utxo,) for utxo in utxos]
+    )
+    # same as `get_utxo_balances()`: last quantity of each asset
+    cursor.execute("""
+        SELECT DISTINCT utxo FROM (
+            SELECT balances.utxo AS utxo, asset, quantity, MAX(balances.rowid)
+            FROM balances JOIN checked_utxos ON balances.utxo = checked_utxos.utxo
+            GROUP BY balances.utxo, asset
+        ) WHERE quantity > 0
+    """)
+    utxos_with_balances = {row["utxo"] for row in cursor.fetchall()}
+    cursor.execute("DELETE FROM checked_utxos")
+    return utxos_with_balances
+
+
 def get_address_assets(db, address):
     cursor = db.cursor()
 
@@ -1,3 +1,5 @@
+import bisect
+import fractions
 import logging
 import time
 
@@ -42,11 +44,11 @@ class AssetCache(metaclass=helpers.SingletonMeta):
             WHERE status = 'valid'
             GROUP BY asset
         """
-        cursor.execute(sql)
-        all_counts = cursor.fetchall()
+        tuple_cursor = database.tuple_cursor(db)
+        tuple_cursor.execute(sql)
         self.assets_total_issued = {}
-        for count in all_counts:
-            self.assets_total_issued[count["asset"]] = count["total"]
+        for total, asset in tuple_cursor:
+            self.assets_total_issued[asset] = total
         # asset total destroyed - load fully (needed for supply calculations)
         sql = """
             SELECT SUM(quantity) AS total, asset
@@ -54,11 +56,10 @@ class AssetCache(metaclass=helpers.SingletonMeta):
             WHERE status = 'valid'
             GROUP BY asset
         """
-        cursor.execute(sql)
-        all_counts = cursor.fetchall()
+        tuple_cursor.execute(sql)
         self.assets_total_destroyed = {}
-        for count in all_counts:
-            self.assets_total_destroyed[count["asset"]] = count["total"]
+        for total, asset in tuple_cursor:
+            self.assets_total_destroyed[asset] = total
 
         logger.debug(
             "Asset cache initialised in %.2f seconds (loaded=%d assets)",
@@ -123,21 +124,20 @@ class UTXOBalancesCache(metaclass=helpers.SingletonMeta):
         self.utxos_with_balance = {}
 
         cursor = db.cursor()
+        tuple_cursor = database.tuple_cursor(db)
 
         # Load UTXOs with balance from the balances table
         sql = "SELECT utxo, asset, quantity, MAX(rowid) FROM balances WHERE utxo IS NOT NULL GROUP BY utxo, asset"
-        cursor.execute(sql)
-        utxo_balances = cursor.fetchall()
-        for utxo_balance in utxo_balances:
-            self.utxos_with_balance[utxo_balance["utxo"]] = True
+        tuple_cursor.execute(sql)
+        for utxo, _asset, _quantity, _rowid in tuple_cursor:
+            self.utxos_with_balance[utxo] = True
 
         # Add destinations from invalid attachs
         # (see gettxinfo.update_utxo_balances_cache())
         sql = "SELECT tx_hash, utxos_info FROM transactions_with_status WHERE valid IS FALSE AND transaction_type = ?"
-        cursor.execute(sql, ("attach",))
-        invalid_attach_transactions = cursor.fetchall()
-        for transaction in invalid_attach_transactions:
-            utxos_info = transaction["utxos_info"].split(" ")
+        tuple_cursor.execute(sql, ("attach",))
+        for _tx_hash, transaction_utxos_info in tuple_cursor.fetchall():
+            utxos_info = transaction_utxos_info.split(" ")
             if len(utxos_info) >= 2 and utxos_info[1] != "":
                 self.utxos_with_balance[utxos_info[1]] = True
 
@@ -252,39 +252,73 @@ class UTXOBalancesCache(metaclass=helpers.SingletonMeta):
             helpers.SingletonMeta._instances[cls].cleanup_spent_utxos()
 
 
+ORDER_FIELDS = (
+    "tx_index",
+    "tx_hash",
+    "block_index",
+    "source",
+    "give_asset",
+    "give_quantity",
+    "give_remaining",
+    "get_asset",
+    "get_quantity",
+    "get_remaining",
+    "expiration",
+    "expire_index",
+    "fee_required",
+    "fee_required_remaining",
+    "fee_provided",
+    "fee_provided_remaining",
+    "status",
+)
+
+
+class OrderBook:
+    """
+    Open orders of one (give_asset, get_asset) pair, kept sorted by
+    (tx_index, tx_hash) and by (price, tx_index, tx_hash).
+    """
+
+    def __init__(self):
+        self.by_tx_index = []
+        self.by_price = []
+
+    @staticmethod
+    def keys(order):
+        # exact rational price, like `ledger.issuances.price()` with `price_as_fraction`
+        price = fractions.Fraction(order["get_quantity"], order["give_quantity"])
+        return (
+            (order["tx_index"], order["tx_hash"]),
+            (price, order["tx_index"], order["tx_hash"]),
+        )
+
+    def add(self, order):
+        tx_index_key, price_key = self.keys(order)
+        bisect.insort(self.by_tx_index, tx_index_key)
+        bisect.insort(self.by_price, price_key)
+
+    def remove(self, order):
+        for keys, key in zip((self.by_tx_index, self.by_price), self.keys(order), strict=True):
+            position = bisect.bisect_left(keys, key)
+            if position < len(keys) and keys[position] == key:
+                del keys[position]
+
+    def __len__(self):
+        return len(self.by_tx_index)
+
+
 class OrdersCache(metaclass=helpers.SingletonMeta):
+    """
+    Non-expired orders, with the open ones indexed in one `OrderBook` per pair,
+    and for each order the hashes of the orders it was already matched with.
+    """
+
     def __init__(self, db) -> None:
         logger.debug("Initialising orders cache...")
         self.last_cleaning_block_index = 0
-        self.cache_db = database.get_db_connection(":memory:", read_only=False, check_wal=False)
-        cache_cursor = self.cache_db.cursor()
-        create_orders_query = """
-            CREATE TABLE IF NOT EXISTS orders(
-            tx_index INTEGER,
-            tx_hash TEXT,
-            block_index INTEGER,
-            source TEXT,
-            give_asset TEXT,
-            give_quantity INTEGER,
-            give_remaining INTEGER,
-            get_asset TEXT,
-            get_quantity INTEGER,
-            get_remaining INTEGER,
-            expiration INTEGER,
-            expire_index INTEGER,
-            fee_required INTEGER,
-            fee_required_remaining INTEGER,
-            fee_provided INTEGER,
-            fee_provided_remaining INTEGER,
-            status TEXT)
-        """
-        cache_cursor.execute(create_orders_query)
-        cache_cursor.execute(
-            "CREATE INDEX IF NOT EXISTS orders_expire_index_idx ON orders (tx_hash)"
-        )
-        cache_cursor.execute(
-            "CREATE INDEX IF NOT EXISTS orders_get_asset_give_asset_idx ON orders (get_asset, give_asset, status)"
-        )
+        self.orders = {}
+        self.books = {}
+        self.matched_orders = {}
 
         select_orders_query = """
             SELECT * FROM (
@@ -297,70 +331,182 @@ class OrdersCache(metaclass=helpers.SingletonMeta):
             db_cursor.execute(select_orders_query)
             for order in db_cursor:
                 self.insert_order(order)
+            db_cursor.execute("SELECT DISTINCT tx0_hash, tx1_hash FROM order_matches")
+            for order_match in db_cursor:
+                self.insert_order_match(order_match)
         self.clean_filled_orders()
 
     def clean_filled_orders(self):
         if CurrentState().current_block_index() - self.last_cleaning_block_index < 50:
             return
         self.last_cleaning_block_index = CurrentState().current_block_index()
-        cursor = self.cache_db.cursor()
-        cursor.execute(
-            "DELETE FROM orders WHERE status = 'filled' AND block_index < ?",
-            (CurrentState().current_block_index() - 50,),
-        )
+        min_block_index = CurrentState().current_block_index() - 50
+        filled_orders = [
+            tx_hash
+            for tx_hash, order in self.orders.items()
+            if order["status"] == "filled" and order["block_index"] < min_block_index
+        ]
+        for tx_hash in filled_orders:
+            self.remove_order(tx_hash)
+
+    def add_to_book(self, order):
+        pair = (order["give_asset"], order["get_asset"])
+        if pair not in self.books:
+            self.books[pair] = OrderBook()
+        self.books[pair].add(order)
+
+    def remove_from_book(self, order):
+        pair = (order["give_asset"], order["get_asset"])
+        self.books[pair].remove(order)
+        if not self.books[pair]:
+            del self.books[pair]
+
+    def remove_order(self, tx_hash):
+        order = self.orders.pop(tx_hash)
+        if order["status"] == "open":
+            self.remove_from_book(order)
+        self.matched_orders.pop(tx_hash, None)
 
     def insert_order(self, order):
         if order["block_index"] == config.MEMPOOL_BLOCK_INDEX:
             return
-        sql = """
-            INSERT INTO orders VALUES (
-                :tx_index, :tx_hash, :block_index, :source, :give_asset, :give_quantity,
-                :give_remaining, :get_asset, :get_quantity, :get_remaining, :expiration,
-                :expire_index, :fee_required, :fee_required_remaining, :fee_provided,
-                :fee_provided_remaining, :status
-            )
-        """
-        cursor = self.cache_db.cursor()
-        cursor.execute(sql, order)
+        if order["tx_hash"] in self.orders:
+            self.remove_order(order["tx_hash"])
+        order = {field: order[field] for field in ORDER_FIELDS}
+        self.orders[order["tx_hash"]] = order
+        self.matched_orders[order["tx_hash"]] = set()
+        if order["status"] == "open":
+            self.add_to_book(order)
         self.clean_filled_orders()
 
     def update_order(self, tx_hash, order):
         if order["status"] == "expired":
-            self.cache_db.cursor().execute("DELETE FROM orders WHERE tx_hash = ?", (tx_hash,))
+            if tx_hash in self.orders:
+                self.remove_order(tx_hash)
             return
-        set_data = []
-        bindings = {"tx_hash": tx_hash}
-        for key, value in order.items():
-            set_data.append(f"{key} = :{key}")
-            bindings[key] = value
-        if "block_index" not in bindings:
-            set_data.append("block_index = :block_index")
-        bindings["block_index"] = CurrentState().current_block_index()
-        set_data = ", ".join(set_data)
-        sql = f"""UPDATE orders SET {set_data} WHERE tx_hash = :tx_hash"""  # noqa S608 # nosec B608
-        cursor = self.cache_db.cursor()
-        cursor.execute(sql, bindings)
+        cached_order = self.orders.get(tx_hash)
+        if cached_order is not None:
+            was_open = cached_order["status"] == "open"
+            cached_order.update(order)
+            cached_order["block_index"] = CurrentState().current_block_index()
+            # price, tx_index and assets never change: the position in the book is stable
+            if was_open and cached_order["status"] != "open":
+                self.remove_from_book(cached_order)
+            elif not was_open and cached_order["status"] == "open":
+                self.add_to_book(cached_order)
         self.clean_filled_orders()
 
-    def get_matching_orders(self, tx_hash, give_asset, get_asset):
-        cursor = self.cache_db.cursor()
-        query = """
-            SELECT *
-            FROM orders
-            WHERE (tx_hash != :tx_hash AND give_asset = :give_asset AND get_asset = :get_asset AND status = :status)
-            ORDER BY tx_index, tx_hash
+    def insert_order_match(self, order_match):
+        tx0_hash, tx1_hash = order_match["tx0_hash"], order_match["tx1_hash"]
+        if tx0_hash in self.matched_orders:
+            self.matched_orders[tx0_hash].add(tx1_hash)
+        if tx1_hash in self.matched_orders:
+            self.matched_orders[tx1_hash].add(tx0_hash)
+
+    def get_matched_orders(self, tx_hash):
+        """Hashes of the orders already matched with `tx_hash`, None if the order is not cached."""
+        return self.matched_orders.get(tx_hash)
+
+    def get_matching_orders(self, tx_hash, give_asset, get_asset, sort_by_price=False):
         """
-        bindings = {
-            "tx_hash": tx_hash,
-            "give_asset": get_asset,
-            "get_asset": give_asset,
-            "status": "open",
-        }
-        cursor.execute(query, bindings)
-        return cursor.fetchall()
+        Open orders giving `get_asset` for `give_asset`, sorted by (tx_index, tx_hash)
+        or by (price, tx_index, tx_hash) if `sort_by_price` is True.
+        """
+        book = self.books.get((get_asset, give_asset))
+        if book is None:
+            return []
+        keys = book.by_price if sort_by_price else book.by_tx_index
+        return [dict(self.orders[key[-1]]) for key in keys if key[-1] != tx_hash]
+
+
+class JournalHead(metaclass=helpers.SingletonMeta):
+    """
+    Head of the `messages` journal: next `message_index` and last `event_hash`.
+    Loaded once from the database, then advanced in memory by `events.add_to_journal()`.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.message_index = 0
+        self.event_hash = ""
+
+    def load(self, db):
+        logger.debug("Initialising journal head...")
+        cursor = db.cursor()
+        cursor.execute(
+            "SELECT message_index, event_hash FROM messages ORDER BY message_index DESC LIMIT 1"
+        )
+        last_message = cursor.fetchone()
+        cursor.close()
+        if last_message:
+            self.message_index = last_message["message_index"] + 1
+            self.event_hash = last_message["event_hash"] or ""
+        else:
+            self.message_index = 0
+            self.event_hash = ""
+        self.db = db
+
+    def get(self, db):
+        # reload when used with another connection (new database, tests...)
+        if self.db is not db:
+            self.load(db)
+        return self.message_index, self.event_hash
+
+    def advance(self, message_index, event_hash):
+        self.message_index = message_index + 1
+        self.event_hash = event_hash
+
+    def snapshot(self):
+        return self.db, self.message_index, self.event_hash
+
+    def restore(self, snapshot):
+        self.db, self.message_index, self.event_hash = snapshot
+
+
+class BalancesCache(metaclass=helpers.SingletonMeta):
+    """
+    Write-through cache of the last balance of each (address or utxo, asset) pair.
+    Enabled only while a block is parsed and cleared after each block:
+    filled on first read by `balances.get_balance()` and updated by
+    `events.add_to_balance()` and `events.remove_from_balance()` with the
+    balance they write to the database at the same time.
+    """
+
+    def __init__(self):
+        self.db = None
+        self.balances = {}
+        self.hits = 0
+        self.misses = 0
+
+    def enable(self, db):
+        self.db = db
+        self.balances = {}
+        self.hits = 0
+        self.misses = 0
+
+    def disable(self):
+        self.db = None
+        self.balances = {}
+
+    def enabled(self, db):
+        return self.db is not None and self.db is db
+
+    def get(self, address, asset):
+        """Return `(found, quantity)`, `quantity` is None if there is no balance row."""
+        key = (address, asset)
+        if key in self.balances:
+            self.hits += 1
+            return True, self.balances[key]
+        self.misses += 1
+        return False, None
+
+    def set(self, address, asset, quantity):
+        self.balances[(address, asset)] = quantity
 
 
 def reset_caches():
+    JournalHead.reset_instance()
+    BalancesCache.reset_instance()
     AssetCache.reset_instance()
     OrdersCache.reset_instance()
     UTXOBalancesCache.reset_instance()
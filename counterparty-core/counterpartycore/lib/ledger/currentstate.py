@@ -68,6 +68,28 @@ class CurrentState(metaclass=helpers.SingletonMeta):
             return None
         return int(self.state["BACKEND_HEIGHT_VALUE"].value % 10e8)
 
+    def set_ledger_updated_event(self, ledger_updated_event):
+        self.state["LEDGER_UPDATED_EVENT"] = ledger_updated_event
+
+    def notify_ledger_updated(self):
+        # wake up the API Watcher (if any) after a commit to the ledger db
+        ledger_updated_event = self.state.get("LEDGER_UPDATED_EVENT")
+        if ledger_updated_event is not None:
+            ledger_updated_event.set()
+
+    def set_last_block_parsed_value(self, shared_last_block_parsed):
+        self.state["LAST_BLOCK_PARSED_VALUE"] = shared_last_block_parsed
+
+    def set_last_block_parsed(self, block_index):
+        # shared with the API workers
+        if "LAST_BLOCK_PARSED_VALUE" in self.state:
+            self.state["LAST_BLOCK_PARSED_VALUE"].value = block_index
+
+    def last_block_parsed(self):
+        if "LAST_BLOCK_PARSED_VALUE" not in self.state:
+            return None
+        return self.state["LAST_BLOCK_PARSED_VALUE"].value
+
     def current_tx_hash(self):
         return self.state.get("CURRENT_TX_HASH")
 
@@ -6,8 +6,14 @@ from contextlib import contextmanager
 from counterpartycore.lib import backend, config, exceptions
 from counterpartycore.lib.cli import log
 from counterpartycore.lib.ledger.balances import get_balance
-from counterpartycore.lib.ledger.caches import AssetCache, UTXOBalancesCache
+from counterpartycore.lib.ledger.caches import (
+    AssetCache,
+    BalancesCache,
+    JournalHead,
+    UTXOBalancesCache,
+)
 from counterpartycore.lib.ledger.currentstate import ConsensusHashBuilder, CurrentState
+from counterpartycore.lib.ledger.supplies import XCP_SUPPLY_TABLES, update_xcp_supply
 from counterpartycore.lib.parser import protocol, utxosinfo
 from counterpartycore.lib.utils import helpers
 
@@ -21,20 +27,62 @@ def get_cursor(db):
         cursor.close()
 
 
+@contextmanager
+def journal_transaction(db):
+    """Same as `with db:` but also rolls back the in-memory journal head on failure."""
+    journal_head = JournalHead().snapshot()
+    try:
+        with db:
+            yield
+    except BaseException:
+        JournalHead().restore(journal_head)
+        raise
+
+
+# SQL statements built once per (table, columns) and reused:
+# apsw also keeps the prepared statement in its cache when the SQL text is the same.
+STATEMENTS = {}
+
+
+def get_insert_statement(table_name, fields, returning=False):
+    key = ("insert", table_name, fields, returning)
+    if key not in STATEMENTS:
+        placeholders = ", ".join(["?" for _ in fields])
+        statement = f"INSERT INTO {table_name} ({', '.join(fields)}) VALUES ({placeholders})"  # noqa: S608 # nosec B608
+        if returning:
+            statement += " RETURNING *"
+        STATEMENTS[key] = statement
+    return STATEMENTS[key]
+
+
+def get_last_record_statement(table_name, id_name):
+    key = ("select", table_name, id_name)
+    if key not in STATEMENTS:
+        STATEMENTS[key] = f"""
+            SELECT *, rowid
+            FROM {table_name}
+            WHERE {id_name} = ?
+            ORDER BY rowid DESC
+            LIMIT 1
+        """  # nosec B608  # noqa: S608 # nosec B608
+    return STATEMENTS[key]
+
+
 def insert_record(db, table_name, record, event, event_info=None):
-    fields = list(record.keys())
-    placeholders = ", ".join(["?" for _ in fields])
-    query = f"INSERT INTO {table_name} ({', '.join(fields)}) VALUES ({placeholders})"  # noqa: S608 # nosec B608
+    update_asset_cache = (
+        table_name in ["issuances", "destructions"] and not CurrentState().parsing_mempool()
+    )
+    # `RETURNING *` gives the stored row (defaults and type affinity applied)
+    # without reading it again
+    query = get_insert_statement(table_name, tuple(record.keys()), returning=update_asset_cache)
 
     with get_cursor(db) as cursor:
-        cursor.execute(query, list(record.values()))
-        if table_name in ["issuances", "destructions"] and not CurrentState().parsing_mempool():
-            cursor.execute("SELECT last_insert_rowid() AS rowid")
-            inserted_rowid = cursor.fetchone()["rowid"]
-            new_record = cursor.execute(
-                f"SELECT * FROM {table_name} WHERE rowid = ?",  # noqa: S608 # nosec B608
-                (inserted_rowid,),
-            ).fetchone()
+        cursor.execute(query, tuple(record.values()))
+        if table_name in XCP_SUPPLY_TABLES:
+            block_index = record.get("block_index") or CurrentState().current_block_index()
+            update_xcp_supply(db, block_index, table_name, record)
+        if update_asset_cache:
+            new_record = cursor.fetchone()
             if AssetCache in AssetCache._instances:  # pylint: disable=protected-access
                 if table_name == "issuances":
                     AssetCache(db).add_issuance(new_record)
@@ -56,21 +104,19 @@ def insert_record(db, table_name, record, event, event_info=None):
 # This function allows you to update a record using an INSERT.
 # The `block_index` and `rowid` fields allow you to
 # order updates and retrieve the row with the current data.
-def insert_update(db, table_name, id_name, id_value, update_data, event, event_info=None):  # noqa: B006
+# `current_record` can be passed by callers that already hold the last row
+# of the record (as returned by `SELECT *`) to avoid selecting it again.
+def insert_update(
+    db, table_name, id_name, id_value, update_data, event, event_info=None, current_record=None
+):
     cursor = db.cursor()
-    # select records to update
-    select_query = f"""
-        SELECT *, rowid
-        FROM {table_name}
-        WHERE {id_name} = ?
-        ORDER BY rowid DESC
-        LIMIT 1
-    """  # nosec B608  # noqa: S608 # nosec B608
-    bindings = (id_value,)
-    need_update_record = cursor.execute(select_query, bindings).fetchone()
+    if current_record is None:
+        # select records to update
+        select_query = get_last_record_statement(table_name, id_name)
+        current_record = cursor.execute(select_query, (id_value,)).fetchone()
 
     # update record
-    new_record = need_update_record.copy()
+    new_record = current_record.copy()
     # updade needed fields
     for key, value in update_data.items():
         new_record[key] = value
@@ -83,11 +129,8 @@ def insert_update(db, table_name, id_name, id_value, update_data, event, event_i
     # insert new record
     if "rowid" in new_record:
         del new_record["rowid"]
-    fields_name = ", ".join(new_record.keys())
-    fields_values = ", ".join([f":{key}" for key in new_record.keys()])
-    # no sql injection here
-    insert_query = f"""INSERT INTO {table_name} ({fields_name}) VALUES ({fields_values})"""  # nosec B608  # noqa: S608 # nosec B608
-    cursor.execute(insert_query, new_record)
+    insert_query = get_insert_statement(table_name, tuple(new_record.keys()))
+    cursor.execute(insert_query, tuple(new_record.values()))
     cursor.close()
     # Add event to journal
     event_paylod = update_data | {id_name: id_value} | (event_info or {})
@@ -123,14 +166,8 @@ def curr_time():
 
 
 def add_to_journal(db, block_index, command, category, event, bindings):
-    # Get last message index.
-    try:
-        previous_message = last_message(db)
-        message_index = previous_message["message_index"] + 1
-        previous_event_hash = previous_message["event_hash"] or ""
-    except exceptions.DatabaseError:
-        message_index = 0
-        previous_event_hash = ""
+    # Get next message index and previous event hash without querying the messages table.
+    message_index, previous_event_hash = JournalHead().get(db)
 
     items = {
         key: binascii.hexlify(value).decode("ascii") if isinstance(value, bytes) else value
@@ -179,6 +216,7 @@ def add_to_journal(db, block_index, command, category, event, bindings):
     cursor = db.cursor()
     cursor.execute(query, message_bindings)
     cursor.close()
+    JournalHead().advance(message_index, event_hash)
 
     ConsensusHashBuilder().append_to_block_journal(f"{command}{category}{bindings_string}")
 
@@ -225,6 +263,8 @@ def remove_from_balance(db, address, asset, quantity, tx_index, utxo_address=Non
             VALUES (:address, :asset, :quantity, :block_index, :tx_index, :utxo, :utxo_address)
         """
         balance_cursor.execute(query, bindings)
+        if BalancesCache().enabled(db):
+            BalancesCache().set(address, asset, balance)
 
 
 def append_to_ledger_hash(block_index, address, asset, quantity):
@@ -307,6 +347,8 @@ def add_to_balance(db, address, asset, quantity, tx_index, utxo_address=None):
         VALUES (:address, :asset, :quantity, :block_index, :tx_index, :utxo, :utxo_address)
     """
     balance_cursor.execute(query, bindings)
+    if BalancesCache().enabled(db):
+        BalancesCache().set(address, asset, balance)
 
 
 def credit(db, address, asset, quantity, tx_index, action=None, event=None):
@@ -2,6 +2,9 @@ from counterpartycore.lib import config
 from counterpartycore.lib.ledger.caches import OrdersCache
 from counterpartycore.lib.ledger.currentstate import CurrentState
 from counterpartycore.lib.ledger.events import insert_record, insert_update
+from counterpartycore.lib.ledger.issuances import price
+from counterpartycore.lib.parser import protocol
+from counterpartycore.lib.utils import helpers
 
 #####################
 #       ORDERS      #
@@ -145,10 +148,43 @@ def get_matching_orders_no_cache(db, tx_hash, give_asset, get_asset):
     return cursor.fetchall()
 
 
-def get_matching_orders(db, tx_hash, give_asset, get_asset):
-    if CurrentState().ledger_state() == "Catching Up":
-        return OrdersCache(db).get_matching_orders(tx_hash, give_asset, get_asset)
-    return get_matching_orders_no_cache(db, tx_hash, give_asset, get_asset)
+def sort_orders_by_price(orders):
+    orders = sorted(orders, key=lambda x: x["tx_index"])  # Sort by tx index second.
+    return sorted(
+        orders, key=lambda x: price(x["get_quantity"], x["give_quantity"])
+    )  # Sort by price first.
+
+
+def get_matching_orders(db, tx_hash, give_asset, get_asset, sort_by_price=False):
+    # the order books are sorted by exact price, `Decimal` prices must be sorted here
+    if CurrentState().ledger_state() == "Catching Up" and (
+        not sort_by_price or protocol.enabled("price_as_fraction")
+    ):
+        return OrdersCache(db).get_matching_orders(
+            tx_hash, give_asset, get_asset, sort_by_price=sort_by_price
+        )
+    orders = get_matching_orders_no_cache(db, tx_hash, give_asset, get_asset)
+    if sort_by_price:
+        orders = sort_orders_by_price(orders)
+    return orders
+
+
+def get_matched_orders(db, tx_hash):
+    """
+    Returns the hashes of the orders already matched with `tx_hash`,
+    or None if they must be looked up with `order_match_exists()`.
+    """
+    if CurrentState().ledger_state() == "Catching Up" and not CurrentState().parsing_mempool():
+        return OrdersCache(db).get_matched_orders(tx_hash)
+    return None
+
+
+def order_match_exists(db, tx0_hash, tx1_hash):
+    # both directions, just to be sure
+    return bool(
+        get_order_match(db, match_id=helpers.make_id(tx0_hash, tx1_hash))
+        or get_order_match(db, match_id=helpers.make_id(tx1_hash, tx0_hash))
+    )
 
 
 def insert_order(db, order):
@@ -157,6 +193,12 @@ def insert_order(db, order):
         OrdersCache(db).insert_order(order)
 
 
+def insert_order_match(db, order_match):
+    insert_record(db, "order_matches", order_match, "ORDER_MATCH")
+    if not CurrentState().parsing_mempool():
+        OrdersCache(db).insert_order_match(order_match)
+
+
 ### UPDATES ###
 
 
@@ -198,6 +240,7 @@ def mark_order_as_filled(db, tx0_hash, tx1_hash, source=None):
             update_data,
             "ORDER_FILLED",
             {"tx_hash": order["tx_hash"]},
+            current_record=order,
         )
         if not CurrentState().parsing_mempool():
             OrdersCache(db).update_order(order["tx_hash"], update_data)
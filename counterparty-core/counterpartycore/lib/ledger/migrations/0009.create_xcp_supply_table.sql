@@ -0,0 +1,29 @@
+-- XCP created and destroyed thus far, at the end of each block changing the XCP supply
+CREATE TABLE IF NOT EXISTS xcp_supply (
+    block_index INTEGER PRIMARY KEY,
+    created INTEGER,
+    destroyed INTEGER
+);
+
+INSERT OR IGNORE INTO xcp_supply (block_index, created, destroyed)
+SELECT
+    block_index,
+    SUM(SUM(created)) OVER (ORDER BY block_index),
+    SUM(SUM(destroyed)) OVER (ORDER BY block_index)
+FROM (
+    SELECT block_index, COALESCE(earned, 0) AS created, 0 AS destroyed
+    FROM burns WHERE status = 'valid'
+    UNION ALL
+    SELECT block_index, 0 AS created, COALESCE(quantity, 0) AS destroyed
+    FROM destructions WHERE status = 'valid' AND asset = 'XCP'
+    UNION ALL
+    SELECT block_index, 0 AS created, COALESCE(fee_paid, 0) AS destroyed
+    FROM issuances WHERE status = 'valid'
+    UNION ALL
+    SELECT block_index, 0 AS created, COALESCE(fee_paid, 0) AS destroyed
+    FROM dividends WHERE status = 'valid'
+    UNION ALL
+    SELECT block_index, 0 AS created, COALESCE(fee_paid, 0) AS destroyed
+    FROM sweeps WHERE status = 'valid'
+)
+GROUP BY block_index;
@@ -0,0 +1 @@
+CREATE INDEX IF NOT EXISTS mempool_tx_hash_idx ON mempool (tx_hash);
@@ -1,30 +1,36 @@
 from counterpartycore.lib import config
 from counterpartycore.lib.ledger.caches import AssetCache
 from counterpartycore.lib.parser import protocol
+from counterpartycore.lib.utils import database
+
+# tables whose records create or destroy XCP
+XCP_SUPPLY_TABLES = ("burns", "destructions", "issuances", "dividends", "sweeps")
 
 
 # Ugly way to get holders but we want to preserve the order with the old query
 # to not break checkpoints
+# `cursor` fetches namedtuples (see `database.tuple_cursor()`)
 def _get_holders(cursor, id_fields, hold_fields_1, exclude_empty_holders=False):
     save_records = {}
     for record in cursor:
-        record_id = " ".join([str(record[field]) for field in id_fields])
+        record_id = " ".join([str(getattr(record, field)) for field in id_fields])
         if id not in save_records:
             save_records[record_id] = record
             continue
-        if save_records[record_id]["rowid"] < record["rowid"]:
+        if save_records[record_id].rowid < record.rowid:
             save_records[record_id] = record
             continue
     all_holders = []
     for holder in save_records.values():
-        if holder[hold_fields_1["address_quantity"]] > 0 or (
-            not exclude_empty_holders and holder[hold_fields_1["address_quantity"]] == 0  # noqa: E712
+        address_quantity = getattr(holder, hold_fields_1["address_quantity"])
+        if address_quantity > 0 or (
+            not exclude_empty_holders and address_quantity == 0  # noqa: E712
         ):
             all_holders.append(
                 {
-                    "address": holder[hold_fields_1["address"]],
-                    "address_quantity": holder[hold_fields_1["address_quantity"]],
-                    "escrow": holder[hold_fields_1["escrow"]]
+                    "address": getattr(holder, hold_fields_1["address"]),
+                    "address_quantity": address_quantity,
+                    "escrow": getattr(holder, hold_fields_1["escrow"])
                     if "escrow" in hold_fields_1
                     else None,
                 }
@@ -35,7 +41,7 @@ def _get_holders(cursor, id_fields, hold_fields_1, exclude_empty_holders=False):
 def holders(db, asset, exclude_empty_holders=False):
     """Return holders of the asset."""
     all_holders = []
-    cursor = db.cursor()
+    cursor = database.tuple_cursor(db, named=True)
 
     # Balances
 
@@ -217,7 +223,7 @@ def holders(db, asset, exclude_empty_holders=False):
     return all_holders
 
 
-def xcp_created(db):
+def xcp_created_no_cache(db):
     """Return number of XCP created thus far."""
     cursor = db.cursor()
     query = """
@@ -232,7 +238,7 @@ def xcp_created(db):
     return total
 
 
-def xcp_destroyed(db):
+def xcp_destroyed_no_cache(db):
     """Return number of XCP destroyed thus far."""
     cursor = db.cursor()
     # Destructions.
@@ -278,9 +284,70 @@ def xcp_destroyed(db):
     return destroyed_total + issuance_fee_total + dividend_fee_total + sweeps_fee_total
 
 
+def xcp_supply_change(table_name, record):
+    """Return the quantities of XCP created and destroyed by a new record."""
+    if record.get("status") != "valid":
+        return 0, 0
+    if table_name == "burns":
+        return record.get("earned") or 0, 0
+    if table_name == "destructions":
+        return 0, (record.get("quantity") or 0) if record.get("asset") == config.XCP else 0
+    if table_name in XCP_SUPPLY_TABLES:
+        return 0, record.get("fee_paid") or 0
+    return 0, 0
+
+
+def update_xcp_supply(db, block_index, table_name, record):
+    """Update the XCP created and destroyed totals of the block with a new record."""
+    created, destroyed = xcp_supply_change(table_name, record)
+    if created == 0 and destroyed == 0:
+        return
+    cursor = db.cursor()
+    query = """
+        INSERT INTO xcp_supply (block_index, created, destroyed)
+        VALUES (
+            :block_index,
+            COALESCE((SELECT created FROM xcp_supply ORDER BY block_index DESC LIMIT 1), 0) + :created,
+            COALESCE((SELECT destroyed FROM xcp_supply ORDER BY block_index DESC LIMIT 1), 0) + :destroyed
+        )
+        ON CONFLICT (block_index) DO UPDATE SET
+            created = created + :created,
+            destroyed = destroyed + :destroyed
+    """
+    bindings = {"block_index": block_index, "created": created, "destroyed": destroyed}
+    cursor.execute(query, bindings)
+    cursor.close()
+
+
+def xcp_supply_totals(db):
+    """Return the numbers of XCP created and destroyed thus far."""
+    cursor = db.cursor()
+    query = """
+        SELECT created, destroyed FROM xcp_supply
+        ORDER BY block_index DESC
+        LIMIT 1
+    """
+    last_totals = cursor.execute(query).fetchone()
+    cursor.close()
+    if last_totals is None:
+        return 0, 0
+    return last_totals["created"], last_totals["destroyed"]
+
+
+def xcp_created(db):
+    """Return number of XCP created thus far."""
+    return xcp_supply_totals(db)[0]
+
+
+def xcp_destroyed(db):
+    """Return number of XCP destroyed thus far."""
+    return xcp_supply_totals(db)[1]
+
+
 def xcp_supply(db):
     """Return the XCP supply."""
-    return xcp_created(db) - xcp_destroyed(db)
+    created, destroyed = xcp_supply_totals(db)
+    return created - destroyed
 
 
 def creations(db):
@@ -490,3 +557,173 @@ def held(db):
         result[asset] = total
 
     return result
+
+
+# Where assets are held, see `held()`:
+# (table, id fields, asset field, quantity field, filter, status filter)
+HOLDINGS = [
+    (
+        "balances",
+        ("address", "asset"),
+        "asset",
+        "quantity",
+        "address IS NOT NULL AND utxo IS NULL",
+        None,
+    ),
+    ("balances", ("rowid",), "asset", "quantity", "address IS NULL AND utxo IS NULL", None),
+    (
+        "balances",
+        ("utxo", "asset"),
+        "asset",
+        "quantity",
+        "address IS NULL AND utxo IS NOT NULL",
+        None,
+    ),
+    ("orders", ("tx_hash",), "give_asset", "give_remaining", None, "status = 'open'"),
+    (
+        "orders",
+        ("tx_hash",),
+        "give_asset",
+        "give_remaining",
+        "give_asset = 'XCP' AND get_asset = 'BTC'",
+        "status = 'filled'",
+    ),
+    ("order_matches", ("id",), "forward_asset", "forward_quantity", None, "status = 'pending'"),
+    ("order_matches", ("id",), "backward_asset", "backward_quantity", None, "status = 'pending'"),
+    ("bets", ("tx_hash",), "'XCP'", "wager_remaining", None, "status = 'open'"),
+    ("bet_matches", ("id",), "'XCP'", "forward_quantity", None, "status = 'pending'"),
+    ("bet_matches", ("id",), "'XCP'", "backward_quantity", None, "status = 'pending'"),
+    ("rps", ("tx_hash",), "'XCP'", "wager", None, "status = 'open'"),
+    (
+        "rps_matches",
+        ("id",),
+        "'XCP'",
+        "wager * 2",
+        None,
+        "status IN ('pending', 'pending and resolved', 'resolved and pending')",
+    ),
+    ("dispensers", ("tx_hash",), "asset", "give_remaining", None, "status IN (0, 1, 11)"),
+]
+
+
+def _holding_query(holding, condition):
+    table, id_fields, asset_field, quantity_field, holding_filter, status_filter = holding
+    conditions = " AND ".join(
+        [f"({sql_filter})" for sql_filter in [holding_filter, condition] if sql_filter]
+    )
+    ids = ", ".join(id_fields)
+    # no sql injection here
+    return f"""
+        SELECT {asset_field} AS asset, {quantity_field} AS quantity FROM (
+            SELECT *, MAX(rowid)
+            FROM {table}
+            WHERE {conditions}
+            GROUP BY {ids}
+        ) WHERE {status_filter or 1}
+    """  # noqa: S608 # nosec B608
+
+
+def _totals_by_asset(db, sql, bindings):
+    cursor = db.cursor()
+    cursor.execute(sql, bindings)
+    result = {row["asset"]: row["total"] for row in cursor}
+    cursor.close()
+    return result
+
+
+def issued_assets(db, after_asset, limit):
+    """Return, in alphabetical order, the assets with a valid issuance after `after_asset`."""
+    cursor = db.cursor()
+    query = """
+        SELECT DISTINCT asset FROM issuances
+        WHERE status = ? AND asset > ?
+        ORDER BY asset
+        LIMIT ?
+    """
+    bindings = ("valid", after_asset, limit)
+    cursor.execute(query, bindings)
+    assets = [row["asset"] for row in cursor]
+    cursor.close()
+    return assets
+
+
+def held_by_assets(db, assets):
+    """Return the quantities held for the given assets, like `held()`."""
+    placeholders = ", ".join(["?"] * len(assets))
+    queries = []
+    bindings = []
+    for holding in HOLDINGS:
+        queries.append(_holding_query(holding, f"{holding[2]} IN ({placeholders})"))
+        bindings += assets
+    sql = (
+        "SELECT asset, SUM(quantity) AS total FROM ("  # noqa: S608 # nosec B608
+        + " UNION ALL ".join(queries)
+        + ") GROUP BY asset"
+    )
+    return _totals_by_asset(db, sql, bindings)
+
+
+def supplies_by_assets(db, assets):
+    """Return the supplies of the given assets, like `supplies()`."""
+    placeholders = ", ".join(["?"] * len(assets))
+    # no sql injection here
+    sql = f"""
+        SELECT asset, SUM(quantity) AS total FROM (
+            SELECT asset, quantity FROM issuances
+            WHERE status = 'valid' AND asset IN ({placeholders})
+            UNION ALL
+            SELECT asset, -quantity AS quantity FROM destructions
+            WHERE status = 'valid' AND asset != ? AND asset IN ({placeholders})
+        ) GROUP BY asset
+    """  # noqa: S608 # nosec B608
+    result = _totals_by_asset(db, sql, [*assets, config.XCP, *assets])
+    if config.XCP in assets:
+        result[config.XCP] = xcp_supply(db)
+    return result
+
+
+def held_changes(db, block_index):
+    """Return the changes, during the given block, of the quantities held by asset."""
+    queries = []
+    for holding in HOLDINGS:
+        table, id_fields = holding[0], ", ".join(holding[1])
+        # records inserted or updated during the block
+        updated_in_block = (
+            f"({id_fields}) IN (SELECT {id_fields} FROM {table} WHERE block_index = :block_index)"  # noqa: S608 # nosec B608
+        )
+        after = _holding_query(holding, f"{updated_in_block} AND block_index <= :block_index")
+        before = _holding_query(holding, f"{updated_in_block} AND block_index < :block_index")
+        queries.append(after)
+        queries.append(f"SELECT asset, -quantity AS quantity FROM ({before})")  # noqa: S608 # nosec B608
+    sql = (
+        "SELECT asset, SUM(quantity) AS total FROM ("  # noqa: S608 # nosec B608
+        + " UNION ALL ".join(queries)
+        + ") GROUP BY asset"
+    )
+    return _totals_by_asset(db, sql, {"block_index": block_index})
+
+
+def supply_changes(db, block_index):
+    """Return the changes of the supplies, by asset, during the given block."""
+    sql = """
+        SELECT asset, SUM(quantity) AS total FROM (
+            SELECT asset, quantity FROM issuances
+            WHERE status = 'valid' AND block_index = :block_index
+            UNION ALL
+            SELECT :xcp AS asset, earned AS quantity FROM burns
+            WHERE status = 'valid' AND block_index = :block_index
+            UNION ALL
+            SELECT asset, -quantity AS quantity FROM destructions
+            WHERE status = 'valid' AND block_index = :block_index
+            UNION ALL
+            SELECT :xcp AS asset, -fee_paid AS quantity FROM issuances
+            WHERE status = 'valid' AND block_index = :block_index
+            UNION ALL
+            SELECT :xcp AS asset, -fee_paid AS quantity FROM dividends
+            WHERE status = 'valid' AND block_index = :block_index
+            UNION ALL
+            SELECT :xcp AS asset, -fee_paid AS quantity FROM sweeps
+            WHERE status = 'valid' AND block_index = :block_index
+        ) GROUP BY asset
+    """
+    return _totals_by_asset(db, sql, {"block_index": block_index, "xcp": config.XCP})
@@ -497,17 +497,13 @@ def match(db, tx, block_index=None):
     tx1_get_remaining = tx1["get_remaining"]
 
     order_matches = ledger.markets.get_matching_orders(
-        db, tx1["tx_hash"], give_asset=tx1["give_asset"], get_asset=tx1["get_asset"]
+        db,
+        tx1["tx_hash"],
+        give_asset=tx1["give_asset"],
+        get_asset=tx1["get_asset"],
+        sort_by_price=protocol.enabled("sort_bet_matches"),  # Protocol change.
     )
-
-    if protocol.enabled("sort_bet_matches"):  # Protocol change.
-        order_matches = sorted(
-            order_matches, key=lambda x: x["tx_index"]
-        )  # Sort by tx index second.
-        order_matches = sorted(
-            order_matches,
-            key=lambda x: ledger.issuances.price(x["get_quantity"], x["give_quantity"]),
-        )  # Sort by price first.
+    matched_orders = ledger.markets.get_matched_orders(db, tx1["tx_hash"])
 
     # Get fee remaining.
     tx1_fee_required_remaining = tx1["fee_required_remaining"]
@@ -531,15 +527,12 @@ def match(db, tx, block_index=None):
         tx0_give_remaining = tx0["give_remaining"]
         tx0_get_remaining = tx0["get_remaining"]
 
-        # Ignore previous matches. (Both directions, just to be sure.)
-        if ledger.markets.get_order_match(
-            db, match_id=helpers.make_id(tx0["tx_hash"], tx1["tx_hash"])
-        ):
-            logger.trace("Skipping: previous match")
-            continue
-        if ledger.markets.get_order_match(
-            db, match_id=helpers.make_id(tx1["tx_hash"], tx0["tx_hash"])
-        ):
+        # Ignore previous matches.
+        if matched_orders is not None:
+            previous_match = tx0["tx_hash"] in matched_orders
+        else:
+            previous_match = ledger.markets.order_match_exists(db, tx0["tx_hash"], tx1["tx_hash"])
+        if previous_match:
             logger.trace("Skipping: previous match")
             continue
 
@@ -801,7 +794,7 @@ def match(db, tx, block_index=None):
                 "fee_paid": fee,
                 "status": status,
             }
-            ledger.events.insert_record(db, "order_matches", bindings, "ORDER_MATCH")
+            ledger.markets.insert_order_match(db, bindings)
 
             logger.info(
                 "Order match for %(forward_quantity)s %(forward_asset)s against %(backward_quantity)s %(backward_asset)s (%(id)s) [%(status)s]",
@@ -141,17 +141,10 @@ def get_cache_sizes():
         # OrdersCache
         if OrdersCache in helpers.SingletonMeta._instances:
             cache = helpers.SingletonMeta._instances[OrdersCache]
-            if hasattr(cache, "cache_db") and cache.cache_db:
-                try:
-                    cursor = cache.cache_db.cursor()
-                    cursor.execute("SELECT COUNT(*) FROM orders")
-                    row = cursor.fetchone()
-                    count = row[0] if row else 0
-                    sizes["OrdersCache.orders"] = count
-                    # Estimate: each order ~500 bytes in memory
-                    sizes["OrdersCache.orders_MB"] = (count * 500) / (1024 * 1024)
-                except Exception:
-                    sizes["OrdersCache.orders"] = "error"
+            orders = getattr(cache, "orders", {})
+            sizes["OrdersCache.orders"] = len(orders)
+            sizes["OrdersCache.orders_MB"] = estimate_dict_memory(orders) / (1024 * 1024)
+            sizes["OrdersCache.books"] = len(getattr(cache, "books", {}))
 
         # UTXOBalancesCache
         if UTXOBalancesCache in helpers.SingletonMeta._instances:
@@ -168,9 +161,9 @@ def get_cache_sizes():
 
         if NotSupportedTransactionsCache in helpers.SingletonMeta._instances:
             cache = helpers.SingletonMeta._instances[NotSupportedTransactionsCache]
-            not_supported = getattr(cache, "not_suppported_txs", set())
+            not_supported = getattr(cache, "not_suppported_txs", {})
             sizes["NotSupportedTxCache"] = len(not_supported)
-            sizes["NotSupportedTxCache_MB"] = estimate_set_memory(not_supported) / (1024 * 1024)
+            sizes["NotSupportedTxCache_MB"] = estimate_dict_memory(not_supported) / (1024 * 1024)
     except ImportError:
         pass
 
@@ -0,0 +1,209 @@
+import json
+import logging
+import threading
+import time
+
+import apsw
+
+from counterpartycore.lib import config
+from counterpartycore.lib.utils import database, helpers
+
+logger = logging.getLogger(config.LOGGER_NAME)
+
+DATABASE_SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS blocks_stats (
+        block_index INTEGER PRIMARY KEY,
+        parsed_at INTEGER,
+        duration REAL,
+        transaction_count INTEGER,
+        query_count INTEGER,
+        rows_written INTEGER,
+        stages TEXT,
+        message_types TEXT
+    )""",
+)
+
+
+class ParseStats(metaclass=helpers.SingletonMeta):
+    """
+    Per-block parsing statistics shared with the API process through a side database:
+    time spent in each stage of `parse_block()` and in each message type, number of
+    queries executed and rows written. Only the last `history_size` blocks are kept.
+    """
+
+    def __init__(self, database_file=None, history_size=None):
+        self.database_file = database_file or config.PARSE_STATS_DATABASE
+        self.history_size = history_size or config.PARSE_STATS_HISTORY_SIZE
+        self.lock = threading.Lock()
+        self.database = database.SideDatabase(self.database_file, DATABASE_SCHEMA)
+        # stages measured before `start_block()` (e.g. `list_tx`) are kept until `end_block()`
+        self.stages = {}
+        self.block = None
+        self.previous_exec_trace = None
+
+    def connection(self):
+        return self.database.connection()
+
+    def start_block(self, db, block_index):
+        if self.database_file is None or block_index == config.MEMPOOL_BLOCK_INDEX:
+            self.block = None
+            return
+        self.block = {
+            "block_index": block_index,
+            "start_time": time.perf_counter(),
+            "total_changes": db.total_changes(),
+            "query_count": 0,
+            "message_types": {},
+        }
+        # count the queries executed by the parser
+        self.previous_exec_trace = db.exec_trace
+        db.exec_trace = self.count_query
+
+    def count_query(self, cursor, sql, bindings):
+        if self.block is not None:
+            self.block["query_count"] += 1
+        if self.previous_exec_trace is not None:
+            return self.previous_exec_trace(cursor, sql, bindings)
+        return True
+
+    def record_stage(self, name, duration):
+        self.stages[name] = self.stages.get(name, 0) + duration
+
+    def record_transaction(self, transaction_type, duration):
+        if self.block is None:
+            return
+        count, total = self.block["message_types"].get(transaction_type, (0, 0))
+        self.block["message_types"][transaction_type] = (count + 1, total + duration)
+
+    def save_block(self, db, transaction_count):
+        if self.block is None:
+            return
+        block_index = self.block["block_index"]
+        bindings = (
+            block_index,
+            int(time.time()),
+            time.perf_counter() - self.block["start_time"],
+            transaction_count,
+            self.block["query_count"],
+            db.total_changes() - self.block["total_changes"],
+            json.dumps(self.stages),
+            json.dumps(self.block["message_types"]),
+        )
+        try:
+            with self.lock:
+                stats_db = self.connection()
+                with stats_db:
+                    stats_db.execute(
+                        "INSERT OR REPLACE INTO blocks_stats VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        bindings,
+                    )
+                    stats_db.execute(
+                        "DELETE FROM blocks_stats WHERE block_index <= ?",
+                        (block_index - self.history_size,),
+                    )
+        except apsw.Error as e:
+            logger.debug("Error saving parse stats: %s", e)
+
+    def end_block(self, db):
+        if self.block is not None:
+            db.exec_trace = self.previous_exec_trace
+            self.previous_exec_trace = None
+        self.block = None
+        self.stages = {}
+
+    def close(self):
+        with self.lock:
+            self.database.close()
+
+    def get_blocks_stats(self, block_count):
+        if self.database_file is None:
+            return []
+        with self.lock:
+            stats_db = self.connection()
+            blocks = stats_db.execute(
+                """SELECT block_index, duration, transaction_count, query_count,
+                          rows_written, stages, message_types
+                   FROM blocks_stats ORDER BY block_index DESC LIMIT ?""",
+                (block_count,),
+            ).fetchall()
+        return [
+            {
+                "block_index": block[0],
+                "duration": block[1],
+                "transaction_count": block[2],
+                "query_count": block[3],
+                "rows_written": block[4],
+                "stages": json.loads(block[5]),
+                "message_types": json.loads(block[6]),
+            }
+            for block in reversed(blocks)
+        ]
+
+
+def summarize(blocks, top=10):
+    stages = {}
+    message_types = {}
+    for block in blocks:
+        for name, duration in block["stages"].items():
+            stages[name] = stages.get(name, 0) + duration
+        for name, (count, duration) in block["message_types"].items():
+            previous_count, previous_duration = message_types.get(name, (0, 0))
+            message_types[name] = (previous_count + count, previous_duration + duration)
+    slowest_blocks = sorted(blocks, key=lambda block: -block["duration"])[:top]
+    return {
+        "block_count": len(blocks),
+        "first_block_index": blocks[0]["block_index"] if blocks else None,
+        "last_block_index": blocks[-1]["block_index"] if blocks else None,
+        "duration": sum(block["duration"] for block in blocks),
+        "transaction_count": sum(block["transaction_count"] for block in blocks),
+        "query_count": sum(block["query_count"] for block in blocks),
+        "rows_written": sum(block["rows_written"] for block in blocks),
+        "stages": dict(sorted(stages.items(), key=lambda item: -item[1])),
+        "message_types": {
+            name: {"count": count, "duration": duration, "average": duration / count}
+            for name, (count, duration) in sorted(
+                message_types.items(), key=lambda item: -item[1][1]
+            )
+        },
+        "slowest_blocks": [
+            {key: value for key, value in block.items() if key not in ("stages", "message_types")}
+            for block in slowest_blocks
+        ],
+    }
+
+
+def get_parse_stats(blocks: int = 100, top: int = 10):
+    """
+    Returns the time spent by the parser in each stage and message type for the last parsed blocks.
+    :param blocks: The number of last parsed blocks to summarize (e.g. 100)
+    :param top: The number of slowest blocks to return (e.g. 10)
+    """
+    return summarize(ParseStats().get_blocks_stats(blocks), top=top)
+
+
+def print_report(blocks=100, top=10):
+    summary = get_parse_stats(blocks, top)
+    if summary["block_count"] == 0:
+        print("No parse stats recorded.")
+        return
+    print(
+        f"Blocks {summary['first_block_index']} to {summary['last_block_index']}: "
+        f"{summary['duration']:.2f}s, {summary['transaction_count']} transactions, "
+        f"{summary['query_count']} queries, {summary['rows_written']} rows written"
+    )
+    print("\nStages:")
+    for name, duration in summary["stages"].items():
+        print(f"  {name:<30} {duration:>10.3f}s")
+    print("\nMessage types:")
+    for name, stats in summary["message_types"].items():
+        print(
+            f"  {name:<30} {stats['duration']:>10.3f}s {stats['count']:>8} txs "
+            f"{stats['average'] * 1000:>8.2f}ms/tx"
+        )
+    print("\nSlowest blocks:")
+    for block in summary["slowest_blocks"]:
+        print(
+            f"  {block['block_index']:<10} {block['duration']:>8.3f}s "
+            f"{block['transaction_count']:>6} txs {block['query_count']:>8} queries "
+            f"{block['rows_written']:>8} rows"
+        )
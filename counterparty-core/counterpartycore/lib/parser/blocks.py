@@ -46,8 +46,9 @@ from counterpartycore.lib.messages import (
     utxo,
 )
 from counterpartycore.lib.messages.versions import enhancedsend, mpma
+from counterpartycore.lib.monitors.parsestats import ParseStats
 from counterpartycore.lib.monitors.profiler import Profiler
-from counterpartycore.lib.parser import check, deserialize, messagetype, protocol
+from counterpartycore.lib.parser import check, deserialize, gettxinfo, messagetype, protocol
 from counterpartycore.lib.parser.gettxinfo import get_tx_info
 from counterpartycore.lib.utils import database, helpers
 
@@ -89,6 +90,7 @@ TABLES = ["balances", "credits", "debits", "messages"] + [
     "fairminters",
     "fairmints",
     "transaction_count",
+    "xcp_supply",
 ]
 
 
@@ -128,7 +130,7 @@ def parse_tx(db, tx):
     moved = False
 
     try:
-        with db:
+        with ledger.events.journal_transaction(db):
             if tx["data"] and len(tx["data"]) > 1:
                 try:
                     message_type_id, message = messagetype.unpack(tx["data"], tx["block_index"])
@@ -316,6 +318,33 @@ def parse_block(
 
     The unused arguments `ledger_hash` and `txlist_hash` are for the test suite.
     """
+    # balances read and written during the block are kept in memory
+    ledger.caches.BalancesCache().enable(db)
+    ParseStats().start_block(db, block_index)
+    try:
+        return _parse_block(
+            db,
+            block_index,
+            block_time,
+            previous_ledger_hash=previous_ledger_hash,
+            previous_txlist_hash=previous_txlist_hash,
+            previous_messages_hash=previous_messages_hash,
+            reparsing=reparsing,
+        )
+    finally:
+        ParseStats().end_block(db)
+        ledger.caches.BalancesCache().disable()
+
+
+def _parse_block(
+    db,
+    block_index,
+    block_time,
+    previous_ledger_hash=None,
+    previous_txlist_hash=None,
+    previous_messages_hash=None,
+    reparsing=False,
+):
     # Timing instrumentation for performance analysis
     block_start = time.perf_counter()
     timings = {}
@@ -362,10 +391,15 @@ def parse_block(
     timings["fairminter.before_block"] = time.perf_counter() - t0
 
     txlist = []
+    parse_stats = ParseStats()
     t0 = time.perf_counter()
     for tx in transactions:
         try:
+            tx_start = time.perf_counter()
             parse_tx(db, tx)
+            parse_stats.record_transaction(
+                tx["transaction_type"] or "unknown", time.perf_counter() - tx_start
+            )
             data = binascii.hexlify(tx["data"]).decode("UTF-8") if tx["data"] else ""
             txlist.append(
                 f"{tx['tx_hash']}{tx['source']}{tx['destination']}{tx['btc_amount']}{tx['fee']}{data}"
@@ -384,16 +418,20 @@ def parse_block(
     # Log timing breakdown
     block_duration = time.perf_counter() - block_start
     timing_str = ", ".join(f"{k}={v:.3f}s" for k, v in sorted(timings.items(), key=lambda x: -x[1]))
+    balances_cache = ledger.caches.BalancesCache()
     logger.debug(
-        "Block %s parsed (%.2fs, %d txs): %s",
+        "Block %s parsed (%.2fs, %d txs): %s (balances cache: %d hits, %d misses)",
         block_index,
         block_duration,
         len(transactions),
         timing_str,
+        balances_cache.hits,
+        balances_cache.misses,
     )
 
     if block_index != config.MEMPOOL_BLOCK_INDEX:
         # Calculate consensus hashes.
+        t0 = time.perf_counter()
         new_txlist_hash, _found_txlist_hash = check.consensus_hash(
             db, "txlist_hash", previous_txlist_hash, txlist
         )
@@ -409,6 +447,7 @@ def parse_block(
             previous_messages_hash,
             ledger.currentstate.ConsensusHashBuilder().block_journal(),
         )
+        timings["consensus_hashes"] = time.perf_counter() - t0
 
         # Update block
 
@@ -451,6 +490,10 @@ def parse_block(
 
         cursor.close()
 
+        for stage, duration in timings.items():
+            parse_stats.record_stage(stage, duration)
+        parse_stats.save_block(db, len(transactions))
+
         return new_ledger_hash, new_txlist_hash, new_messages_hash
 
     cursor.close()
@@ -596,6 +639,7 @@ def rollback(db, block_index=0, force=False):
             cursor.close()
     CurrentState().set_current_block_index(block_index - 1)
     ledger.caches.reset_caches()
+    CurrentState().notify_ledger_updated()
 
 
 def generate_progression_message(
@@ -796,7 +840,7 @@ def parse_new_block(db, decoded_block, tx_index=None):
         "Previous block index mismatch"
     )
 
-    with db:  # ensure all the block or nothing
+    with ledger.events.journal_transaction(db):  # ensure all the block or nothing
         logger.info("Block %s", decoded_block["block_index"], extra={"bold": True})
         # insert block
         block_bindings = {
@@ -809,6 +853,7 @@ def parse_new_block(db, decoded_block, tx_index=None):
         ledger.events.insert_record(db, "blocks", block_bindings, "NEW_BLOCK")
 
         # save transactions
+        list_tx_start = time.perf_counter()
         for transaction in decoded_block["transactions"]:
             tx_index = list_tx(
                 db,
@@ -819,6 +864,7 @@ def parse_new_block(db, decoded_block, tx_index=None):
                 tx_index,
                 decoded_tx=transaction,
             )
+        ParseStats().record_stage("list_tx", time.perf_counter() - list_tx_start)
         # Parse the transactions in the block.
         new_ledger_hash, new_txlist_hash, new_messages_hash = parse_block(
             db,
@@ -846,6 +892,7 @@ def parse_new_block(db, decoded_block, tx_index=None):
                 "duration": duration,
             },
         )
+    CurrentState().notify_ledger_updated()
 
     return tx_index, decoded_block["block_index"]
 
@@ -886,6 +933,8 @@ def check_database_version(db):
 
 def start_rsfetcher():
     fetcher = rsfetcher.RSFetcher()
+    # decode the transactions of the next blocks while the current one is parsed
+    fetcher.prepare_block = gettxinfo.precompute_block_tx_info
     retry_delay = 5
     max_delay = 60
     while True:
@@ -11,6 +11,9 @@ from counterpartycore.lib.utils.helpers import dhash_string
 
 logger = logging.getLogger(config.LOGGER_NAME)
 
+# number of assets checked in each read transaction by `asset_conservation_audit()`
+ASSET_CONSERVATION_AUDIT_CHUNK_SIZE = 500
+
 
 def consensus_hash(db, field, previous_consensus_hash, content):
     assert field in ("ledger_hash", "txlist_hash", "messages_hash"), "Invalid field"
@@ -90,9 +93,22 @@ def consensus_hash(db, field, previous_consensus_hash, content):
     return calculated_hash, found_hash
 
 
+def xcp_supply(db):
+    """Check that the XCP supply counters match the totals recomputed from the ledger."""
+    created, destroyed = ledger.supplies.xcp_supply_totals(db)
+    created_no_cache = ledger.supplies.xcp_created_no_cache(db)
+    destroyed_no_cache = ledger.supplies.xcp_destroyed_no_cache(db)
+    if created != created_no_cache or destroyed != destroyed_no_cache:
+        raise exceptions.SanityError(
+            f"XCP supply counters ({created} created, {destroyed} destroyed) don't match "
+            f"the ledger ({created_no_cache} created, {destroyed_no_cache} destroyed)"
+        )
+
+
 def asset_conservation(db, stop_event=None):
     logger.debug("Checking for conservation of assets.")
     with db:
+        xcp_supply(db)
         supplies = ledger.supplies.supplies(db)
         held = ledger.supplies.held(db)
         for asset in supplies.keys():
@@ -115,6 +131,69 @@ def asset_conservation(db, stop_event=None):
     logger.debug("All assets have been conserved.")
 
 
+def asset_conservation_in_block(db, block_index):
+    """
+    Check that the supply changes during the block are matched by the changes
+    of the quantities held (balances and escrows), for the assets touched by the block.
+    """
+    with db:
+        supply_changes = ledger.supplies.supply_changes(db, block_index)
+        held_changes = ledger.supplies.held_changes(db, block_index)
+        for asset in set(supply_changes) | set(held_changes):
+            # BTC is escrowed in orders but never issued
+            if asset == config.BTC:
+                continue
+            asset_issued = supply_changes.get(asset) or 0
+            asset_held = held_changes.get(asset) or 0
+            if asset_issued != asset_held:
+                raise exceptions.SanityError(
+                    f"{ledger.issuances.value_out(db, asset_issued, asset)} {asset} issued ≠ "
+                    f"{ledger.issuances.value_out(db, asset_held, asset)} {asset} held "
+                    f"in block {block_index}"
+                )
+
+
+def asset_conservation_audit(db, from_asset=None, stop_event=None):
+    """
+    Same check as `asset_conservation()` but by chunks of assets, each checked
+    in its own read transaction. Returns the last checked asset if `stop_event` is set,
+    to resume the audit later with `from_asset`, or None when all assets have been checked.
+    """
+    if from_asset is None:
+        logger.debug("Starting asset conservation audit.")
+    else:
+        logger.debug("Resuming asset conservation audit after %s.", from_asset)
+    last_asset = from_asset
+    while True:
+        if stop_event is not None and stop_event.is_set():
+            logger.debug("Stop event received. Interrupting asset conservation audit...")
+            return last_asset
+        with db:
+            issued_assets = ledger.supplies.issued_assets(
+                db, last_asset or "", ASSET_CONSERVATION_AUDIT_CHUNK_SIZE
+            )
+            if last_asset is None:
+                xcp_supply(db)
+            assets = issued_assets + ([config.XCP] if last_asset is None else [])
+            if len(assets) == 0:
+                break
+            supplies = ledger.supplies.supplies_by_assets(db, assets)
+            held = ledger.supplies.held_by_assets(db, assets)
+            for asset in assets:
+                asset_issued = supplies.get(asset) or 0
+                asset_held = held.get(asset) or 0
+                if asset_issued != asset_held:
+                    raise exceptions.SanityError(
+                        f"{ledger.issuances.value_out(db, asset_issued, asset)} {asset} issued ≠ "
+                        f"{ledger.issuances.value_out(db, asset_held, asset)} {asset} held"
+                    )
+        if len(issued_assets) == 0:
+            break
+        last_asset = issued_assets[-1]
+    logger.debug("Asset conservation audit completed: all assets have been conserved.")
+    return None
+
+
 def check_change(protocol_change, change_name):
     # Check client version.
     passed = True
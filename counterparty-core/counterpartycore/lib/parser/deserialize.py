@@ -30,9 +30,18 @@ class Deserializer(metaclass=SingletonMeta):
     def parse_transaction(self, tx_hex, block_index, parse_vouts=False):
         return self.deserializer.parse_transaction(tx_hex, block_index, parse_vouts)
 
+    def parse_transactions(self, tx_hexes, block_index, parse_vouts=False):
+        # `counterparty_rs` built without `Deserializer.parse_transactions`
+        if not hasattr(self.deserializer, "parse_transactions"):
+            return [self.parse_transaction(tx_hex, block_index, parse_vouts) for tx_hex in tx_hexes]
+        return self.deserializer.parse_transactions(tx_hexes, block_index, parse_vouts)
+
     def parse_block(self, block_hex, block_index, parse_vouts=False):
         return self.deserializer.parse_block(block_hex, block_index, parse_vouts)
 
+    def parse_block_view(self, block_hex, block_index, parse_vouts=False):
+        return self.deserializer.parse_block_view(block_hex, block_index, parse_vouts)
+
 
 def deserialize_tx(tx_hex, parse_vouts=False, block_index=None):
     current_block_index = block_index or CurrentState().current_block_index()
@@ -40,6 +49,13 @@ def deserialize_tx(tx_hex, parse_vouts=False, block_index=None):
     return decoded_tx
 
 
+def deserialize_txs(tx_hexes, parse_vouts=False, block_index=None):
+    # decoded on all the cores by `counterparty_rs` which releases the GIL
+    current_block_index = block_index or CurrentState().current_block_index()
+    decoded_txs = Deserializer().parse_transactions(tx_hexes, current_block_index, parse_vouts)
+    return decoded_txs
+
+
 def deserialize_block(block_hex, parse_vouts=False, block_index=None):
     current_block_index = block_index or CurrentState().current_block_index()
     decoded_block = Deserializer().parse_block(block_hex, current_block_index, parse_vouts)
@@ -1,4 +1,5 @@
 import asyncio
+import itertools
 import logging
 import os
 import struct
@@ -27,6 +28,12 @@ logger = logging.getLogger(config.LOGGER_NAME)
 MEMPOOL_BLOCK_MAX_SIZE = 100
 ZMQ_TIMEOUT = 3000
 
+# bitcoind evicts transactions from its mempool after two weeks by default
+NOT_SUPPORTED_TX_MAX_AGE = 2016
+NOT_SUPPORTED_TX_MAX_COUNT = 500000
+NOT_SUPPORTED_TX_COMPACTION_MIN = 10000
+NOT_SUPPORTED_TX_FSYNC_INTERVAL = 5  # seconds
+
 NOTIFICATION_TYPES = ["pubrawtx", "pubhashtx", "pubsequence", "pubrawblock"]
 
 RAW_MEMPOOL = []
@@ -145,6 +152,10 @@ class BlockchainWatcher:
             CurrentState().set_ledger_state(self.db, "Following")
             if not config.NO_MEMPOOL:
                 mempool.clean_mempool(self.db)
+                NotSupportedTransactionsCache().remove(
+                    [tx["tx_hash"] for tx in decoded_block["transactions"]]
+                )
+                NotSupportedTransactionsCache().expire(CurrentState().current_block_index())
             if not config.NO_TELEMETRY:
                 TelemetryOneShot().submit()
 
@@ -350,20 +361,14 @@ class BlockchainWatcher:
 def get_raw_mempool(db):
     logger.debug("Getting raw mempool...")
     raw_mempool = backend.bitcoind.getrawmempool(verbose=True)
+    NotSupportedTransactionsCache().retain(raw_mempool)
 
-    timestamps = {}
-    cursor = db.cursor()
-    txhash_list = []
-    for txid, tx_info in raw_mempool.items():
-        if NotSupportedTransactionsCache().is_not_supported(txid):
-            continue
-        existing_tx_in_mempool = cursor.execute(
-            "SELECT * FROM mempool WHERE tx_hash = ? LIMIT 1", (txid,)
-        ).fetchone()
-        if existing_tx_in_mempool:
-            continue
-        txhash_list.append(txid)
-        timestamps[txid] = tx_info["time"]
+    txhash_list = [
+        txid for txid in raw_mempool if not NotSupportedTransactionsCache().is_not_supported(txid)
+    ]
+    known_tx_hashes = mempool.get_known_tx_hashes(db, txhash_list, tables=("mempool",))
+    txhash_list = [txid for txid in txhash_list if txid not in known_tx_hashes]
+    timestamps = {txid: raw_mempool[txid]["time"] for txid in txhash_list}
 
     chunks = helpers.chunkify(txhash_list, config.MAX_RPC_BATCH_SIZE)
 
@@ -408,11 +413,20 @@ class RawMempoolParser(threading.Thread):
 
 
 class NotSupportedTransactionsCache(metaclass=helpers.SingletonMeta):
+    """
+    Hashes of the mempool transactions that are not Counterparty transactions, with the
+    block index at which they were first seen. The cache file is an append-only log of
+    `<tx_hash> <block_index>` lines, compacted when the entries dropped since the last
+    compaction (confirmed, expired or evicted from the mempool) outnumber the live ones.
+    """
+
     def __init__(self):
-        # Use set for O(1) lookups instead of O(n) list
-        self.not_suppported_txs = set()
-        # Keep a list for ordering (for backup/restore)
-        self._ordered_txs = []
+        # tx_hash -> block index, in insertion order
+        self.not_suppported_txs = {}
+        # number of lines in the cache file, including the dropped entries
+        self.logged_count = 0
+        self.log_file = None
+        self.last_fsync_time = 0
         self.cache_path = os.path.join(
             config.CACHE_DIR, f"not_supported_tx_cache.{config.NETWORK_NAME}.txt"
         )
@@ -420,32 +434,115 @@ class NotSupportedTransactionsCache(metaclass=helpers.SingletonMeta):
 
     def restore(self):
         if os.path.exists(self.cache_path):
+            default_block_index = CurrentState().current_block_index() or 0
             with open(self.cache_path, "r", encoding="utf-8") as f:
-                self._ordered_txs = [line.strip() for line in f]
-                self.not_suppported_txs = set(self._ordered_txs)
+                content = f.read()
+            for line in content.splitlines():
+                fields = line.split()
+                if not fields:
+                    continue
+                self.logged_count += 1
+                # files written before the append-only log only contain the hashes
+                block_index = default_block_index
+                if len(fields) > 1 and fields[1].isdigit():
+                    block_index = int(fields[1])
+                self.not_suppported_txs[fields[0]] = block_index
+            self.trim()
+            # the next appended line must not be glued to an unterminated one
+            if content and not content.endswith("\n"):
+                self.backup()
             logger.debug(
                 "Restored %d not supported transactions from cache", len(self.not_suppported_txs)
             )
 
     def backup(self):
-        with open(self.cache_path, "w", encoding="utf-8") as f:
-            f.write("\n".join(self._ordered_txs))
+        """Rewrite the cache file with the live entries only."""
+        self.close()
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(
+                "".join(
+                    f"{tx_hash} {block_index}\n"
+                    for tx_hash, block_index in self.not_suppported_txs.items()
+                )
+            )
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.cache_path)
+        self.logged_count = len(self.not_suppported_txs)
         logger.trace(
             f"Backed up {len(self.not_suppported_txs)} not supported transactions to cache"
         )
 
+    def compact(self):
+        dropped_count = self.logged_count - len(self.not_suppported_txs)
+        if dropped_count > max(len(self.not_suppported_txs), NOT_SUPPORTED_TX_COMPACTION_MIN):
+            self.backup()
+
+    def append(self, entries):
+        if self.log_file is None:
+            self.log_file = open(self.cache_path, "a", encoding="utf-8")  # pylint: disable=consider-using-with
+        self.log_file.write(
+            "".join(f"{tx_hash} {block_index}\n" for tx_hash, block_index in entries)
+        )
+        self.log_file.flush()
+        # the cache can be rebuilt from the mempool: no need to fsync every write
+        if time.time() - self.last_fsync_time > NOT_SUPPORTED_TX_FSYNC_INTERVAL:
+            os.fsync(self.log_file.fileno())
+            self.last_fsync_time = time.time()
+        self.logged_count += len(entries)
+
+    def close(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
     def clear(self):
-        self.not_suppported_txs = set()
-        self._ordered_txs = []
+        self.close()
+        self.not_suppported_txs = {}
+        self.logged_count = 0
         if os.path.exists(self.cache_path):
             os.remove(self.cache_path)
 
+    def trim(self):
+        # drop the oldest entries to keep the cache bounded
+        excess = len(self.not_suppported_txs) - NOT_SUPPORTED_TX_MAX_COUNT
+        if excess > 0:
+            for tx_hash in list(itertools.islice(self.not_suppported_txs, excess)):
+                del self.not_suppported_txs[tx_hash]
+
     def add(self, more_not_supported_txs):
+        block_index = CurrentState().current_block_index() or 0
+        entries = []
         for tx in more_not_supported_txs:
             if tx not in self.not_suppported_txs:
-                self.not_suppported_txs.add(tx)
-                self._ordered_txs.append(tx)
-        self.backup()
+                self.not_suppported_txs[tx] = block_index
+                entries.append((tx, block_index))
+        if entries:
+            self.append(entries)
+            self.trim()
+            self.compact()
+
+    def remove(self, tx_hashes):
+        """Drop the transactions confirmed in a block."""
+        for tx_hash in tx_hashes:
+            self.not_suppported_txs.pop(tx_hash, None)
+        self.compact()
+
+    def expire(self, block_index):
+        """Drop the transactions seen more than `NOT_SUPPORTED_TX_MAX_AGE` blocks ago."""
+        min_block_index = block_index - NOT_SUPPORTED_TX_MAX_AGE
+        self.remove(
+            [
+                tx_hash
+                for tx_hash, seen_block_index in self.not_suppported_txs.items()
+                if seen_block_index < min_block_index
+            ]
+        )
+
+    def retain(self, tx_hashes):
+        """Drop the transactions that are no longer in the mempool."""
+        self.remove([tx_hash for tx_hash in self.not_suppported_txs if tx_hash not in tx_hashes])
 
     def is_not_supported(self, tx_hash):
         return tx_hash in self.not_suppported_txs
@@ -151,7 +151,7 @@ def get_schnorr_signature_sighash_flag(value):
     return None
 
 
-def collect_sighash_flags(script_sig, witnesses):
+def collect_sighash_flags(script_sig, witnesses, block_index=None):
     flags = []
 
     # P2PK, P2PKH, P2MS
@@ -177,7 +177,7 @@ def collect_sighash_flags(script_sig, witnesses):
             flags.append(flag)
         return flags
 
-    if protocol.enabled("taproot_support"):
+    if protocol.enabled("taproot_support", block_index):
         # P2TR
         if len(witnesses) == 1 or len(witnesses) > 2:
             flag = get_schnorr_signature_sighash_flag(witnesses[0])
@@ -212,7 +212,7 @@ SIGHASH_FLAG_TRANSACTION_WHITELIST = [
 ]
 
 
-def check_signatures_sighash_flag(decoded_tx):
+def check_signatures_sighash_flag(decoded_tx, block_index=None):
     if decoded_tx["tx_id"] in SIGHASH_FLAG_TRANSACTION_WHITELIST:
         return
 
@@ -221,7 +221,7 @@ def check_signatures_sighash_flag(decoded_tx):
     if decoded_tx["segwit"]:
         witnesses = decoded_tx["vtxinwit"][0]
 
-    flags = collect_sighash_flags(script_sig, witnesses)
+    flags = collect_sighash_flags(script_sig, witnesses, block_index)
 
     if len(flags) == 0:
         error = f"impossible to determine SIGHASH flag for transaction {decoded_tx['tx_id']}"
@@ -235,13 +235,13 @@ def check_signatures_sighash_flag(decoded_tx):
             raise SighashFlagError(error)
 
 
-def script_to_address(script_pubkey):
-    if protocol.enabled("taproot_support"):
+def script_to_address(script_pubkey, block_index=None):
+    if protocol.enabled("taproot_support", block_index):
         return script.script_to_address(script_pubkey)
     return script.script_to_address_legacy(script_pubkey)
 
 
-def get_transaction_sources(decoded_tx):
+def get_transaction_sources(decoded_tx, block_index=None):
     sources = []
     outputs_value = 0
 
@@ -252,7 +252,7 @@ def get_transaction_sources(decoded_tx):
 
         outputs_value += vout_value
 
-        if protocol.enabled("first_input_is_source") and len(sources) > 0:
+        if protocol.enabled("first_input_is_source", block_index) and len(sources) > 0:
             continue
 
         asm = script.script_to_asm(script_pubkey)
@@ -268,18 +268,18 @@ def get_transaction_sources(decoded_tx):
         elif asm[0] == opcodes.OP_HASH160 and asm[-1] == opcodes.OP_EQUAL and len(asm) == 3:  # noqa: F405
             new_source, new_data = decode_scripthash(asm)
             assert not new_data and new_source, "Invalid source"
-        elif (protocol.enabled("segwit_support") and asm[0] == b"") or (
-            protocol.enabled("taproot_support") and asm[0] == b"\x01"
+        elif (protocol.enabled("segwit_support", block_index) and asm[0] == b"") or (
+            protocol.enabled("taproot_support", block_index) and asm[0] == b"\x01"
         ):
             # Segwit output
-            new_source = script_to_address(script_pubkey)
+            new_source = script_to_address(script_pubkey, block_index)
             new_data = None
         else:
             raise DecodeError("unrecognised source type")
 
         # old; append to sources, results in invalid addresses
         # new; first found source is source, the rest can be anything (to fund the TX for example)
-        if not (protocol.enabled("first_input_is_source") and len(sources)):
+        if not (protocol.enabled("first_input_is_source", block_index) and len(sources)):
             # Collect unique sources.
             if new_source not in sources:
                 sources.append(new_source)
@@ -287,7 +287,7 @@ def get_transaction_sources(decoded_tx):
     return "-".join(sources), outputs_value
 
 
-def get_transaction_source_from_p2sh(decoded_tx, p2sh_is_segwit):
+def get_transaction_source_from_p2sh(decoded_tx, p2sh_is_segwit, block_index=None):
     p2sh_encoding_source = None
     data = b""
     outputs_value = 0
@@ -297,7 +297,7 @@ def get_transaction_source_from_p2sh(decoded_tx, p2sh_is_segwit):
             vin, no_retry=CurrentState().parsing_mempool()
         )
 
-        if protocol.enabled("prevout_segwit_fix"):
+        if protocol.enabled("prevout_segwit_fix", block_index):
             prevout_is_segwit = is_segwit
         else:
             prevout_is_segwit = p2sh_is_segwit
@@ -334,7 +334,7 @@ def get_dispensers_outputs(db, potential_dispensers):
     return outputs
 
 
-def get_dispensers_tx_info(sources, dispensers_outputs):
+def get_dispensers_tx_info(sources, dispensers_outputs, block_index=None):
     source, destination, btc_amount, fee, data, outs = b"", None, None, None, None, []
 
     dispenser_source = sources.split("-")[0]
@@ -350,7 +350,7 @@ def get_dispensers_tx_info(sources, dispensers_outputs):
             data = struct.pack(config.SHORT_TXTYPE_FORMAT, dispenser.DISPENSE_ID)
             data += b"\x00"
 
-            if protocol.enabled("multiple_dispenses"):
+            if protocol.enabled("multiple_dispenses", block_index):
                 outs.append({"destination": out[0], "btc_amount": out[1], "out_index": out_index})
             else:
                 break  # Prevent inspection of further dispenses (only first one is valid)
@@ -360,10 +360,14 @@ def get_dispensers_tx_info(sources, dispensers_outputs):
     return source, destination, btc_amount, fee, data, outs
 
 
-def get_tx_info_new(db, decoded_tx, block_index, p2sh_is_segwit=False, composing=False):
+def get_tx_info_new(
+    db, decoded_tx, block_index, p2sh_is_segwit=False, composing=False, protocol_block_index=None
+):
     """Get multisig transaction info.
     The destinations, if they exists, always comes before the data output; the
     change, if it exists, always comes after.
+    `protocol_block_index` is the block index used for the protocol changes checked
+    without explicit block index (the current block index by default).
     """
     # Ignore coinbase transactions.
     if decoded_tx["coinbase"]:
@@ -388,12 +392,12 @@ def get_tx_info_new(db, decoded_tx, block_index, p2sh_is_segwit=False, composing
     # P2SH encoding signalling
     p2sh_encoding_source = None
     if (
-        protocol.enabled("p2sh_encoding")
-        and not protocol.enabled("p2sh_disabled")
+        protocol.enabled("p2sh_encoding", protocol_block_index)
+        and not protocol.enabled("p2sh_disabled", protocol_block_index)
         and data == b"P2SH"
     ):
         p2sh_encoding_source, data, outputs_value = get_transaction_source_from_p2sh(
-            decoded_tx, p2sh_is_segwit
+            decoded_tx, p2sh_is_segwit, protocol_block_index
         )
         fee += outputs_value
         fee_added = True
@@ -417,8 +421,8 @@ def get_tx_info_new(db, decoded_tx, block_index, p2sh_is_segwit=False, composing
     #   if we haven't found them yet
     if p2sh_encoding_source is None:
         if not composing:
-            check_signatures_sighash_flag(decoded_tx)
-        sources, outputs_value = get_transaction_sources(decoded_tx)
+            check_signatures_sighash_flag(decoded_tx, protocol_block_index)
+        sources, outputs_value = get_transaction_sources(decoded_tx, protocol_block_index)
         if not fee_added:
             fee += outputs_value
     else:  # use the source from the p2sh data source
@@ -433,7 +437,7 @@ def get_tx_info_new(db, decoded_tx, block_index, p2sh_is_segwit=False, composing
         assert len(dispensers_outputs) > 0, (
             "No dispensers outputs"
         )  # else an exception would have been raised above
-        return get_dispensers_tx_info(sources, dispensers_outputs)
+        return get_dispensers_tx_info(sources, dispensers_outputs, protocol_block_index)
 
     destinations = "-".join(destinations)
 
@@ -449,7 +453,7 @@ def get_tx_info_new(db, decoded_tx, block_index, p2sh_is_segwit=False, composing
         # that's mean we don't need to call get_dispensers_outputs()
         # and so we avoid a db query (dispenser.is_dispensable()).
         # If one of them is not a dispenser `dispenser.dispense()` will silently skip it
-        return get_dispensers_tx_info(sources, potential_dispensers)
+        return get_dispensers_tx_info(sources, potential_dispensers, protocol_block_index)
 
     return sources, destinations, btc_amount, round(fee), data, []
 
@@ -527,20 +531,79 @@ KNOWN_SOURCES = {
 }
 
 
+def get_outputs_info(decoded_tx):
+    return select_utxo_destination(decoded_tx["vout"]), get_op_return_vout(decoded_tx)
+
+
 def get_utxos_info(db, decoded_tx):
-    op_return_vout = get_op_return_vout(decoded_tx)
+    # outputs info may have been prepared by `precompute_tx_info()`
+    outputs_info = decoded_tx.get("outputs_info")
+    if outputs_info is None:
+        outputs_info = get_outputs_info(decoded_tx)
+    destination_vout, op_return_vout = outputs_info
     if decoded_tx["tx_id"] in KNOWN_SOURCES:
         sources = KNOWN_SOURCES[decoded_tx["tx_id"]]
     else:
         sources = ",".join(get_inputs_with_balance(db, decoded_tx))
     return [
         sources,  # sources
-        get_first_non_op_return_output(decoded_tx) or "",  # destination
+        f"{decoded_tx['tx_hash']}:{destination_vout}"
+        if destination_vout is not None
+        else "",  # destination
         str(len(decoded_tx["vout"])),  # number of outputs
         str(op_return_vout) if op_return_vout is not None else "",  # op_return output
     ]
 
 
+def needs_ledger_state(decoded_tx, block_index):
+    """Whether `get_tx_info_new()` may look for vanilla dispenses in the ledger."""
+    if decoded_tx["coinbase"] or not isinstance(decoded_tx.get("parsed_vouts"), (list, tuple)):
+        return False
+    if not protocol.enabled("dispensers", block_index) or protocol.enabled(
+        "disable_vanilla_btc_dispense", block_index
+    ):
+        return False
+    destinations, _btc_amount, _fee, data, _potential_dispensers, _is_reveal_tx = decoded_tx[
+        "parsed_vouts"
+    ]
+    # P2SH data may be empty once decoded
+    return data == b"P2SH" or (not data and destinations != [config.UNSPENDABLE])
+
+
+def precompute_tx_info(decoded_tx, block_index):
+    """
+    Prepare the parts of `get_tx_info()` that don't depend on the ledger state,
+    outputs info and, if no dispenser lookup is needed, the decoded transaction info.
+    Ledger lookups (inputs with balance, dispensers) are always done by `get_tx_info()`.
+    """
+    try:
+        decoded_tx["outputs_info"] = get_outputs_info(decoded_tx)
+        if not protocol.enabled("multisig_addresses", block_index) or needs_ledger_state(
+            decoded_tx, block_index
+        ):
+            return
+        try:
+            tx_info = get_tx_info_new(
+                None,
+                decoded_tx,
+                block_index,
+                p2sh_is_segwit=False,
+                protocol_block_index=block_index,
+            )
+        except (DecodeError, BTCOnlyError) as e:
+            tx_info = e
+        decoded_tx["precomputed_tx_info"] = (block_index, tx_info)
+    except Exception as e:  # pylint: disable=broad-except
+        # `get_tx_info()` will compute everything again
+        logger.debug("Failed to precompute tx info for %s: %s", decoded_tx.get("tx_id"), e)
+        decoded_tx.pop("precomputed_tx_info", None)
+
+
+def precompute_block_tx_info(decoded_block):
+    for decoded_tx in decoded_block["transactions"]:
+        precompute_tx_info(decoded_tx, decoded_block["block_index"])
+
+
 def update_utxo_balances_cache(db, utxos_info, data, destination, block_index):
     if (
         protocol.enabled("utxo_support", block_index=block_index)
@@ -571,9 +634,14 @@ def get_tx_info(db, decoded_tx, block_index, composing=False):
         utxos_info = get_utxos_info(db, decoded_tx)
 
     try:
-        source, destination, btc_amount, fee, data, dispensers_outs = _get_tx_info(
-            db, decoded_tx, block_index, composing=composing
-        )
+        precomputed = decoded_tx.get("precomputed_tx_info")
+        if not composing and precomputed is not None and precomputed[0] == block_index:
+            tx_info = precomputed[1]
+            if isinstance(tx_info, Exception):
+                raise tx_info
+        else:
+            tx_info = _get_tx_info(db, decoded_tx, block_index, composing=composing)
+        source, destination, btc_amount, fee, data, dispensers_outs = tx_info
         return source, destination, btc_amount, fee, data, dispensers_outs, utxos_info
     except DecodeError:
         return b"", None, None, None, None, None, utxos_info
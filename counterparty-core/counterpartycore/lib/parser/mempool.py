@@ -6,9 +6,24 @@ from counterpartycore.lib import backend, config, exceptions, ledger
 from counterpartycore.lib.api.apiwatcher import EVENTS_ADDRESS_FIELDS
 from counterpartycore.lib.ledger.currentstate import CurrentState
 from counterpartycore.lib.parser import blocks, deserialize
+from counterpartycore.lib.utils import helpers
 
 logger = logging.getLogger(config.LOGGER_NAME)
 
+# number of tx hashes bound in each `IN (...)` query, below the SQLite default limit
+KNOWN_TX_HASHES_CHUNK_SIZE = 500
+
+
+def get_known_tx_hashes(db, tx_hashes, tables=("transactions", "mempool")):
+    known_tx_hashes = set()
+    cursor = db.cursor()
+    for table in tables:
+        for chunk in helpers.chunkify(list(tx_hashes), KNOWN_TX_HASHES_CHUNK_SIZE):
+            placeholders = ", ".join("?" * len(chunk))
+            query = f"SELECT tx_hash FROM {table} WHERE tx_hash IN ({placeholders})"  # noqa: S608 # nosec B608
+            known_tx_hashes.update(row["tx_hash"] for row in cursor.execute(query, chunk))
+    return known_tx_hashes
+
 
 def parse_mempool_transactions(db, raw_tx_list, timestamps=None):
     CurrentState().set_parsing_mempool(True)
@@ -20,7 +35,7 @@ def parse_mempool_transactions(db, raw_tx_list, timestamps=None):
     cursor = db.cursor()
     not_supported_txs = []
     try:
-        with db:
+        with ledger.events.journal_transaction(db):
             # insert fake block
             cursor.execute(
                 """INSERT INTO blocks(
@@ -49,28 +64,23 @@ def parse_mempool_transactions(db, raw_tx_list, timestamps=None):
             mempool_tx_index = max(last_mempool_tx_index, last_tx_index)
 
             # get message index before parsing the block
-            cursor.execute("SELECT MAX(message_index) as message_index FROM messages")
-            last_message = cursor.fetchone()
-            if last_message:
-                message_index_before = last_message["message_index"]
-            else:
-                message_index_before = -1
+            message_index_before = ledger.caches.JournalHead().get(db)[0] - 1
 
             # list_tx
+            decoded_txs = deserialize.deserialize_txs(raw_tx_list, parse_vouts=True)
+            known_tx_hashes = get_known_tx_hashes(
+                db, [decoded_tx["tx_hash"] for decoded_tx in decoded_txs]
+            )
             decoded_tx_count = 0
-            for raw_tx in raw_tx_list:
-                decoded_tx = deserialize.deserialize_tx(raw_tx, parse_vouts=True)
-                existing_tx = ledger.blocks.get_transaction(db, decoded_tx["tx_hash"])
+            for decoded_tx in decoded_txs:
                 not_supported_txs.append(decoded_tx["tx_hash"])
-                if existing_tx:
-                    logger.trace(f"Transaction {decoded_tx['tx_hash']} already in the database")
-                    continue
-                existing_tx_in_mempool = cursor.execute(
-                    "SELECT * FROM mempool WHERE tx_hash = ? LIMIT 1", (decoded_tx["tx_hash"],)
-                ).fetchone()
-                if existing_tx_in_mempool:
-                    logger.trace(f"Transaction {decoded_tx['tx_hash']} already in the mempool")
+                if decoded_tx["tx_hash"] in known_tx_hashes:
+                    logger.trace(
+                        f"Transaction {decoded_tx['tx_hash']} already in the database or the mempool"
+                    )
                     continue
+                # skip duplicates in the same batch
+                known_tx_hashes.add(decoded_tx["tx_hash"])
                 mempool_tx_index = blocks.list_tx(
                     db,
                     config.MEMPOOL_BLOCK_HASH,
@@ -141,6 +151,7 @@ def parse_mempool_transactions(db, raw_tx_list, timestamps=None):
             )
     logger.trace("Mempool transaction parsed successfully.")
     CurrentState().set_parsing_mempool(False)
+    CurrentState().notify_ledger_updated()
     return not_supported_txs
 
 
@@ -1,3 +1,4 @@
+import bisect
 import json
 import logging
 import os
@@ -11,6 +12,76 @@ CURR_DIR = os.path.dirname(os.path.realpath(__file__))
 with open(CURR_DIR + "/../../protocol_changes.json", encoding="utf-8") as protocol_file:
     PROTOCOL_CHANGES = json.load(protocol_file)
 
+# network => (activation block index field, values field) in `protocol_changes.json`
+NETWORK_FIELDS = {
+    "mainnet": ("block_index", "mainnet"),
+    "testnet3": ("testnet3_block_index", "testnet3"),
+    "testnet4": ("testnet4_block_index", "testnet4"),
+    "signet": ("signet_block_index", "signet"),
+}
+# set to a high number to get the highest value
+MAX_BLOCK_INDEX = 9999999
+
+
+def compile_protocol_changes(protocol_changes):
+    """
+    Flatten protocol changes into per-network lookup tables:
+    `{network: {change_name: activation_block_index}}` and
+    `{network: {change_name: (sorted_block_indexes, values)}}`.
+    """
+    activation_block_indexes = {network: {} for network in NETWORK_FIELDS}
+    values_by_block_index = {network: {} for network in NETWORK_FIELDS}
+    for change_name, change in protocol_changes.items():
+        for network, (index_name, values_name) in NETWORK_FIELDS.items():
+            if index_name in change:
+                activation_block_indexes[network][change_name] = change[index_name]
+            if values_name in change:
+                values = sorted(
+                    (int(block_index), value["value"])
+                    for block_index, value in change[values_name].items()
+                )
+                values_by_block_index[network][change_name] = (
+                    [block_index for block_index, _value in values],
+                    [value for _block_index, value in values],
+                )
+    return activation_block_indexes, values_by_block_index
+
+
+ACTIVATION_BLOCK_INDEXES, VALUES_BY_BLOCK_INDEX = compile_protocol_changes(PROTOCOL_CHANGES)
+
+# (file, stat signature, disabled changes) of the last read `regtest_disabled_changes.json`
+REGTEST_DISABLED_CHANGES_CACHE = [None, None, frozenset()]
+
+
+def get_network():
+    if config.REGTEST:
+        return "regtest"
+    if config.TESTNET3:
+        return "testnet3"
+    if config.TESTNET4:
+        return "testnet4"
+    if config.SIGNET:
+        return "signet"
+    return "mainnet"
+
+
+def regtest_disabled_changes():
+    """Changes disabled on regtest, read again only when the file is modified."""
+    regtest_protocole_file = os.path.join(
+        os.path.dirname(config.DATABASE), "regtest_disabled_changes.json"
+    )
+    try:
+        stat = os.stat(regtest_protocole_file)
+    except FileNotFoundError:
+        return frozenset()
+    signature = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    cached_file, cached_signature, disabled_changes = REGTEST_DISABLED_CHANGES_CACHE
+    if cached_file != regtest_protocole_file or cached_signature != signature:
+        with open(regtest_protocole_file, encoding="utf-8") as f:
+            disabled_changes = frozenset(json.load(f))
+        REGTEST_DISABLED_CHANGES_CACHE[:] = [regtest_protocole_file, signature, disabled_changes]
+    return disabled_changes
+
 
 def enabled(change_name, block_index=None):
     """Return True if protocol change is enabled."""
@@ -19,79 +90,39 @@ def enabled(change_name, block_index=None):
         return True
 
     if config.REGTEST:
-        regtest_protocole_file = os.path.join(
-            os.path.dirname(config.DATABASE), "regtest_disabled_changes.json"
-        )
-        if os.path.exists(regtest_protocole_file):
-            with open(regtest_protocole_file, encoding="utf-8") as f:
-                regtest_disabled_changes = json.load(f)
-            if change_name in regtest_disabled_changes:
-                return False
-        return True  # All changes are always enabled on REGTEST
+        # All changes are always enabled on REGTEST, except the ones disabled by the tests
+        return change_name not in regtest_disabled_changes()
 
-    if config.TESTNET3:
-        index_name = "testnet3_block_index"
-    elif config.TESTNET4:
-        index_name = "testnet4_block_index"
-    elif config.SIGNET:
-        index_name = "signet_block_index"
-    else:
-        index_name = "block_index"
-
-    enable_block_index = PROTOCOL_CHANGES[change_name][index_name]
+    enable_block_index = ACTIVATION_BLOCK_INDEXES[get_network()][change_name]
 
     if not block_index:
         block_index = CurrentState().current_block_index()
 
-    if block_index >= enable_block_index:
-        return True
-    return False
+    return block_index >= enable_block_index
 
 
 def get_change_block_index(change_name):
     if config.REGTEST:
         return 0
 
-    if config.TESTNET3:
-        index_name = "testnet3_block_index"
-    elif config.TESTNET4:
-        index_name = "testnet4_block_index"
-    elif config.SIGNET:
-        index_name = "signet_block_index"
-    else:
-        index_name = "block_index"
-
-    return PROTOCOL_CHANGES[change_name][index_name]
+    return ACTIVATION_BLOCK_INDEXES[get_network()][change_name]
 
 
 def get_value_by_block_index(change_name, block_index=None):
+    if config.REGTEST:
+        _block_indexes, values = VALUES_BY_BLOCK_INDEX["testnet3"][change_name]
+        return values[-1]
+
     if not block_index:
         block_index = CurrentState().current_block_index()
     if block_index is None or block_index == 0:
-        block_index = 9999999  # Set to a high number to get the highest value
-
-    max_block_index = -1
+        block_index = MAX_BLOCK_INDEX
 
-    if config.REGTEST:
-        for key in PROTOCOL_CHANGES[change_name]["testnet3"]:
-            if int(key) > int(max_block_index):
-                max_block_index = key
-        return PROTOCOL_CHANGES[change_name]["testnet3"][max_block_index]["value"]
-
-    if config.TESTNET3:
-        index_name = "testnet3"
-    elif config.TESTNET4:
-        index_name = "testnet4"
-    elif config.SIGNET:
-        index_name = "signet"
-    else:
-        index_name = "mainnet"
-
-    for key in PROTOCOL_CHANGES[change_name][index_name]:
-        if int(key) > int(max_block_index) and block_index >= int(key):
-            max_block_index = key
-
-    return PROTOCOL_CHANGES[change_name][index_name][max_block_index]["value"]
+    block_indexes, values = VALUES_BY_BLOCK_INDEX[get_network()][change_name]
+    position = bisect.bisect_right(block_indexes, block_index) - 1
+    if position < 0:
+        raise KeyError(change_name)
+    return values[position]
 
 
 def is_test_network():
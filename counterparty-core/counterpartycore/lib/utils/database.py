@@ -1,7 +1,9 @@
+import functools
 import logging
 import os
 import threading
 import time
+from collections import namedtuple
 from contextlib import contextmanager
 
 import apsw
@@ -20,12 +22,79 @@ logger = logging.getLogger(config.LOGGER_NAME)
 apsw.ext.log_sqlite(logger=logger)
 
 
+@functools.lru_cache(maxsize=4096)
+def get_row_tracer(description):
+    """Builds, once per column set, the function converting fetched rows into dicts"""
+    names = tuple(name for name, _field_type in description)
+    last_positions = {name: position for position, name in enumerate(names)}
+    # with duplicate column names the last one wins, like in a dict
+    bool_fields = tuple(
+        (name, position)
+        for position, (name, field_type) in enumerate(description)
+        if str(field_type) == "BOOL" and last_positions[name] == position
+    )
+
+    if not bool_fields:
+
+        def row_tracer(_cursor, row):
+            return dict(zip(names, row, strict=False))
+
+        return row_tracer
+
+    def row_tracer_with_bools(_cursor, row):
+        result = dict(zip(names, row, strict=False))
+        for name, position in bool_fields:
+            result[name] = bool(row[position])
+        return result
+
+    return row_tracer_with_bools
+
+
+@functools.lru_cache(maxsize=1024)
+def get_namedtuple_row_tracer(description):
+    row_class = namedtuple("Row", [name for name, _field_type in description], rename=True)
+
+    def row_tracer(_cursor, row):
+        return row_class._make(row)
+
+    return row_tracer
+
+
+def tuple_row_tracer(_cursor, row):
+    return row
+
+
 def rowtracer(cursor, sql):
     """Converts fetched SQL data into dict-style"""
-    return {
-        name: (bool(value) if str(field_type) == "BOOL" else value)
-        for (name, field_type), value in zip(cursor.getdescription(), sql)
-    }
+    return get_row_tracer(tuple(cursor.getdescription()))(cursor, sql)
+
+
+def exectracer(cursor, _sql, _bindings):
+    """Sets the dict row tracer of the statement once, before its execution"""
+    # savepoints of `with db:` are traced with the connection
+    if isinstance(cursor, apsw.Cursor):
+        cursor.row_trace = get_row_tracer(cursor.getdescription())
+    return True
+
+
+def tuple_exectracer(cursor, _sql, _bindings):
+    cursor.row_trace = tuple_row_tracer
+    return True
+
+
+def namedtuple_exectracer(cursor, _sql, _bindings):
+    cursor.row_trace = get_namedtuple_row_tracer(cursor.getdescription())
+    return True
+
+
+def tuple_cursor(db, named=False):
+    """
+    Returns a cursor fetching raw tuples (or namedtuples) instead of dicts.
+    BOOL columns are not converted. For internal hot loops only.
+    """
+    cursor = db.cursor()
+    cursor.exec_trace = namedtuple_exectracer if named else tuple_exectracer
+    return cursor
 
 
 def get_file_openers(filename):
@@ -91,6 +160,7 @@ def get_db_connection(db_file, read_only=True, check_wal=False):
     cursor.execute("PRAGMA defer_foreign_keys = ON")
 
     db.setrowtrace(rowtracer)
+    db.setexectrace(exectracer)
 
     cursor.close()
     return db
@@ -272,6 +342,43 @@ class StateDBConnectionPool(APSWConnectionPool, metaclass=helpers.SingletonMeta)
         super().__init__(config.STATE_DATABASE, "API DB")
 
 
+class SideDatabase:
+    """
+    Connection to a small database shared by the processes of the node (API cache,
+    API metrics, parse stats, UTXO locks). Its content can be lost: writes are not synced.
+    The tables of `schema` are created on the first connection of each process.
+    """
+
+    def __init__(self, database_file, schema, busy_timeout=1000):
+        self.database_file = database_file
+        self.schema = schema
+        self.busy_timeout = busy_timeout
+        self.db = None
+        self.pid = None
+
+    def is_connected(self):
+        # gunicorn workers are forked: never reuse the connection of the parent process
+        return self.db is not None and self.pid == os.getpid()
+
+    def connection(self):
+        if not self.is_connected():
+            db = apsw.Connection(self.database_file)
+            db.setbusytimeout(self.busy_timeout)
+            cursor = db.cursor()
+            cursor.execute("PRAGMA journal_mode = WAL")
+            cursor.execute("PRAGMA synchronous = OFF")
+            for statement in self.schema:
+                cursor.execute(statement)
+            self.db = db
+            self.pid = os.getpid()
+        return self.db
+
+    def close(self):
+        if self.is_connected():
+            self.db.close()
+        self.db = None
+
+
 def initialise_db():
     if config.FORCE:
         cprint("THE OPTION `--force` IS NOT FOR USE ON PRODUCTION SYSTEMS.", "yellow")
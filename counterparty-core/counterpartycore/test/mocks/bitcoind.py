@@ -8,7 +8,7 @@ from multiprocessing import Value
 import pytest
 from bitcoinutils.keys import PublicKey
 from counterpartycore.lib import backend, config, exceptions, parser
-from counterpartycore.lib.api import composer
+from counterpartycore.lib.api import composecache, composer
 from counterpartycore.lib.ledger.currentstate import CurrentState
 from counterpartycore.lib.parser import blocks, check, deserialize
 from counterpartycore.lib.utils import helpers, multisig, opcodes, script
@@ -171,6 +171,11 @@ def satoshis_per_vbyte(confirmation_target=None):
     return 2
 
 
+def compose_list_unspent(db, address, allow_unconfirmed_inputs, use_cache=True):
+    # the mocked unspent lists depend on the caller, they must not be cached
+    return backend.list_unspent(address, allow_unconfirmed_inputs)
+
+
 def mine_block(db, transactions):
     block_index = CurrentState().current_block_index() + 1
     decoded_block = {
@@ -226,6 +231,7 @@ def monkeymodule():
 
 original_is_valid_der = parser.gettxinfo.is_valid_der
 original_get_vin_info = backend.bitcoind.get_vin_info
+original_compose_list_unspent = composecache.list_unspent
 
 
 @pytest.fixture(scope="session")
@@ -235,6 +241,7 @@ def bitcoind_mock(monkeymodule):
     backend_module = "counterpartycore.lib.backend"
     monkeymodule.setattr(f"{bitcoind_module}.list_unspent", list_unspent)
     monkeymodule.setattr(f"{bitcoind_module}.satoshis_per_vbyte", satoshis_per_vbyte)
+    monkeymodule.setattr("counterpartycore.lib.api.composecache.list_unspent", compose_list_unspent)
     monkeymodule.setattr(f"{bitcoind_module}.get_vin_info", get_vin_info)
     monkeymodule.setattr(f"{bitcoind_module}.convert_to_psbt", lambda x: x)
     monkeymodule.setattr(
@@ -0,0 +1,51 @@
+import os
+import tempfile
+
+from counterpartycore.lib.api.apicache import APIResponseCache
+
+
+def test_api_response_cache():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        APIResponseCache.reset_instance()
+        cache = APIResponseCache(os.path.join(tmp_dir, "apicache.db"), max_size=1000)
+
+        assert cache.get("http://localhost/v2/assets", 100) is None
+        cache.set("http://localhost/v2/assets", 100, b'{"result": []}')
+        cache.set("http://localhost/v2/blocks/10", None, b'{"result": {}}')
+        assert cache.get("http://localhost/v2/assets", 100) == b'{"result": []}'
+        assert cache.get("http://localhost/v2/blocks/10", None) == b'{"result": {}}'
+
+        # another worker sees the new block
+        APIResponseCache.reset_instance()
+        other_worker_cache = APIResponseCache(os.path.join(tmp_dir, "apicache.db"), max_size=1000)
+        assert other_worker_cache.get("http://localhost/v2/assets", 101) is None
+        # the whole cache is invalidated except blocks
+        assert cache.get("http://localhost/v2/assets", 100) is None
+        assert cache.get("http://localhost/v2/blocks/10", None) == b'{"result": {}}'
+
+        # oldest entries are evicted first
+        for i in range(10):
+            other_worker_cache.set(f"http://localhost/v2/assets/{i}", 101, b"x" * 200)
+        assert other_worker_cache.get("http://localhost/v2/blocks/10", None) is None
+        assert other_worker_cache.get("http://localhost/v2/assets/0", 101) is None
+        assert other_worker_cache.get("http://localhost/v2/assets/9", 101) == b"x" * 200
+        db = other_worker_cache.connection()
+        size = other_worker_cache.compute_size(db)
+        assert size <= 1000
+        assert other_worker_cache.get_size(db) == size
+        # replacing an entry doesn't count its old size
+        other_worker_cache.set("http://localhost/v2/assets/9", 101, b"x" * 100)
+        assert other_worker_cache.get_size(db) == other_worker_cache.compute_size(db) == size - 100
+
+        # the next block keeps only the entries without block index
+        other_worker_cache.set("http://localhost/v2/blocks/11", None, b"x" * 50)
+        assert other_worker_cache.get("http://localhost/v2/assets/9", 102) is None
+        assert other_worker_cache.get_size(db) == 50
+
+        other_worker_cache.clear()
+        assert other_worker_cache.get("http://localhost/v2/assets/9", 101) is None
+        assert other_worker_cache.get_size(db) == 0
+
+        cache.close()
+        other_worker_cache.close()
+        APIResponseCache.reset_instance()
@@ -0,0 +1,87 @@
+import logging
+import os
+import tempfile
+
+import apsw
+from counterpartycore.lib import config
+from counterpartycore.lib.api import apimetrics
+from counterpartycore.lib.api.apimetrics import APIMetrics
+from counterpartycore.lib.utils import database
+
+
+def test_api_metrics():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        APIMetrics.reset_instance()
+        metrics = APIMetrics(os.path.join(tmp_dir, "apimetrics.db"))
+        for _i in range(90):
+            metrics.observe("/v2/blocks", 0.003, 100, 200)
+        for _i in range(10):
+            metrics.observe("/v2/blocks", 0.2, 1000, 200)
+        metrics.observe("/v2/assets", 20, 10, 500)
+        metrics.flush()
+
+        # another worker adds its own requests
+        APIMetrics.reset_instance()
+        other_worker_metrics = APIMetrics(os.path.join(tmp_dir, "apimetrics.db"))
+        other_worker_metrics.observe("/v2/assets", 0.03, 10, 200)
+        other_worker_metrics.increment("slow_queries")
+
+        stats = apimetrics.get_api_stats()
+        assert stats["counters"] == {"slow_queries": 1}
+        assert stats["routes"]["/v2/blocks"]["count"] == 100
+        assert stats["routes"]["/v2/blocks"]["bytes"] == 19000
+        assert stats["routes"]["/v2/blocks"]["errors"] == 0
+        assert stats["routes"]["/v2/blocks"]["p50"] < 0.005
+        assert 0.1 < stats["routes"]["/v2/blocks"]["p95"] <= 0.25
+        assert stats["routes"]["/v2/assets"]["count"] == 2
+        assert stats["routes"]["/v2/assets"]["errors"] == 1
+        assert stats["routes"]["/v2/assets"]["p99"] == 10
+
+        text = apimetrics.prometheus_metrics()
+        assert (
+            'counterparty_api_request_duration_seconds_bucket{route="/v2/blocks",le="0.005"} 90'
+            in text
+        )
+        assert (
+            'counterparty_api_request_duration_seconds_bucket{route="/v2/blocks",le="+Inf"} 100'
+            in text
+        )
+        assert 'counterparty_api_request_duration_seconds_count{route="/v2/assets"} 2' in text
+        assert 'counterparty_api_response_bytes_total{route="/v2/blocks"} 19000' in text
+        assert "counterparty_api_slow_queries_total 1" in text
+
+        metrics.close()
+        other_worker_metrics.close()
+        APIMetrics.reset_instance()
+
+
+def test_quantile():
+    assert apimetrics.quantile([0] * (len(apimetrics.LATENCY_BUCKETS) + 1), 0.5) is None
+    buckets = [0] * (len(apimetrics.LATENCY_BUCKETS) + 1)
+    buckets[1] = 10
+    assert apimetrics.quantile(buckets, 0.5) == 0.0075
+    assert apimetrics.quantile(buckets, 1) == 0.01
+
+
+def test_check_slow_query(monkeypatch, caplog):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        APIMetrics.reset_instance()
+        APIMetrics(os.path.join(tmp_dir, "apimetrics.db"))
+        db = apsw.Connection(":memory:")
+        db.exec_trace = database.exectracer
+        db.execute("CREATE TABLE balances (address TEXT, quantity INTEGER)")
+        query = "SELECT * FROM balances WHERE address = ?"
+
+        monkeypatch.setattr(config, "API_SLOW_QUERY_THRESHOLD", 1000)
+        with caplog.at_level(logging.WARNING, logger=config.LOGGER_NAME):
+            apimetrics.check_slow_query(db, query, ["addr"], 0.5)
+            assert "Slow query" not in caplog.text
+            apimetrics.check_slow_query(db, query, ["addr"], 1.5)
+        assert (
+            "Slow query (1500ms): SELECT * FROM balances WHERE address = ? ['addr']" in caplog.text
+        )
+        assert "SCAN balances" in caplog.text
+        assert apimetrics.get_api_stats()["counters"] == {"slow_queries": 1}
+
+        APIMetrics().close()
+        APIMetrics.reset_instance()
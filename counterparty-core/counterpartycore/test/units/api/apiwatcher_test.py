@@ -0,0 +1,38 @@
+from counterpartycore.lib.api import apiwatcher
+from counterpartycore.lib.messages import send
+from counterpartycore.lib.messages.versions import enhancedsend
+from counterpartycore.lib.utils import database
+
+
+def test_parse_events_batch(ledger_db, state_db, defaults, blockchain_mock, monkeypatch):
+    last_event_parsed = apiwatcher.get_last_parsed_event_index(state_db)
+
+    for _i in range(3):
+        tx = blockchain_mock.dummy_tx(ledger_db, defaults["addresses"][0])
+        _source, _destination, data = send.compose(
+            ledger_db, defaults["addresses"][0], defaults["addresses"][1], "XCP", 100
+        )
+        enhancedsend.parse(ledger_db, tx, data[1:])
+
+    event_count = apiwatcher.get_event_to_parse_count(ledger_db, state_db)
+    assert event_count > 3
+
+    # small batches to check that the markers are updated once per batch
+    monkeypatch.setattr(apiwatcher, "EVENTS_BATCH_SIZE", 2)
+    batch = apiwatcher.get_next_events_to_parse(ledger_db, state_db, limit=2)
+    assert [event["message_index"] for event in batch] == [
+        last_event_parsed + 1,
+        last_event_parsed + 2,
+    ]
+    apiwatcher.parse_events(state_db, batch)
+    assert apiwatcher.get_last_parsed_event_index(state_db) == last_event_parsed + 2
+    assert apiwatcher.get_last_parsed_event_index(state_db, no_cache=True) == (
+        last_event_parsed + 2
+    )
+
+    apiwatcher.catch_up(ledger_db, state_db)
+    assert apiwatcher.get_event_to_parse_count(ledger_db, state_db) == 0
+    assert apiwatcher.get_last_parsed_event_index(state_db) == (last_event_parsed + event_count)
+    assert int(database.get_config_value(state_db, "LAST_EVENT_PARSED")) == (
+        last_event_parsed + event_count
+    )
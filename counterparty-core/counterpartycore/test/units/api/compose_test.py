@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from counterpartycore.lib import exceptions
 from counterpartycore.lib.api import compose
@@ -372,6 +374,115 @@ def test_compose_mpma_with_memos(ledger_db, defaults):
         pass  # Expected to fail on later validation steps
 
 
+# ============================================================================
+# Tests for compose_batch
+# ============================================================================
+
+
+def test_compose_batch_invalid_transactions(ledger_db, defaults):
+    """Test compose_batch with invalid transaction lists."""
+    address = defaults["addresses"][0]
+    destination = defaults["addresses"][1]
+    for transactions, error in [
+        ("not json", "transactions must be a JSON list"),
+        ("[]", "transactions must be a non-empty JSON list"),
+        ('{"type": "send"}', "transactions must be a non-empty JSON list"),
+        ('[{"type": "detach"}]', "transaction 0: `type` must be one of"),
+        (
+            f'[{{"type": "burn", "quantity": 1}}, {{"type": "send", "destination": "{destination}", "quantity": 1}}]',
+            "transaction 1: missing parameters: asset",
+        ),
+        ('[{"type": "burn", "quantity": 1, "inputs_set": ""}]', "unknown parameters: inputs_set"),
+        ('[{"type": "burn", "quantity": "1BTC"}]', "transaction 0: Invalid integer: quantity"),
+        ('[{"type": "burn", "quantity": true}]', "transaction 0: Invalid integer: quantity"),
+        (
+            f'[{{"type": "send", "destination": "{destination}", "asset": 1, "quantity": 1}}]',
+            "transaction 0: Invalid string: asset",
+        ),
+        ('[{"type": "cancel", "offer_hash": "abc"}]', "transaction 0: Invalid transaction hash"),
+    ]:
+        with pytest.raises(exceptions.ComposeError, match=error):
+            compose.compose_batch(ledger_db, address, transactions)
+
+
+def test_prepare_batch_param():
+    """Test the conversion of the JSON parameters of compose_batch."""
+    assert compose.prepare_batch_param("quantity", int, "1000") == 1000
+    assert compose.prepare_batch_param("quantity", int, 1000) == 1000
+    assert compose.prepare_batch_param("memo_is_hex", bool, "false") is False
+    assert compose.prepare_batch_param("memo_is_hex", bool, "1") is True
+    assert compose.prepare_batch_param("memo_is_hex", bool, False) is False
+    assert compose.prepare_batch_param("fee_fraction", float, "0.5") == 0.5
+    assert compose.prepare_batch_param("fee_fraction", float, 1) == 1.0
+    assert compose.prepare_batch_param("memos", list, "memo") == ["memo"]
+    assert compose.prepare_batch_param("memos", list, ["a", "b"]) == ["a", "b"]
+    for name, annotation, value in [
+        ("quantity", int, 1.5),
+        ("quantity", int, False),
+        ("memo_is_hex", bool, 0),
+        ("fee_fraction", float, "half"),
+        ("asset", str, ["XCP"]),
+        ("memos", list, [1]),
+    ]:
+        with pytest.raises(ValueError, match=f"Invalid .*: {name}"):
+            compose.prepare_batch_param(name, annotation, value)
+
+
+def test_compose_batch_errors(monkeypatch):
+    """Test compose_batch returns the index of the transaction with any compose error."""
+
+    def compose_send(db, address: str, destination: str, quantity: int, **construct_params):
+        if quantity > 1:
+            raise exceptions.AddressError(f"invalid address: {destination}")
+        return {"data": destination}
+
+    monkeypatch.setitem(compose.BATCH_COMPOSERS, "send", compose_send)
+    send = {"type": "send", "destination": "dest", "quantity": "1"}
+    transactions = json.dumps([send, send | {"quantity": 2}])
+    with pytest.raises(exceptions.ComposeError, match="transaction 1: invalid address: dest"):
+        compose.compose_batch(None, "addr", transactions, return_only_data=True)
+    result = compose.compose_batch(None, "addr", json.dumps([send]), return_only_data=True)
+    assert result == {"transactions": [{"data": "dest"}]}
+
+
+def test_compose_batch_return_only_data(ledger_db, defaults):
+    """Test compose_batch returns the data of each transaction."""
+    transactions = [
+        {"type": "send", "destination": defaults["addresses"][1], "asset": "XCP", "quantity": 100},
+        {"type": "send", "destination": defaults["addresses"][2], "asset": "XCP", "quantity": 200},
+    ]
+    result = compose.compose_batch(
+        ledger_db, defaults["addresses"][0], json.dumps(transactions), return_only_data=True
+    )
+    assert len(result["transactions"]) == 2
+    assert result["transactions"][0]["data"] != result["transactions"][1]["data"]
+
+
+def test_compose_batch(apiv2_client, defaults):
+    """Test compose_batch function via API."""
+    address = defaults["addresses"][0]
+    send = {"type": "send", "destination": defaults["addresses"][1], "asset": "XCP", "quantity": 1}
+    response = apiv2_client.post(
+        f"/v2/addresses/{address}/compose/batch",
+        data={"transactions": json.dumps([send]), "disable_utxo_locks": "true"},
+    )
+    assert response.status_code == 200
+    assert len(response.json["result"]["transactions"]) == 1
+    assert "rawtransaction" in response.json["result"]["transactions"][0]
+
+    # the address has only one UTXO and the change of a P2PKH transaction can't be chained
+    response = apiv2_client.post(
+        f"/v2/addresses/{address}/compose/batch",
+        data={
+            "transactions": json.dumps([send, send]),
+            "chain_change": "true",
+            "disable_utxo_locks": "true",
+        },
+    )
+    assert response.status_code == 400
+    assert response.json["error"].startswith("transaction 1: ")
+
+
 # ============================================================================
 # Tests for unpack additional message types
 # ============================================================================
@@ -0,0 +1,78 @@
+import apsw
+from counterpartycore.lib import backend
+from counterpartycore.lib.api import composecache
+from counterpartycore.lib.api.composecache import ComposeCache
+from counterpartycore.lib.ledger.currentstate import CurrentState
+from counterpartycore.lib.utils import database
+
+
+def test_compose_cache(monkeypatch):
+    calls = {"fee": 0, "unspent": 0}
+
+    def satoshis_per_vbyte(confirmation_target=3):
+        calls["fee"] += 1
+        return confirmation_target
+
+    def list_unspent(address, allow_unconfirmed_inputs):
+        calls["unspent"] += 1
+        return [{"txid": f"{calls['unspent']:064x}", "vout": 0, "value": 1000}]
+
+    monkeypatch.setattr(backend.bitcoind, "satoshis_per_vbyte", satoshis_per_vbyte)
+    monkeypatch.setattr(backend, "list_unspent", list_unspent)
+    monkeypatch.setattr(CurrentState(), "current_block_index", lambda: 100)
+    monkeypatch.setattr(CurrentState(), "current_backend_height", lambda: 100)
+
+    db = apsw.Connection(":memory:")
+    db.exec_trace = database.exectracer
+    db.execute("CREATE TABLE mempool_transactions (tx_index INTEGER, tx_hash TEXT, source TEXT)")
+    db.execute("CREATE INDEX mempool_transactions_source_idx ON mempool_transactions (source)")
+    ComposeCache.reset_instance()
+
+    # fee estimates are cached by confirmation target
+    assert composecache.satoshis_per_vbyte() == 3
+    assert composecache.satoshis_per_vbyte() == 3
+    assert composecache.satoshis_per_vbyte(6) == 6
+    assert calls["fee"] == 2
+    assert composecache.satoshis_per_vbyte(6, use_cache=False) == 6
+    assert calls["fee"] == 3
+
+    # unspent lists are cached by address
+    unspent_list = composecache.list_unspent(db, "addr1", False)
+    unspent_list[0]["script_pub_key"] = "0014"
+    assert composecache.list_unspent(db, "addr1", False) == [
+        {"txid": f"{1:064x}", "vout": 0, "value": 1000}
+    ]
+    assert calls["unspent"] == 1
+    composecache.list_unspent(db, "addr1", True)
+    composecache.list_unspent(db, "addr2", False)
+    assert calls["unspent"] == 3
+    composecache.list_unspent(db, "addr1", False, use_cache=False)
+    assert calls["unspent"] == 4
+
+    # a mempool transaction from the address
+    db.execute("INSERT INTO mempool_transactions VALUES (1, 'tx1', 'addr2')")
+    composecache.list_unspent(db, "addr1", False)
+    assert calls["unspent"] == 4
+    composecache.list_unspent(db, "addr2", False)
+    assert calls["unspent"] == 5
+
+    # UTXOs selected by a compose without locks
+    composecache.invalidate_unspent_list("addr1")
+    composecache.list_unspent(db, "addr1", False)
+    composecache.list_unspent(db, "addr1", True)
+    assert calls["unspent"] == 7
+
+    # a new block
+    monkeypatch.setattr(CurrentState(), "current_backend_height", lambda: 101)
+    composecache.satoshis_per_vbyte()
+    composecache.list_unspent(db, "addr1", False)
+    assert calls == {"fee": 4, "unspent": 8}
+
+    # the mempool state is an index lookup
+    plan = db.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(*), MAX(tx_index) FROM mempool_transactions WHERE source = ?",
+        ("addr1",),
+    ).fetchall()
+    assert all("mempool_transactions_source_idx" in row["detail"] for row in plan)
+
+    ComposeCache.reset_instance()
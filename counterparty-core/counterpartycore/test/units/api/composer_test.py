@@ -1,5 +1,6 @@
 import binascii
 import re
+import time
 from io import BytesIO
 
 import bitcoin
@@ -7,10 +8,11 @@ import pytest
 from bitcoinutils.keys import P2pkhAddress, P2wpkhAddress, PrivateKey
 from bitcoinutils.script import Script
 from bitcoinutils.transactions import Transaction, TxInput, TxOutput, TxWitnessInput
-from counterpartycore.lib import config, exceptions
-from counterpartycore.lib.api import composer
+from counterpartycore.lib import backend, config, exceptions
+from counterpartycore.lib.api import composecache, composer
 from counterpartycore.lib.parser import deserialize
 from counterpartycore.test.fixtures.defaults import DEFAULT_PARAMS as DEFAULTS
+from counterpartycore.test.mocks.bitcoind import original_compose_list_unspent
 
 PROVIDED_PUBKEYS = ",".join(
     [DEFAULTS["pubkey"][DEFAULTS["addresses"][0]], DEFAULTS["pubkey"][DEFAULTS["addresses"][1]]]
@@ -2104,7 +2106,88 @@ def test_sigops_count():
     assert composer.get_size_info(tx, selected_utxos, signed=True) == (1205, 452, 241)
 
 
-def construct_tx(db, source, destination, disable_utxo_locks=False, inputs_set=None):
+def test_transaction_size_estimator():
+    pubkey = "02" + "11" * 32
+    script_pub_keys = [
+        "76a914" + "22" * 20 + "88ac",  # P2PKH
+        "a914" + "33" * 20 + "87",  # P2SH
+        "21" + pubkey + "ac",  # P2PK
+        "5121" + pubkey + "21" + pubkey + "52ae",  # P2MS
+        "0014" + "44" * 20,  # P2WPKH
+        "0020" + "55" * 32,  # P2WSH
+        "5120" + "66" * 32,  # P2TR
+    ]
+    outputs = [
+        TxOutput(1000, Script.from_raw(script_pub_key)) for script_pub_key in script_pub_keys
+    ] + [TxOutput(0, Script(["OP_RETURN", "00" * 80]))]
+
+    for first, second in [(0, 0), (0, 4), (1, 6), (3, 5), (4, 4), (2, 3)]:
+        # more than 252 inputs to get a 3-bytes inputs count
+        utxos = [
+            {
+                "txid": f"{index + 1:064x}",
+                "vout": index,
+                "script_pub_key": script_pub_keys[first if index % 2 else second],
+                "is_segwit": composer.is_segwit_output(
+                    script_pub_keys[first if index % 2 else second]
+                ),
+            }
+            for index in range(260)
+        ]
+        estimator = composer.TransactionSizeEstimator(outputs)
+        for input_count in [1, 2, 252, 253, 260]:
+            estimator.add_inputs(utxos[estimator.inputs_count : input_count])
+            selected_utxos = utxos[:input_count]
+            tx = Transaction(
+                composer.utxos_to_txins(selected_utxos),
+                outputs,
+                has_segwit=any(utxo["is_segwit"] for utxo in selected_utxos),
+            )
+            assert estimator.get_size_info() == composer.get_size_info(tx, selected_utxos)
+
+
+def test_compose_batch_use_utxos():
+    p2wpkh = "0014" + "44" * 20
+    p2pkh = "76a914" + "22" * 20 + "88ac"
+    unspent_list = [
+        {"txid": f"{index + 1:064x}", "vout": 0, "value": 10000 - index, "script_pub_key": p2wpkh}
+        for index in range(3)
+    ] + [{"txid": f"{4:064x}", "vout": 1, "value": 5000, "script_pub_key": p2pkh}]
+    for utxo in unspent_list:
+        utxo["is_segwit"] = composer.is_segwit_output(utxo["script_pub_key"])
+
+    def use_utxos(batch, selected_utxos, change_script_pub_key):
+        outputs = [TxOutput(1000, Script(["OP_RETURN", "00" * 40]))]
+        change_outputs = [TxOutput(4000, Script.from_raw(change_script_pub_key))]
+        tx = Transaction(composer.utxos_to_txins(selected_utxos), outputs + change_outputs)
+        batch.use_utxos(tx, selected_utxos, change_outputs)
+        return tx
+
+    batch = composer.ComposeBatch(list(unspent_list))
+    use_utxos(batch, unspent_list[:2], p2wpkh)
+    assert batch.unspent_list == unspent_list[2:]
+
+    batch = composer.ComposeBatch(list(unspent_list), chain_change=True)
+    tx = use_utxos(batch, unspent_list[:1], p2wpkh)
+    change_utxo = {
+        "txid": tx.get_txid(),
+        "vout": 1,
+        "value": 4000,
+        "script_pub_key": p2wpkh,
+        "is_segwit": True,
+    }
+    assert batch.unspent_list == unspent_list[1:] + [change_utxo]
+    # the txid of a non-segwit transaction is unknown before signing
+    use_utxos(batch, unspent_list[3:], p2pkh)
+    assert len(batch.unspent_list) == 3
+    # the change is not sent back to the source
+    use_utxos(batch, unspent_list[1:2], "0014" + "55" * 20)
+    assert len(batch.unspent_list) == 2
+
+
+def construct_tx(
+    db, source, destination, disable_utxo_locks=False, inputs_set=None, disable_compose_cache=False
+):
     composer.UTXOLocks().set_limits(60, 2000)
     return composer.compose_transaction(
         db,
@@ -2118,14 +2201,28 @@ def construct_tx(db, source, destination, disable_utxo_locks=False, inputs_set=N
         {
             "disable_utxo_locks": disable_utxo_locks,
             "inputs_set": inputs_set,
+            "disable_compose_cache": disable_compose_cache,
         },
     )
 
 
-def test_utxolocks(ledger_db):
-    """it shouldn't use the same UTXO"""
-    composer.UTXOLocks().init()
+def get_inputs(rawtransaction):
+    tx = bitcoin.core.CTransaction.stream_deserialize(BytesIO(binascii.unhexlify(rawtransaction)))
+    return [(tx_input.prevout.hash, tx_input.prevout.n) for tx_input in tx.vin]
+
+
+@pytest.fixture
+def utxo_locks(tmp_path):
+    """UTXO locks in a new side database, deleted with `tmp_path`"""
+    composer.UTXOLocks.reset_instance()
+    utxo_locks = composer.UTXOLocks(str(tmp_path / "utxolocks.db"))
+    yield utxo_locks
+    utxo_locks.close()
+    composer.UTXOLocks.reset_instance()
+
 
+def test_utxolocks(ledger_db, utxo_locks):
+    """it shouldn't use the same UTXO"""
     tx1hex = construct_tx(
         ledger_db, "mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns", "mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns"
     )
@@ -2145,9 +2242,73 @@ def test_utxolocks(ledger_db):
     )
 
 
-def test_utxolocks_custom_input(ledger_db):
-    composer.UTXOLocks().init()
+def mock_cached_unspent_list(monkeypatch, address, utxo_count):
+    """Returns the list of the backend calls, with new UTXOs for each call"""
+    script_pub_key = composer.address_to_script_pub_key(address, network="regtest").to_hex()
+    calls = []
+
+    def list_unspent(source, allow_unconfirmed_inputs=True):
+        calls.append(source)
+        return [
+            {
+                "txid": f"{len(calls):032x}{vout:032x}",
+                "vout": vout,
+                "amount": 10,
+                "value": int(10 * config.UNIT),
+                "script_pub_key": script_pub_key,
+            }
+            for vout in range(utxo_count)
+        ]
+
+    monkeypatch.setattr(composecache, "list_unspent", original_compose_list_unspent)
+    monkeypatch.setattr(backend.bitcoind, "list_unspent", list_unspent)
+    composecache.ComposeCache.reset_instance()
+    return calls
+
+
+def test_compose_cache(ledger_db, monkeypatch, utxo_locks):
+    """it should query the backend once for successive composes"""
+    address = "mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns"
+    calls = mock_cached_unspent_list(monkeypatch, address, 3)
+    tx1 = construct_tx(ledger_db, address, address)
+    tx2 = construct_tx(ledger_db, address, address)
+    assert len(calls) == 1
+    assert get_inputs(tx1["rawtransaction"]) != get_inputs(tx2["rawtransaction"])
+
+    # without locks, the whole unspent list is dropped
+    construct_tx(ledger_db, address, address, disable_utxo_locks=True)
+    assert len(calls) == 1
+    construct_tx(ledger_db, address, address)
+    assert len(calls) == 2
+
+    # the cache can be bypassed
+    construct_tx(ledger_db, address, address, disable_compose_cache=True)
+    construct_tx(ledger_db, address, address, disable_compose_cache=True)
+    assert len(calls) == 4
+
+    composecache.ComposeCache.reset_instance()
+
+
+def test_compose_cache_utxo_locks(ledger_db, monkeypatch, utxo_locks):
+    """it should reuse a cached UTXO once its lock has expired"""
+    address = "mtQheFaSfWELRB2MyMBaiWjdDm6ux9Ezns"
+    calls = mock_cached_unspent_list(monkeypatch, address, 1)
+    params = {"source": address, "destination": address, "asset": "XCP", "quantity": 1}
+
+    utxo_locks.set_limits(0.5, 2000)
+    tx1 = composer.compose_transaction(ledger_db, "send", params, {})
+    with pytest.raises(exceptions.ComposeError):
+        composer.compose_transaction(ledger_db, "send", params, {})
+
+    time.sleep(0.6)
+    tx2 = composer.compose_transaction(ledger_db, "send", params, {})
+    assert get_inputs(tx1["rawtransaction"]) == get_inputs(tx2["rawtransaction"])
+    assert len(calls) == 1
+
+    composecache.ComposeCache.reset_instance()
+
 
+def test_utxolocks_custom_input(ledger_db, utxo_locks):
     """it should not use the same UTXO"""
     inputs_set = [
         {
@@ -864,3 +864,86 @@ def test_get_fairminters_by_asset_with_longname(state_db):
         asset="PARENT.CHILD",
     )
     assert result is not None
+
+
+# =============================================================================
+# Tests for result_count
+# =============================================================================
+
+
+def test_select_rows_result_count_modes(ledger_db):
+    exact = queries.select_rows(ledger_db, "credits", where={"asset": "XCP"}, limit=1)
+    assert exact.result_count > 1
+
+    token = queries.RESULT_COUNT_MODE.set("false")
+    try:
+        result = queries.select_rows(ledger_db, "credits", where={"asset": "XCP"}, limit=1)
+        assert result.result_count is None
+        assert result.result == exact.result
+    finally:
+        queries.RESULT_COUNT_MODE.reset(token)
+
+    token = queries.RESULT_COUNT_MODE.set("estimate")
+    try:
+        result = queries.select_rows(ledger_db, "credits", where={"asset": "XCP"}, limit=1)
+        assert result.result_count == min(exact.result_count, queries.ESTIMATED_COUNT_LIMIT)
+    finally:
+        queries.RESULT_COUNT_MODE.reset(token)
+
+
+def test_select_rows_result_count_cache(ledger_db):
+    queries.ResultCountCache.reset_instance()
+    token = queries.RESULT_COUNT_BLOCK_INDEX.set(100)
+    try:
+        first = queries.select_rows(ledger_db, "credits", where={"asset": "XCP"}, limit=1)
+        assert len(queries.ResultCountCache().counts) == 1
+        cache_key = list(queries.ResultCountCache().counts.keys())[0]
+        queries.ResultCountCache().counts[cache_key] = 12345
+        second = queries.select_rows(ledger_db, "credits", where={"asset": "XCP"}, limit=1)
+        assert second.result_count == 12345
+    finally:
+        queries.RESULT_COUNT_BLOCK_INDEX.reset(token)
+
+    # new block
+    token = queries.RESULT_COUNT_BLOCK_INDEX.set(101)
+    try:
+        third = queries.select_rows(ledger_db, "credits", where={"asset": "XCP"}, limit=1)
+        assert third.result_count == first.result_count
+    finally:
+        queries.RESULT_COUNT_BLOCK_INDEX.reset(token)
+    queries.ResultCountCache.reset_instance()
+
+
+def test_get_counter_values():
+    assert queries.get_counter_values("messages", [{}], "*", "", None) == []
+    assert queries.get_counter_values("messages", [{}, {"event": "CREDIT"}], "*", "", None) == []
+    assert queries.get_counter_values("messages", [{"event": "CREDIT"}, {}], "*", "", None) == []
+    assert queries.get_counter_values(
+        "messages", [{"event": "CREDIT"}, {"event": "DEBIT"}], "*", "", None
+    ) == ["CREDIT", "DEBIT"]
+    assert (
+        queries.get_counter_values(
+            "messages", [{"event": "CREDIT", "block_index": 1}], "*", "", None
+        )
+        is None
+    )
+    assert queries.get_counter_values("credits", [{}], "*", "", None) is None
+    assert (
+        queries.get_counter_values(
+            "transactions_with_status", [{}], "transaction_type, COUNT(*) AS count", "", None
+        )
+        is None
+    )
+
+
+def test_result_count_estimate_from_counters(apiv2_client, state_db):
+    events_count = state_db.execute("SELECT SUM(count) AS count FROM events_count").fetchone()
+    response = apiv2_client.get("/v2/events?limit=1&count=estimate")
+    assert response.json["result_count"] == events_count["count"]
+
+    response = apiv2_client.get("/v2/events?limit=1&count=false")
+    assert response.json["result_count"] is None
+    assert len(response.json["result"]) == 1
+
+    response = apiv2_client.get("/v2/events?limit=1&count=foo")
+    assert response.status_code == 400
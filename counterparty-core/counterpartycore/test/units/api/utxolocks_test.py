@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+
+from counterpartycore.lib.api.composer import UTXOLocks
+
+UTXOS = [{"txid": f"{index:064x}", "vout": index % 3} for index in range(300)]
+WORKERS = 4
+THREADS = 4
+INPUTS_PER_REQUEST = 2
+
+
+def locked_utxos(utxo_locks):
+    cursor = utxo_locks.connection().execute(
+        "SELECT utxo FROM utxo_locks WHERE locked_at >= ?", (time.time() - utxo_locks.max_age,)
+    )
+    return {row[0] for row in cursor}
+
+
+def compose_burst(database_file, results):
+    """Simulates the compose requests of one API worker: each request selects and locks two UTXOs"""
+    UTXOLocks.reset_instance()
+    utxo_locks = UTXOLocks(database_file)
+    utxo_locks.set_limits(60, 10000)
+    claimed = []
+
+    def compose():
+        while True:
+            unspent_list = utxo_locks.filter_unspent_list(UTXOS)
+            if len(unspent_list) < INPUTS_PER_REQUEST:
+                return
+            utxos = [f"{utxo['txid']}:{utxo['vout']}" for utxo in unspent_list]
+            selected = utxos[:INPUTS_PER_REQUEST]
+            if not utxo_locks.lock_utxos(selected):
+                claimed.extend(selected)
+
+    threads = [threading.Thread(target=compose) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results.put(claimed)
+
+
+def test_utxo_locks():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        UTXOLocks.reset_instance()
+        utxo_locks = UTXOLocks(os.path.join(tmp_dir, "utxolocks.db"))
+        utxo_locks.set_limits(0.5, 3)
+
+        utxo_locks.lock("a:0")
+        assert utxo_locks.locked("a:0")
+        assert not utxo_locks.locked("b:0")
+        assert utxo_locks.lock_utxos(["b:0", "a:0", "c:0"]) == {"a:0"}
+        # nothing is locked if one of the UTXOs is already locked
+        assert not utxo_locks.locked("b:0")
+        # except the forced one
+        assert utxo_locks.lock_utxos(["a:0", "b:0"], forced_utxo="a:0") == set()
+        assert locked_utxos(utxo_locks) == {"a:0", "b:0"}
+
+        # only the last `max_size` locks are kept
+        assert utxo_locks.lock_utxos(["c:0", "d:0"]) == set()
+        assert locked_utxos(utxo_locks) == {"b:0", "c:0", "d:0"}
+
+        # another worker sees the same locks
+        UTXOLocks.reset_instance()
+        other_worker_locks = UTXOLocks(os.path.join(tmp_dir, "utxolocks.db"))
+        other_worker_locks.set_limits(0.5, 3)
+        assert other_worker_locks.filter_unspent_list(
+            [{"txid": "c", "vout": 0}, {"txid": "e", "vout": 0}]
+        ) == [{"txid": "e", "vout": 0}]
+
+        # locks expire
+        time.sleep(0.6)
+        assert not other_worker_locks.locked("c:0")
+        assert other_worker_locks.lock_utxos(["c:0"]) == set()
+
+        utxo_locks.close()
+        other_worker_locks.close()
+        UTXOLocks.reset_instance()
+
+
+def test_utxo_locks_lookups():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        UTXOLocks.reset_instance()
+        utxo_locks = UTXOLocks(os.path.join(tmp_dir, "utxolocks.db"))
+        utxo_locks.set_limits(60, 10000)
+        unspent_list = [{"txid": f"{index:064x}", "vout": 0} for index in range(1200)]
+        utxos = [f"{utxo['txid']}:{utxo['vout']}" for utxo in unspent_list]
+        # locked UTXOs in each chunk of the `IN (...)` queries
+        assert utxo_locks.lock_utxos(utxos[::400]) == set()
+        assert utxo_locks.filter_unspent_list(unspent_list) == [
+            utxo for index, utxo in enumerate(unspent_list) if index % 400
+        ]
+        assert utxo_locks.lock_utxos(utxos[1:4] + utxos[800:801]) == {utxos[800]}
+
+        # only the candidate UTXOs are looked up, by primary key
+        for query, bindings in [
+            ("SELECT 1 FROM utxo_locks WHERE utxo = ? AND locked_at >= ?", (utxos[0], 0)),
+            (
+                "SELECT utxo FROM utxo_locks WHERE utxo IN (?, ?) AND locked_at >= ?",
+                (*utxos[:2], 0),
+            ),
+        ]:
+            plan = utxo_locks.connection().execute(f"EXPLAIN QUERY PLAN {query}", bindings)
+            assert all("SCAN" not in row[3] for row in plan)
+
+        utxo_locks.close()
+        UTXOLocks.reset_instance()
+
+
+def test_utxo_locks_concurrent_compose():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_file = os.path.join(tmp_dir, "utxolocks.db")
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [
+            context.Process(target=compose_burst, args=(database_file, results))
+            for _ in range(WORKERS)
+        ]
+        for worker in workers:
+            worker.start()
+        claimed = [utxo for _ in workers for utxo in results.get(timeout=60)]
+        for worker in workers:
+            worker.join()
+
+        # each UTXO has been selected by only one request
+        assert len(claimed) == len(set(claimed))
+        assert len(claimed) == len(UTXOS) // INPUTS_PER_REQUEST * INPUTS_PER_REQUEST
+        UTXOLocks.reset_instance()
@@ -57,7 +57,9 @@ def mock_requests_post(*args, **kwargs):
 
 @pytest.fixture(scope="function")
 def init_mock(monkeypatch):
-    monkeypatch.setattr("requests.post", mock_requests_post)
+    monkeypatch.setattr(
+        "requests.Session.post", lambda self, *args, **kwargs: mock_requests_post(*args, **kwargs)
+    )
     monkeypatch.setattr("counterpartycore.lib.backend.bitcoind.should_retry", lambda: False)
     # config.BACKEND_URL = "http://localhost:14000"
     # config.BACKEND_SSL_NO_VERIFY = True
@@ -164,6 +166,48 @@ def test_rpc_safe(init_mock):
         bitcoind.safe_rpc("return_empty", [])
 
 
+def test_rpc_latency_histograms(init_mock):
+    bitcoind.RPCLatencyHistograms().clear()
+    bitcoind.rpc("return_200", [])
+    bitcoind.safe_rpc("return_200", [])
+    with pytest.raises(exceptions.BitcoindRPCError):
+        bitcoind.safe_rpc("return_code_30", [])
+
+    histograms = bitcoind.get_rpc_latency_histograms()
+    assert sorted(histograms.keys()) == ["return_200", "return_code_30"]
+    assert histograms["return_200"]["count"] == 2
+    assert histograms["return_200"]["buckets"]["+Inf"] == 2
+    assert histograms["return_code_30"]["count"] == 1
+    buckets = list(histograms["return_200"]["buckets"].values())
+    assert buckets == sorted(buckets)
+
+
+def test_getrawtransaction_batch(monkeypatch):
+    def mock_post(self, *args, **kwargs):
+        payload = json.loads(kwargs["data"])
+        # make the first batches slower to check that the order is kept
+        time.sleep(0.01 * (10 - len(payload)))
+        return MockResponse(
+            200,
+            [
+                {"id": call["id"], "result": f"raw_{call['params'][0]}", "error": None}
+                for call in payload
+            ],
+        )
+
+    monkeypatch.setattr("requests.Session.post", mock_post)
+    monkeypatch.setattr("counterpartycore.lib.config.MAX_RPC_BATCH_SIZE", 3)
+
+    tx_hashes = [f"tx{i}" for i in range(10)]
+    assert bitcoind.getrawtransaction_batch(tx_hashes) == [
+        f"raw_{tx_hash}" for tx_hash in tx_hashes
+    ]
+    assert bitcoind.getrawtransaction_batch(tx_hashes, return_dict=True, no_retry=True) == {
+        tx_hash: f"raw_{tx_hash}" for tx_hash in tx_hashes
+    }
+    assert bitcoind.getrawtransaction_batch([]) == {}
+
+
 def test_search_pubkey_in_transactions(monkeypatch):
     helpers.setup_bitcoinutils("mainnet")
 
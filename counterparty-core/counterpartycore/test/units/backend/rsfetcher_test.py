@@ -6,7 +6,9 @@ import pytest
 from counterpartycore.lib import config, exceptions
 from counterpartycore.lib.backend.rsfetcher import (
     PREFETCH_QUEUE_SIZE,
+    TRANSACTION_FIELDS,
     RSFetcher,
+    block_from_view,
     delete_database_directory,
     stop,
 )
@@ -766,3 +768,38 @@ def test_get_block_with_segwit_correction(rsfetcher_instance, mock_protocol):
         assert "tx_hash" in block["transactions"][0]
         assert block["transactions"][0]["tx_hash"] == "abc123"
         mock_protocol.enabled.assert_called_once_with("correct_segwit_txids", block_index=123)
+
+
+def test_block_from_view():
+    """Test that transactions of a block view are converted field by field"""
+    block_view = MagicMock()
+    block_view.header.return_value = {"height": 123, "block_index": 123}
+    block_view.transaction_count.return_value = 2
+    block_view.transaction_field.side_effect = lambda index, key: f"{key}_{index}"
+
+    block = block_from_view(block_view)
+    assert block["block_index"] == 123
+    assert len(block["transactions"]) == 2
+    block_view.transaction_field.assert_not_called()
+
+    tx = block["transactions"][1]
+    assert tx["tx_id"] == "tx_id_1"
+    assert tx["tx_id"] == "tx_id_1"
+    block_view.transaction_field.assert_called_once_with(1, "tx_id")
+
+    # fields set from Python override the Rust ones
+    tx["tx_hash"] = tx["tx_id"]
+    assert tx["tx_hash"] == "tx_id_1"
+    assert "vin" in tx
+    assert "outputs_info" not in tx
+    assert tx.get("outputs_info") is None
+    with pytest.raises(KeyError):
+        tx["unknown"]  # noqa: B018
+    assert block_view.transaction_field.call_count == 1
+
+    tx["outputs_info"] = (0, None)
+    del tx["outputs_info"]
+    assert dict(tx) == {
+        **{key: f"{key}_1" for key in TRANSACTION_FIELDS},
+        "tx_hash": "tx_id_1",
+    }
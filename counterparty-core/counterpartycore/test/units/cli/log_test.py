@@ -1,6 +1,9 @@
 import logging
+import threading
 
+import pytest
 from counterpartycore.lib import config
+from counterpartycore.lib.cli import log
 from counterpartycore.lib.cli.log import CustomFilter
 from counterpartycore.lib.ledger.currentstate import CurrentState
 
@@ -39,3 +42,77 @@ def test_quiet_mode(test_helpers, caplog, monkeypatch):
     assert CustomFilter().filter(caplog.records[-1])
 
     CurrentState().state["CATCHING_UP"] = False
+
+
+def test_log_event_synchronous(test_helpers, caplog, monkeypatch):
+    monkeypatch.setattr(config, "EVENT_QUEUE_SIZE", 0)
+    monkeypatch.setattr(config, "ENABLE_ZMQ_PUBLISHER", False)
+
+    with test_helpers.capture_log(caplog, "Block 1 - AN_EVENT [tx_hash=0123456 quantity=10]"):
+        log.log_event(1, 2, "AN_EVENT", {"tx_hash": "0123456789", "quantity": 10})
+
+
+def test_log_event_skips_formatting(monkeypatch):
+    monkeypatch.setattr(config, "ENABLE_ZMQ_PUBLISHER", False)
+
+    def truncate_fields(bindings):
+        raise AssertionError("bindings formatted for a filtered event")
+
+    monkeypatch.setattr(log, "truncate_fields", truncate_fields)
+    monkeypatch.setattr(log.EventPublisher, "put", truncate_fields)
+
+    level = logger.level
+    logger.setLevel(logging.INFO)
+    try:
+        log.log_event(1, 2, "AN_EVENT", {"tx_hash": "0123456789"})
+    finally:
+        logger.setLevel(level)
+
+
+@pytest.mark.parametrize(
+    "overflow_policy,expected_records",
+    [
+        ("drop-newest", ["record0", "record1", "record2"]),
+        ("drop-oldest", ["record0", "record2", "record3"]),
+    ],
+)
+def test_event_publisher_overflow(monkeypatch, overflow_policy, expected_records):
+    monkeypatch.setattr(config, "EVENT_QUEUE_SIZE", 2)
+    monkeypatch.setattr(config, "EVENT_QUEUE_OVERFLOW", overflow_policy)
+    monkeypatch.setattr(config, "ENABLE_ZMQ_PUBLISHER", False)
+
+    started = threading.Event()
+    release = threading.Event()
+    published = []
+
+    def publish(record, _zmq_event):
+        started.set()
+        release.wait(5)
+        published.append(record)
+
+    monkeypatch.setattr(log.EventPublisher, "publish", staticmethod(publish))
+
+    log.EventPublisher.reset_instance()
+    assert log.get_event_publisher_stats() is None
+    log.stop_event_publisher()
+    assert log.get_event_publisher() is None
+
+    publisher = log.EventPublisher()
+    try:
+        # the first record blocks the publisher thread
+        publisher.put("record0", None)
+        assert started.wait(5)
+        for index in range(1, 4):
+            publisher.put(f"record{index}", None)
+
+        assert publisher.get_stats() == {"depth": 2, "max_depth": 2, "dropped": 1}
+
+        release.set()
+        publisher.queue.join()
+        assert published == expected_records
+        assert log.get_event_publisher_stats()["depth"] == 0
+    finally:
+        release.set()
+        log.stop_event_publisher()
+    assert not publisher.thread.is_alive()
+    assert log.get_event_publisher() is None
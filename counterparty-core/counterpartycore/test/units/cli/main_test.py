@@ -50,6 +50,7 @@ def test_argparser():
         "api_password": None,
         "api_no_allow_cors": False,
         "requests_timeout": 20,
+        "backend_rpc_pool_size": 10,
         "force": False,
         "no_confirm": False,
         "data_dir": "datadir",
@@ -67,6 +68,8 @@ def test_argparser():
         "no_telemetry": True,
         "enable_zmq_publisher": False,
         "zmq_publisher_port": None,
+        "event_queue_size": 10000,
+        "event_queue_overflow": "block",
         "db_connection_pool_size": 10,
         "db_max_connections": 50,
         "json_logs": False,
@@ -85,4 +88,5 @@ def test_argparser():
         "profile": False,
         "memory_profile": False,
         "enable_all_protocol_changes": False,
+        "lazy_blocks": False,
     }
@@ -27,6 +27,7 @@ def test_zmqpublisher_test(test_helpers, caplog):
     # bindings["counter"] += 1
     with test_helpers.capture_log(caplog, f"ANICEEVENT [key=value counter={bindings['counter']}]"):
         log.log_event(block_index, event_index, event_name, bindings)
+        log.EventPublisher().queue.join()
 
     while True:
         _event_name, event = socket.recv_multipart()
@@ -43,6 +44,7 @@ def test_zmqpublisher_test(test_helpers, caplog):
             caplog, f"ANICEEVENT [key=value counter={bindings['counter']}]"
         ):
             log.log_event(block_index, event_index, event_name, bindings)
+            log.EventPublisher().queue.join()
         if bindings["counter"] == 10:
             break
 
@@ -1,7 +1,7 @@
 import pytest
 from counterpartycore.lib import exceptions
 from counterpartycore.lib.api import apiwatcher
-from counterpartycore.lib.ledger import balances
+from counterpartycore.lib.ledger import balances, caches, events
 from counterpartycore.lib.messages import send
 from counterpartycore.lib.messages.versions import enhancedsend
 
@@ -13,6 +13,30 @@ def test_balances_functions(ledger_db, defaults):
     assert balances.get_balance(ledger_db, defaults["addresses"][0], "foobar") == 0
 
 
+def test_balances_cache(ledger_db, defaults):
+    address = defaults["addresses"][0]
+    balances_cache = caches.BalancesCache()
+    balances_cache.enable(ledger_db)
+    try:
+        assert balances.get_balance(ledger_db, address, "XCP") == 91499999693
+        assert balances.get_balance(ledger_db, address, "XCP") == 91499999693
+        assert (balances_cache.hits, balances_cache.misses) == (1, 1)
+
+        events.debit(ledger_db, address, "XCP", 100, 0)
+        events.credit(ledger_db, address, "XCP", 10, 0)
+        assert balances.get_balance(ledger_db, address, "XCP") == 91499999693 - 90
+
+        assert balances.get_balance(ledger_db, address, "foobar") == 0
+        with pytest.raises(exceptions.BalanceError):
+            balances.get_balance(ledger_db, address, "foobar", raise_error_if_no_balance=True)
+    finally:
+        balances_cache.disable()
+
+    # cache and database are consistent
+    assert balances.get_balance(ledger_db, address, "XCP") == 91499999693 - 90
+    assert not balances_cache.enabled(ledger_db)
+
+
 def test_balances_after_send(ledger_db, state_db, defaults, blockchain_mock):
     assert balances.get_balance(ledger_db, defaults["addresses"][0], "XCP") == 91499999693
     assert balances.get_balance(ledger_db, defaults["addresses"][1], "XCP") == 100000000
@@ -161,3 +185,19 @@ def test_get_address_assets(ledger_db, defaults):
 
     check_balances = [b for b in check_balances if b["quantity"] > 0]
     assert balances.get_asset_balances(ledger_db, "XCP") == check_balances
+
+
+def test_get_utxos_with_balances(ledger_db):
+    utxos = [
+        row["utxo"]
+        for row in ledger_db.execute("SELECT DISTINCT utxo FROM balances WHERE utxo IS NOT NULL")
+    ]
+    assert len(utxos) > 0
+    expected = {
+        utxo
+        for utxo in utxos
+        if any(balance["quantity"] > 0 for balance in balances.get_utxo_balances(ledger_db, utxo))
+    }
+    assert balances.get_utxos_with_balances(ledger_db, utxos + [DUMMY_UTXO]) == expected
+    assert balances.get_utxos_with_balances(ledger_db, [DUMMY_UTXO]) == set()
+    assert balances.get_utxos_with_balances(ledger_db, []) == set()
@@ -79,29 +79,18 @@ def test_asset_cache(ledger_db, defaults):
 
 
 def test_orders_cache(ledger_db):
-    orders_count_1 = (
-        caches.OrdersCache(ledger_db)
-        .cache_db.execute("SELECT COUNT(*) AS count FROM orders")
-        .fetchone()["count"]
-    )
+    orders_count_1 = len(caches.OrdersCache(ledger_db).orders)
 
     caches.OrdersCache(ledger_db).insert_order({"block_index": config.MEMPOOL_BLOCK_INDEX})
 
-    orders_count_2 = (
-        caches.OrdersCache(ledger_db)
-        .cache_db.execute("SELECT COUNT(*) AS count FROM orders")
-        .fetchone()["count"]
-    )
+    orders_count_2 = len(caches.OrdersCache(ledger_db).orders)
     assert orders_count_1 == orders_count_2
 
-    open_orders = (
-        caches.OrdersCache(ledger_db)
-        .cache_db.execute("SELECT * FROM orders WHERE status = 'open'")
-        .fetchall()
-    )
-    import json
-
-    print(json.dumps(open_orders, indent=4))
+    open_orders = [
+        order
+        for order in caches.OrdersCache(ledger_db).orders.values()
+        if order["status"] == "open"
+    ]
 
     order_1 = open_orders[0]
 
@@ -111,11 +100,7 @@ def test_orders_cache(ledger_db):
             "status": "expired",
         },
     )
-    orders_count_3 = (
-        caches.OrdersCache(ledger_db)
-        .cache_db.execute("SELECT COUNT(*) AS count FROM orders")
-        .fetchone()["count"]
-    )
+    orders_count_3 = len(caches.OrdersCache(ledger_db).orders)
     assert orders_count_1 == orders_count_3 + 1
 
     matchings = caches.OrdersCache(ledger_db).get_matching_orders(
@@ -127,6 +112,70 @@ def test_orders_cache(ledger_db):
     assert matchings[0]["give_asset"] == order_1["get_asset"]
 
 
+def test_orders_cache_order_book(ledger_db, current_block_index):
+    caches.OrdersCache.reset_instance()
+    orders_cache = caches.OrdersCache(ledger_db)
+
+    def make_order(tx_index, give_quantity, get_quantity):
+        return {
+            "tx_index": tx_index,
+            "tx_hash": f"hash{tx_index}",
+            "block_index": current_block_index,
+            "source": "source",
+            "give_asset": "AAAA",
+            "give_quantity": give_quantity,
+            "give_remaining": give_quantity,
+            "get_asset": "BBBB",
+            "get_quantity": get_quantity,
+            "get_remaining": get_quantity,
+            "expiration": 10,
+            "expire_index": current_block_index + 10,
+            "fee_required": 0,
+            "fee_required_remaining": 0,
+            "fee_provided": 0,
+            "fee_provided_remaining": 0,
+            "status": "open",
+        }
+
+    # same price for 3 and 1, lowest price for 4
+    for tx_index, give_quantity, get_quantity in [(3, 2, 4), (1, 1, 2), (2, 3, 9), (4, 3, 1)]:
+        orders_cache.insert_order(make_order(tx_index, give_quantity, get_quantity))
+
+    def matching_indexes(sort_by_price):
+        return [
+            order["tx_index"]
+            for order in orders_cache.get_matching_orders(
+                "other", give_asset="BBBB", get_asset="AAAA", sort_by_price=sort_by_price
+            )
+        ]
+
+    assert matching_indexes(False) == [1, 2, 3, 4]
+    assert matching_indexes(True) == [4, 1, 3, 2]
+    assert orders_cache.get_matching_orders("other", give_asset="AAAA", get_asset="BBBB") == []
+
+    orders_cache.update_order("hash1", {"status": "filled", "give_remaining": 0})
+    assert orders_cache.orders["hash1"]["give_remaining"] == 0
+    assert matching_indexes(True) == [4, 3, 2]
+    orders_cache.update_order("hash1", {"status": "open", "give_remaining": 1})
+    assert matching_indexes(True) == [4, 1, 3, 2]
+    orders_cache.update_order("hash4", {"status": "expired"})
+    assert "hash4" not in orders_cache.orders
+    assert matching_indexes(True) == [1, 3, 2]
+    # the returned orders are copies
+    orders_cache.get_matching_orders("other", give_asset="BBBB", get_asset="AAAA")[0]["status"] = (
+        "filled"
+    )
+    assert orders_cache.orders["hash1"]["status"] == "open"
+
+    assert orders_cache.get_matched_orders("hash1") == set()
+    orders_cache.insert_order_match({"tx0_hash": "hash1", "tx1_hash": "hash2"})
+    assert orders_cache.get_matched_orders("hash1") == {"hash2"}
+    assert orders_cache.get_matched_orders("hash2") == {"hash1"}
+    assert orders_cache.get_matched_orders("unknown") is None
+
+    caches.OrdersCache.reset_instance()
+
+
 def test_utxo_cache(ledger_db):
     caches.UTXOBalancesCache(ledger_db).add_balance("utxo1")
     assert caches.UTXOBalancesCache().has_balance("utxo1")
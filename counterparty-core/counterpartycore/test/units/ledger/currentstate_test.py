@@ -1,3 +1,5 @@
+import ctypes
+import multiprocessing
 import time
 
 from counterpartycore.lib import config
@@ -54,6 +56,34 @@ def test_currentstate_backend_height_not_set():
     assert currentstate.CurrentState().current_block_count() is None
 
 
+def test_notify_ledger_updated():
+    currentstate.CurrentState().init()
+    # no watcher to notify
+    currentstate.CurrentState().notify_ledger_updated()
+
+    ledger_updated_event = multiprocessing.Event()
+    currentstate.CurrentState().set_ledger_updated_event(ledger_updated_event)
+    assert not ledger_updated_event.is_set()
+    currentstate.CurrentState().notify_ledger_updated()
+    assert ledger_updated_event.is_set()
+    currentstate.CurrentState().init()
+
+
+def test_last_block_parsed():
+    currentstate.CurrentState().init()
+    assert currentstate.CurrentState().last_block_parsed() is None
+    # not shared: nothing to publish
+    currentstate.CurrentState().set_last_block_parsed(100)
+    assert currentstate.CurrentState().last_block_parsed() is None
+
+    shared_last_block_parsed = multiprocessing.Value(ctypes.c_ulong, 0)
+    currentstate.CurrentState().set_last_block_parsed_value(shared_last_block_parsed)
+    currentstate.CurrentState().set_last_block_parsed(100)
+    assert shared_last_block_parsed.value == 100
+    assert currentstate.CurrentState().last_block_parsed() == 100
+    currentstate.CurrentState().init()
+
+
 def test_backend_height(monkeypatch):
     current_backend_height = 1000
     current_block_count = 980
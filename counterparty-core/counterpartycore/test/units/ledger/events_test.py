@@ -52,6 +52,65 @@ def test_insert_record(ledger_db, defaults):
     assert last_record["asset"] == "foobar"
 
 
+def test_insert_statements():
+    query = events.get_insert_statement("foo", ("bar", "baz"))
+    assert query == "INSERT INTO foo (bar, baz) VALUES (?, ?)"
+    assert events.get_insert_statement("foo", ("bar", "baz")) is query
+    assert (
+        events.get_insert_statement("foo", ("bar",), returning=True)
+        == "INSERT INTO foo (bar) VALUES (?) RETURNING *"
+    )
+
+
+def test_insert_update_with_current_record(ledger_db):
+    order = ledger_db.execute("SELECT *, rowid FROM orders ORDER BY rowid DESC LIMIT 1").fetchone()
+
+    events.insert_update(
+        ledger_db, "orders", "tx_hash", order["tx_hash"], {"status": "foo"}, "ORDER_UPDATE"
+    )
+    selected = ledger_db.execute("SELECT * FROM orders ORDER BY rowid DESC LIMIT 1").fetchone()
+
+    events.insert_update(
+        ledger_db,
+        "orders",
+        "tx_hash",
+        order["tx_hash"],
+        {"status": "foo"},
+        "ORDER_UPDATE",
+        current_record=order,
+    )
+    in_hand = ledger_db.execute("SELECT * FROM orders ORDER BY rowid DESC LIMIT 1").fetchone()
+
+    assert selected == in_hand
+    assert in_hand["status"] == "foo"
+
+
+def test_insert_issuance_asset_cache(ledger_db, defaults):
+    caches.AssetCache(ledger_db)
+    events.insert_record(
+        ledger_db,
+        "issuances",
+        {
+            "tx_index": 99999,
+            "tx_hash": "ab" * 32,
+            "block_index": 310000,
+            "asset": "NEWCACHEDASSET",
+            "quantity": 1000,
+            "divisible": 1,
+            "source": defaults["addresses"][0],
+            "issuer": defaults["addresses"][0],
+            "call_price": 0,
+            "status": "valid",
+        },
+        "ASSET_ISSUANCE",
+    )
+    stored = ledger_db.execute("SELECT * FROM issuances WHERE asset = 'NEWCACHEDASSET'").fetchone()
+    assert caches.AssetCache().get_asset("NEWCACHEDASSET") == stored
+    assert stored["divisible"] is True
+    assert stored["mime_type"] == "text/plain"
+    assert caches.AssetCache().assets_total_issued["NEWCACHEDASSET"] == 1000
+
+
 def get_utxo(ledger_db, address):
     return ledger_db.execute(
         "SELECT * FROM balances WHERE utxo_address = ? AND quantity > 0",
@@ -215,3 +274,35 @@ def test_replay_events_error(ledger_db, defaults):
                 ]
             ],
         )
+
+
+def test_journal_head(ledger_db, current_block_index):
+    last_message = events.last_message(ledger_db)
+    assert caches.JournalHead().get(ledger_db) == (
+        last_message["message_index"] + 1,
+        last_message["event_hash"],
+    )
+
+    events.add_to_journal(ledger_db, current_block_index, "insert", "foo", "FOO", {"bar": 1})
+    new_message = events.last_message(ledger_db)
+    assert new_message["message_index"] == last_message["message_index"] + 1
+    assert caches.JournalHead().get(ledger_db) == (
+        new_message["message_index"] + 1,
+        new_message["event_hash"],
+    )
+
+    # journal head is rolled back with the transaction
+    with pytest.raises(exceptions.MempoolError):
+        with events.journal_transaction(ledger_db):
+            events.add_to_journal(
+                ledger_db, current_block_index, "insert", "foo", "FOO", {"bar": 2}
+            )
+            raise exceptions.MempoolError("rollback")
+    assert events.last_message(ledger_db) == new_message
+    assert caches.JournalHead().get(ledger_db) == (
+        new_message["message_index"] + 1,
+        new_message["event_hash"],
+    )
+
+    events.add_to_journal(ledger_db, current_block_index, "insert", "foo", "FOO", {"bar": 3})
+    assert events.last_message(ledger_db)["message_index"] == new_message["message_index"] + 1
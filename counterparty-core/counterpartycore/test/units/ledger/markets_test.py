@@ -8,7 +8,13 @@ def test_markets(ledger_db, defaults):
     original_state = currentstate.CurrentState().ledger_state()
     currentstate.CurrentState().set_ledger_state(ledger_db, "Catching Up")
     assert len(markets.get_matching_orders(ledger_db, "tx_hash", "BTC", "XCP")) == 2
+    # the order books give the same order as the no-cache path
+    cached_orders = markets.get_matching_orders(
+        ledger_db, "tx_hash", "BTC", "XCP", sort_by_price=True
+    )
     currentstate.CurrentState().set_ledger_state(ledger_db, original_state)
+    orders = markets.get_matching_orders(ledger_db, "tx_hash", "BTC", "XCP", sort_by_price=True)
+    assert [order["tx_hash"] for order in orders] == [order["tx_hash"] for order in cached_orders]
 
     open_orders = ledger_db.execute(
         """SELECT rowid FROM (
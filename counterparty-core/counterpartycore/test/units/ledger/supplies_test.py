@@ -203,3 +203,79 @@ def test_supplies_functions(ledger_db, defaults):
         "TESTDISP": 1000,
         "XCP": 603714652382,
     }
+
+
+def test_supplies_by_assets(ledger_db):
+    all_supplies = supplies.supplies(ledger_db)
+    all_held = supplies.held(ledger_db)
+
+    assets = supplies.issued_assets(ledger_db, "", 1000)
+    assert assets == sorted(asset for asset in all_supplies if asset != "XCP")
+    assert supplies.issued_assets(ledger_db, assets[0], 2) == assets[1:3]
+
+    assets.append("XCP")
+    assert supplies.supplies_by_assets(ledger_db, assets) == all_supplies
+    held = supplies.held_by_assets(ledger_db, assets)
+    assert {asset: held.get(asset) or 0 for asset in assets} == {
+        asset: all_held.get(asset) or 0 for asset in assets
+    }
+
+
+def test_supply_and_held_changes(ledger_db):
+    tables = {holding[0] for holding in supplies.HOLDINGS} | {
+        "issuances",
+        "burns",
+        "destructions",
+        "dividends",
+        "sweeps",
+    }
+    # no sql injection here
+    query = " UNION ".join(f"SELECT block_index FROM {table}" for table in sorted(tables))  # noqa: S608 # nosec B608
+    block_indexes = sorted(row["block_index"] for row in ledger_db.execute(query))
+
+    # the changes of all the blocks add up to the totals
+    supply_totals = {}
+    held_totals = {}
+    for block_index in block_indexes:
+        for asset, change in supplies.supply_changes(ledger_db, block_index).items():
+            supply_totals[asset] = supply_totals.get(asset, 0) + (change or 0)
+        for asset, change in supplies.held_changes(ledger_db, block_index).items():
+            held_totals[asset] = held_totals.get(asset, 0) + (change or 0)
+
+    all_supplies = supplies.supplies(ledger_db)
+    assert {asset: supply_totals.get(asset, 0) for asset in all_supplies} == all_supplies
+    all_held = supplies.held(ledger_db)
+    assert {asset: held_totals.get(asset, 0) for asset in all_held} == {
+        asset: total or 0 for asset, total in all_held.items()
+    }
+
+
+def test_xcp_supply_totals(ledger_db):
+    assert supplies.xcp_supply_totals(ledger_db) == (
+        supplies.xcp_created_no_cache(ledger_db),
+        supplies.xcp_destroyed_no_cache(ledger_db),
+    )
+    assert supplies.xcp_supply(ledger_db) == supplies.xcp_created_no_cache(
+        ledger_db
+    ) - supplies.xcp_destroyed_no_cache(ledger_db)
+
+    assert supplies.xcp_supply_change("burns", {"status": "valid", "earned": 10}) == (10, 0)
+    assert supplies.xcp_supply_change("burns", {"status": "invalid", "earned": 10}) == (0, 0)
+    assert supplies.xcp_supply_change(
+        "destructions", {"status": "valid", "asset": "XCP", "quantity": 5}
+    ) == (0, 5)
+    assert supplies.xcp_supply_change(
+        "destructions", {"status": "valid", "asset": "DIVISIBLE", "quantity": 5}
+    ) == (0, 0)
+    assert supplies.xcp_supply_change("sweeps", {"status": "valid", "fee_paid": 7}) == (0, 7)
+
+    created, destroyed = supplies.xcp_supply_totals(ledger_db)
+    last_block_index = ledger_db.execute("SELECT MAX(block_index) AS block_index FROM xcp_supply")
+    block_index = last_block_index.fetchone()["block_index"] + 1
+    supplies.update_xcp_supply(ledger_db, block_index, "burns", {"status": "valid", "earned": 10})
+    supplies.update_xcp_supply(
+        ledger_db, block_index, "dividends", {"status": "valid", "fee_paid": 3}
+    )
+    assert supplies.xcp_supply_totals(ledger_db) == (created + 10, destroyed + 3)
+    ledger_db.execute("DELETE FROM xcp_supply WHERE block_index >= ?", (block_index,))
+    assert supplies.xcp_supply_totals(ledger_db) == (created, destroyed)
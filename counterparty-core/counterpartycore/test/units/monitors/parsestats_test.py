@@ -0,0 +1,69 @@
+import os
+import tempfile
+
+import apsw
+from counterpartycore.lib import config
+from counterpartycore.lib.monitors import parsestats
+from counterpartycore.lib.monitors.parsestats import ParseStats
+
+
+def parse_block(parse_stats, db, block_index):
+    parse_stats.record_stage("list_tx", 0.5)
+    parse_stats.start_block(db, block_index)
+    try:
+        db.execute("INSERT INTO t VALUES (?)", (block_index,))
+        parse_stats.record_transaction("order", 0.1)
+        db.execute("INSERT INTO t VALUES (?)", (block_index,))
+        parse_stats.record_transaction("order", 0.3)
+        parse_stats.record_transaction("dispense", 0.2)
+        parse_stats.record_stage("parse_transactions", 0.6)
+        parse_stats.save_block(db, 3)
+    finally:
+        parse_stats.end_block(db)
+
+
+def test_parse_stats():
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ParseStats.reset_instance()
+        parse_stats = ParseStats(os.path.join(tmp_dir, "parsestats.db"), history_size=3)
+        db = apsw.Connection(":memory:")
+        db.execute("CREATE TABLE t (a INTEGER)")
+
+        for block_index in range(100, 105):
+            parse_block(parse_stats, db, block_index)
+        # query counter is removed after the block
+        assert db.exec_trace is None
+
+        # mempool is ignored
+        parse_stats.start_block(db, config.MEMPOOL_BLOCK_INDEX)
+        parse_stats.record_transaction("order", 1)
+        parse_stats.save_block(db, 1)
+        parse_stats.end_block(db)
+
+        # only the last blocks are kept
+        blocks = parse_stats.get_blocks_stats(10)
+        assert [block["block_index"] for block in blocks] == [102, 103, 104]
+        assert blocks[0] == {
+            "block_index": 102,
+            "duration": blocks[0]["duration"],
+            "transaction_count": 3,
+            "query_count": 2,
+            "rows_written": 2,
+            "stages": {"list_tx": 0.5, "parse_transactions": 0.6},
+            "message_types": {"order": [2, 0.4], "dispense": [1, 0.2]},
+        }
+
+        summary = parsestats.summarize(parse_stats.get_blocks_stats(2), top=1)
+        assert summary["block_count"] == 2
+        assert summary["first_block_index"] == 103
+        assert summary["last_block_index"] == 104
+        assert summary["query_count"] == 4
+        assert summary["rows_written"] == 4
+        assert list(summary["stages"]) == ["parse_transactions", "list_tx"]
+        assert summary["message_types"]["order"]["count"] == 4
+        assert round(summary["message_types"]["order"]["average"], 6) == 0.2
+        assert len(summary["slowest_blocks"]) == 1
+        assert "stages" not in summary["slowest_blocks"][0]
+
+        parse_stats.close()
+        ParseStats.reset_instance()
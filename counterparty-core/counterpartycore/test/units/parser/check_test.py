@@ -679,3 +679,70 @@ def test_asset_conservation_held_is_none(ledger_db, monkeypatch, caplog, test_he
     # Should not raise since 0 == 0 (None treated as 0)
     with test_helpers.capture_log(caplog, "All assets have been conserved."):
         check.asset_conservation(ledger_db)
+
+
+def test_asset_conservation_in_block(ledger_db, monkeypatch):
+    monkeypatch.setattr(
+        ledger.supplies, "supply_changes", lambda db, block_index: {"XCP": 100, "DIVISIBLE": 10}
+    )
+    # BTC is ignored
+    monkeypatch.setattr(
+        ledger.supplies,
+        "held_changes",
+        lambda db, block_index: {"XCP": 100, "DIVISIBLE": 10, "BTC": 5},
+    )
+    check.asset_conservation_in_block(ledger_db, 310500)
+
+    monkeypatch.setattr(
+        ledger.supplies, "held_changes", lambda db, block_index: {"XCP": 100, "DIVISIBLE": 5}
+    )
+    with pytest.raises(exceptions.SanityError, match="DIVISIBLE held in block 310500"):
+        check.asset_conservation_in_block(ledger_db, 310500)
+
+
+def test_asset_conservation_audit(ledger_db, monkeypatch):
+    checked_chunks = []
+
+    def mock_held_by_assets(db, assets):
+        checked_chunks.append(assets)
+        return ledger.supplies.supplies_by_assets(db, assets)
+
+    monkeypatch.setattr(check, "ASSET_CONSERVATION_AUDIT_CHUNK_SIZE", 3)
+    monkeypatch.setattr(ledger.supplies, "held_by_assets", mock_held_by_assets)
+
+    assert check.asset_conservation_audit(ledger_db) is None
+    checked_assets = [asset for chunk in checked_chunks for asset in chunk]
+    assert sorted(checked_assets) == sorted(ledger.supplies.supplies(ledger_db).keys())
+    assert all(len(chunk) <= 4 for chunk in checked_chunks)
+
+    # interrupted audit returns the asset to resume from
+    stop_event = threading.Event()
+    stop_event.set()
+    assert check.asset_conservation_audit(ledger_db, "DIVIDEND", stop_event) == "DIVIDEND"
+
+    checked_chunks.clear()
+    assert check.asset_conservation_audit(ledger_db, "DIVIDEND") is None
+    checked_assets = [asset for chunk in checked_chunks for asset in chunk]
+    assert "XCP" not in checked_assets
+    assert all(asset > "DIVIDEND" for asset in checked_assets)
+
+    monkeypatch.setattr(ledger.supplies, "held_by_assets", lambda db, assets: {})
+    with pytest.raises(exceptions.SanityError, match="XCP held"):
+        check.asset_conservation_audit(ledger_db)
+
+
+def test_xcp_supply(ledger_db):
+    check.xcp_supply(ledger_db)
+
+    block_index = ledger_db.execute(
+        "SELECT MAX(block_index) AS block_index FROM xcp_supply"
+    ).fetchone()["block_index"]
+    ledger_db.execute(
+        "UPDATE xcp_supply SET created = created + 1 WHERE block_index = ?", (block_index,)
+    )
+    with pytest.raises(exceptions.SanityError, match="XCP supply counters"):
+        check.xcp_supply(ledger_db)
+    ledger_db.execute(
+        "UPDATE xcp_supply SET created = created - 1 WHERE block_index = ?", (block_index,)
+    )
+    check.xcp_supply(ledger_db)
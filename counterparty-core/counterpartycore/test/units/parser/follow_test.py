@@ -673,7 +673,7 @@ def test_get_raw_mempool_skips_existing(
     db = mock.MagicMock()
     cursor = mock.MagicMock()
     # First tx exists in mempool, second doesn't
-    cursor.execute.return_value.fetchone.side_effect = [{"tx_hash": "tx1"}, None]
+    cursor.execute.return_value = [{"tx_hash": "tx1"}]
     db.cursor.return_value = cursor
 
     follow.NotSupportedTransactionsCache()
@@ -782,7 +782,6 @@ class TestNotSupportedTransactionsCache:
         cache = follow.NotSupportedTransactionsCache()
 
         assert len(cache.not_suppported_txs) == 0
-        assert len(cache._ordered_txs) == 0
 
     def test_init_with_existing_cache(self, reset_not_supported_cache, temp_cache_dir):
         """Test initialization with existing cache file"""
@@ -805,7 +804,7 @@ class TestNotSupportedTransactionsCache:
 
         assert "tx1" in cache.not_suppported_txs
         assert "tx2" in cache.not_suppported_txs
-        assert cache._ordered_txs == ["tx1", "tx2"]
+        assert list(cache.not_suppported_txs) == ["tx1", "tx2"]
 
     def test_add_duplicate_transactions(self, reset_not_supported_cache, temp_cache_dir):
         """Test adding duplicate transactions"""
@@ -815,7 +814,7 @@ class TestNotSupportedTransactionsCache:
         cache.add(["tx1", "tx2"])
 
         assert len(cache.not_suppported_txs) == 2
-        assert cache._ordered_txs == ["tx1", "tx2"]
+        assert list(cache.not_suppported_txs) == ["tx1", "tx2"]
 
     def test_is_not_supported(self, reset_not_supported_cache, temp_cache_dir):
         """Test is_not_supported check"""
@@ -851,7 +850,6 @@ class TestNotSupportedTransactionsCache:
         cache.clear()
 
         assert len(cache.not_suppported_txs) == 0
-        assert len(cache._ordered_txs) == 0
         assert not os.path.exists(cache_path)
 
     def test_restore(self, reset_not_supported_cache, temp_cache_dir):
@@ -866,6 +864,74 @@ class TestNotSupportedTransactionsCache:
         assert "tx1" in cache.not_suppported_txs
         assert "tx2" in cache.not_suppported_txs
 
+    def test_append_only(self, reset_not_supported_cache, temp_cache_dir, mock_current_state):
+        """Test add appends the new transactions to the cache file"""
+        mock_cs, mock_instance = mock_current_state
+        mock_instance.current_block_index.return_value = 100
+        cache = follow.NotSupportedTransactionsCache()
+        cache.add(["tx1", "tx2"])
+        mock_instance.current_block_index.return_value = 101
+        cache.add(["tx2", "tx3"])
+        cache.close()
+
+        cache_path = os.path.join(temp_cache_dir, "not_supported_tx_cache.regtest.txt")
+        with open(cache_path, "r", encoding="utf-8") as f:
+            assert f.read() == "tx1 100\ntx2 100\ntx3 101\n"
+
+        follow.NotSupportedTransactionsCache.reset_instance()
+        cache = follow.NotSupportedTransactionsCache()
+        assert cache.not_suppported_txs == {"tx1": 100, "tx2": 100, "tx3": 101}
+        assert cache.logged_count == 3
+
+    def test_expire_remove_and_retain(
+        self, reset_not_supported_cache, temp_cache_dir, mock_current_state
+    ):
+        """Test confirmed, expired and evicted transactions are dropped"""
+        mock_cs, mock_instance = mock_current_state
+        mock_instance.current_block_index.return_value = 100
+        cache = follow.NotSupportedTransactionsCache()
+        cache.add(["tx1", "tx2"])
+        mock_instance.current_block_index.return_value = 200
+        cache.add(["tx3", "tx4", "tx5"])
+
+        cache.remove(["tx2", "unknown"])
+        assert list(cache.not_suppported_txs) == ["tx1", "tx3", "tx4", "tx5"]
+        cache.expire(100 + follow.NOT_SUPPORTED_TX_MAX_AGE + 1)
+        assert list(cache.not_suppported_txs) == ["tx3", "tx4", "tx5"]
+        cache.retain({"tx4": {}, "tx6": {}})
+        assert list(cache.not_suppported_txs) == ["tx4"]
+        # dropped entries stay in the file until the next compaction
+        assert cache.logged_count == 5
+
+    def test_compaction(
+        self, reset_not_supported_cache, temp_cache_dir, mock_current_state, monkeypatch
+    ):
+        """Test the cache file is rewritten when dropped entries outnumber live ones"""
+        mock_cs, mock_instance = mock_current_state
+        mock_instance.current_block_index.return_value = 100
+        monkeypatch.setattr(follow, "NOT_SUPPORTED_TX_COMPACTION_MIN", 2)
+        cache = follow.NotSupportedTransactionsCache()
+        cache.add(["tx1", "tx2", "tx3", "tx4"])
+        cache.remove(["tx1", "tx2"])
+        assert cache.logged_count == 4
+        cache.remove(["tx3"])
+        assert cache.logged_count == 1
+
+        cache_path = os.path.join(temp_cache_dir, "not_supported_tx_cache.regtest.txt")
+        with open(cache_path, "r", encoding="utf-8") as f:
+            assert f.read() == "tx4 100\n"
+        cache.add(["tx5"])
+        cache.close()
+        with open(cache_path, "r", encoding="utf-8") as f:
+            assert f.read() == "tx4 100\ntx5 100\n"
+
+    def test_max_count(self, reset_not_supported_cache, temp_cache_dir, monkeypatch):
+        """Test the oldest transactions are dropped above the maximum count"""
+        monkeypatch.setattr(follow, "NOT_SUPPORTED_TX_MAX_COUNT", 2)
+        cache = follow.NotSupportedTransactionsCache()
+        cache.add(["tx1", "tx2", "tx3"])
+        assert list(cache.not_suppported_txs) == ["tx2", "tx3"]
+
 
 # ============================================================================
 # Tests for receive_multipart (using asyncio.run)
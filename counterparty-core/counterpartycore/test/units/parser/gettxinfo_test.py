@@ -1600,6 +1600,62 @@ def test_get_tx_info_taproot(ledger_db, current_block_index, defaults, blockchai
     assert result[6] == ["", "", "1", "0"]  # utxos_info
 
 
+def test_precompute_tx_info(ledger_db, current_block_index, defaults, blockchain_mock):
+    source = defaults["addresses"][0]
+    envelope_script, reveal_tx_pk = composer.generate_envelope_script(b"Hello world", {})
+    outputs = composer.get_reveal_outputs(None, source, envelope_script, [], {})
+    reveal_tx = composer.get_dummy_signed_reveal_tx(outputs, envelope_script, reveal_tx_pk)
+    blockchain_mock.source_by_txid[
+        "ffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+    ] = source
+
+    def decode():
+        return deserialize.deserialize_tx(
+            reveal_tx.serialize(), parse_vouts=True, block_index=current_block_index
+        )
+
+    expected = gettxinfo.get_tx_info(ledger_db, decode(), current_block_index)
+
+    decoded_tx = decode()
+    gettxinfo.precompute_tx_info(decoded_tx, current_block_index)
+    assert decoded_tx["outputs_info"] == (None, 0)
+    assert decoded_tx["precomputed_tx_info"] == (current_block_index, expected[:6])
+    assert gettxinfo.get_tx_info(ledger_db, decoded_tx, current_block_index) == expected
+
+    # precomputed info is ignored for another block
+    decoded_tx["precomputed_tx_info"] = (current_block_index + 1, ("", "", 0, 0, b"", []))
+    assert gettxinfo.get_tx_info(ledger_db, decoded_tx, current_block_index) == expected
+
+    # decode errors are precomputed too
+    decoded_tx = decode()
+    decoded_tx["coinbase"] = True
+    gettxinfo.precompute_tx_info(decoded_tx, current_block_index)
+    assert isinstance(decoded_tx["precomputed_tx_info"][1], exceptions.DecodeError)
+    assert gettxinfo.get_tx_info(ledger_db, decoded_tx, current_block_index)[:6] == (
+        b"",
+        None,
+        None,
+        None,
+        None,
+        None,
+    )
+
+    # potential vanilla dispenses need the ledger
+    decoded_tx = {
+        "tx_id": "tx_id",
+        "tx_hash": "tx_hash",
+        "coinbase": False,
+        "vout": [],
+        "parsed_vouts": ([source], 100, 0, b"", [(source, 100)], False),
+    }
+    assert not gettxinfo.needs_ledger_state(decoded_tx, current_block_index)
+    with ProtocolChangesDisabled(["disable_vanilla_btc_dispense"]):
+        assert gettxinfo.needs_ledger_state(decoded_tx, current_block_index)
+        gettxinfo.precompute_tx_info(decoded_tx, current_block_index)
+    assert decoded_tx["outputs_info"] == (None, None)
+    assert "precomputed_tx_info" not in decoded_tx
+
+
 def test_get_tx_info_new_p2sh_disabled(ledger_db, current_block_index, defaults, monkeypatch):
     source = defaults["addresses"][1]
     destinations = [defaults["addresses"][0]]
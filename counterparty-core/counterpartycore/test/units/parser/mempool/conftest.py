@@ -24,10 +24,16 @@ def mock_current_state():
 
 @pytest.fixture
 def mock_deserialize():
-    """Fixture pour mocker deserialize.deserialize_tx"""
-    with mock.patch(
-        "counterpartycore.lib.parser.deserialize.deserialize_tx"
-    ) as mock_deserialize_tx:
+    """Fixture pour mocker deserialize.deserialize_tx et deserialize.deserialize_txs"""
+    with (
+        mock.patch("counterpartycore.lib.parser.deserialize.deserialize_tx") as mock_deserialize_tx,
+        mock.patch(
+            "counterpartycore.lib.parser.deserialize.deserialize_txs",
+            side_effect=lambda raw_txs, **kwargs: [
+                mock_deserialize_tx(raw_tx, **kwargs) for raw_tx in raw_txs
+            ],
+        ),
+    ):
         yield mock_deserialize_tx
 
 
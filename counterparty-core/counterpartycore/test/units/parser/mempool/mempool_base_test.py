@@ -24,10 +24,16 @@ def mock_current_state():
 
 @pytest.fixture
 def mock_deserialize():
-    """Fixture pour mocker deserialize.deserialize_tx"""
-    with mock.patch(
-        "counterpartycore.lib.parser.deserialize.deserialize_tx"
-    ) as mock_deserialize_tx:
+    """Fixture pour mocker deserialize.deserialize_tx et deserialize.deserialize_txs"""
+    with (
+        mock.patch("counterpartycore.lib.parser.deserialize.deserialize_tx") as mock_deserialize_tx,
+        mock.patch(
+            "counterpartycore.lib.parser.deserialize.deserialize_txs",
+            side_effect=lambda raw_txs, **kwargs: [
+                mock_deserialize_tx(raw_tx, **kwargs) for raw_tx in raw_txs
+            ],
+        ),
+    ):
         yield mock_deserialize_tx
 
 
@@ -141,6 +147,7 @@ def test_parse_mempool_transactions_existing_tx(
 ):
     """Test parse_mempool_transactions avec une transaction déjà existante"""
     db, cursor = mock_db
+    mock_list_tx, _mock_parse_block = mock_blocks
 
     # Configuration du curseur
     cursor.fetchone.side_effect = [
@@ -152,8 +159,8 @@ def test_parse_mempool_transactions_existing_tx(
     # Configuration de deserialize
     mock_deserialize.return_value = {"tx_hash": "tx1", "source": "addr1", "destination": "addr2"}
 
-    # Configuration de get_transaction pour retourner une transaction existante
-    mock_ledger_blocks.return_value = {"tx_hash": "tx1"}
+    # Configuration de la recherche groupée pour retourner une transaction existante
+    cursor.execute.return_value = [{"tx_hash": "tx1"}]
 
     # Exécution de la fonction avec une transaction
     raw_tx_list = ["raw_tx_data"]
@@ -161,7 +168,8 @@ def test_parse_mempool_transactions_existing_tx(
 
     # Vérifications
     assert mock_deserialize.called
-    assert mock_ledger_blocks.called
+    cursor.execute.assert_any_call("SELECT tx_hash FROM transactions WHERE tx_hash IN (?)", ["tx1"])
+    mock_list_tx.assert_not_called()
 
     # Vérifier le résultat - si la transaction existe déjà, elle est considérée comme non supportée
     assert result == ["tx1"]
@@ -272,3 +280,21 @@ def test_clean_mempool_with_validated_transactions(
     # Vérifier que clean_transaction_from_mempool a été appelé pour tx1
     cursor.execute.assert_any_call("DELETE FROM mempool WHERE tx_hash = ?", ("tx1",))
     cursor.execute.assert_any_call("DELETE FROM mempool_transactions WHERE tx_hash = ?", ("tx1",))
+
+
+def test_get_known_tx_hashes(ledger_db, monkeypatch):
+    """Test get_known_tx_hashes avec plusieurs requêtes groupées"""
+    monkeypatch.setattr(mempool_module, "KNOWN_TX_HASHES_CHUNK_SIZE", 2)
+    tx_hashes = [
+        tx["tx_hash"]
+        for tx in ledger_db.execute(
+            "SELECT tx_hash FROM transactions ORDER BY tx_index LIMIT 3"
+        ).fetchall()
+    ]
+    unknown_tx_hash = "00" * 32
+
+    assert mempool_module.get_known_tx_hashes(ledger_db, []) == set()
+    assert mempool_module.get_known_tx_hashes(ledger_db, tx_hashes + [unknown_tx_hash]) == set(
+        tx_hashes
+    )
+    assert mempool_module.get_known_tx_hashes(ledger_db, tx_hashes, tables=("mempool",)) == set()
@@ -73,9 +73,6 @@ class TestMempoolIntegration:
             {"tx_hash": "tx2", "source": "addr3", "destination": "addr4"},
         ]
 
-        # Configuration de get_transaction pour parse_mempool_transactions (tx n'existent pas)
-        mock_ledger_blocks.side_effect = [None, None]
-
         # Configuration de list_tx
         mock_list_tx.side_effect = [11, 12]
 
@@ -120,6 +117,7 @@ class TestMempoolIntegration:
     ):
         """Test parse_mempool_transactions avec une transaction déjà dans la mempool"""
         db, cursor = mock_db
+        mock_list_tx, _mock_parse_block = mock_blocks
 
         # Configuration du curseur
         cursor.fetchone.side_effect = [
@@ -132,7 +130,7 @@ class TestMempoolIntegration:
         cursor.fetchall.side_effect = [[], []]
 
         # Configuration pour vérifier si une transaction existe déjà dans la mempool
-        cursor.execute.return_value.fetchone.return_value = {"tx_hash": "tx1"}
+        cursor.execute.return_value = [{"tx_hash": "tx1"}]
 
         # Configuration de deserialize
         mock_deserialize.return_value = {
@@ -141,17 +139,14 @@ class TestMempoolIntegration:
             "destination": "addr2",
         }
 
-        # Configuration de get_transaction pour retourner None (tx n'existe pas dans la base principale)
-        mock_ledger_blocks.return_value = None
-
         # Exécution de la fonction avec une transaction
         raw_tx_list = ["raw_tx_data"]
         result = mempool_module.parse_mempool_transactions(db, raw_tx_list)
 
         # Vérifications
         assert mock_deserialize.called
-        assert mock_ledger_blocks.called
-        assert cursor.execute.called
+        cursor.execute.assert_any_call("SELECT tx_hash FROM mempool WHERE tx_hash IN (?)", ["tx1"])
+        mock_list_tx.assert_not_called()
 
         # Vérifier le résultat
         assert result == ["tx1"]
@@ -256,3 +256,37 @@ def test_after_block_or_test_network():
         config.TESTNET3 = original_testnet3
         config.TESTNET4 = original_testnet4
         config.SIGNET = original_signet
+
+
+def test_compile_protocol_changes():
+    activation_block_indexes, values_by_block_index = protocol.compile_protocol_changes(
+        {
+            "change_a": {
+                "block_index": 100,
+                "testnet3_block_index": 10,
+                "testnet4_block_index": 1,
+                "signet_block_index": 2,
+            },
+            "change_b": {
+                "mainnet": {"500": {"value": 2}, "1": {"value": 1}},
+                "testnet3": {"1": {"value": 3}},
+                "testnet4": {"1": {"value": 4}},
+                "signet": {"1": {"value": 5}},
+            },
+        }
+    )
+    assert activation_block_indexes["mainnet"] == {"change_a": 100}
+    assert activation_block_indexes["testnet3"] == {"change_a": 10}
+    assert values_by_block_index["mainnet"] == {"change_b": ([1, 500], [1, 2])}
+    assert values_by_block_index["signet"] == {"change_b": ([1], [5])}
+
+
+def test_regtest_disabled_changes():
+    assert protocol.enabled("numeric_asset_names")
+    with ProtocolChangesDisabled(["numeric_asset_names"]):
+        assert not protocol.enabled("numeric_asset_names")
+        assert protocol.enabled("short_tx_type_id")
+    with ProtocolChangesDisabled(["short_tx_type_id"]):
+        assert protocol.enabled("numeric_asset_names")
+        assert not protocol.enabled("short_tx_type_id")
+    assert protocol.enabled("short_tx_type_id")
@@ -628,6 +628,73 @@ def test_rowtracer_null_values():
     assert result == {"value": None}
 
 
+def test_rowtracer_duplicate_columns():
+    """Tests the rowtracer function keeps the last value of duplicate columns."""
+    mock_cursor = MagicMock()
+    mock_cursor.getdescription.return_value = [("value", "BOOL"), ("value", "INTEGER")]
+
+    assert rowtracer(mock_cursor, (1, 5)) == {"value": 5}
+
+
+def test_row_tracers(temp_db_file):
+    """Tests the cached dict row tracer and the tuple cursors."""
+    db = get_db_connection(temp_db_file, read_only=False)
+    db.execute("CREATE TABLE bools (id INTEGER, flag BOOL)")
+    db.execute("INSERT INTO bools VALUES (1, 1), (2, 0), (3, NULL)")
+
+    assert db.execute("SELECT * FROM bools").fetchall() == [
+        {"id": 1, "flag": True},
+        {"id": 2, "flag": False},
+        {"id": 3, "flag": False},
+    ]
+    assert db.execute("SELECT id FROM bools; SELECT flag FROM bools").fetchall() == [
+        {"id": 1},
+        {"id": 2},
+        {"id": 3},
+        {"flag": True},
+        {"flag": False},
+        {"flag": False},
+    ]
+
+    cursor = database.tuple_cursor(db)
+    assert cursor.execute("SELECT * FROM bools").fetchall() == [(1, 1), (2, 0), (3, None)]
+
+    cursor = database.tuple_cursor(db, named=True)
+    rows = cursor.execute("SELECT *, MAX(id) FROM bools").fetchall()
+    assert rows[0].id == 3
+    assert rows[0][2] == 3
+
+    # connection cursors still return dicts
+    assert db.execute("SELECT id FROM bools LIMIT 1").fetchone() == {"id": 1}
+
+    # savepoints are traced with the connection
+    with db:
+        db.execute("INSERT INTO bools VALUES (4, 1)")
+    assert db.execute("SELECT * FROM bools WHERE id = 4").fetchone() == {"id": 4, "flag": True}
+    db.close()
+
+
+def test_side_database(temp_db_file, monkeypatch):
+    """Tests the connections to a side database."""
+    side_db = database.SideDatabase(temp_db_file, ("CREATE TABLE IF NOT EXISTS t (a INTEGER)",))
+    assert not side_db.is_connected()
+    db = side_db.connection()
+    assert side_db.is_connected()
+    assert side_db.connection() is db
+    assert db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    db.execute("INSERT INTO t VALUES (1)")
+
+    # a forked process opens its own connection
+    monkeypatch.setattr(os, "getpid", lambda: side_db.pid + 1)
+    assert not side_db.is_connected()
+    assert side_db.connection() is not db
+    assert side_db.connection().execute("SELECT a FROM t").fetchall() == [(1,)]
+
+    side_db.close()
+    assert not side_db.is_connected()
+    db.close()
+
+
 # =============================================================================
 # Tests for get_file_openers function (lines 32-46)
 # =============================================================================
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+
+# Compare the throughput of the batch compose endpoint with sequential calls to
+# the send compose endpoint, on a running node. The sequential calls exclude the
+# UTXOs spent by the previous transactions, like a payout service would do. The
+# address must have enough UTXOs (or a segwit change, with `--chain-change`) to
+# fund all the transactions.
+#
+# Usage: python3 benchmarkbatchcompose.py <api_url> <address> <destination> [<count>] [--chain-change]
+# e.g. python3 benchmarkbatchcompose.py http://localhost:24000 bcrt1q... bcrt1q... 100
+
+import json
+import sys
+import time
+
+import requests
+from bitcoinutils.transactions import Transaction
+
+ASSET = "XCP"
+QUANTITY = 1000
+# the UTXOs locked by the sequential calls must be released before the batch
+UTXO_LOCKS_MAX_AGE = 3
+
+
+def get_inputs(rawtransaction):
+    tx = Transaction.from_raw(rawtransaction)
+    return [f"{tx_input.txid}:{tx_input.txout_index}" for tx_input in tx.inputs]
+
+
+def compose(api_url, path, params):
+    response = requests.post(f"{api_url}/v2/addresses/{path}", data=params, timeout=600)
+    result = response.json()
+    if "error" in result:
+        raise Exception(result["error"])  # noqa: TRY002
+    return result["result"]
+
+
+def sequential_compose(api_url, address, destination, count):
+    used_utxos = []
+    inputs = []
+    start_time = time.time()
+    for _i in range(count):
+        params = {"destination": destination, "asset": ASSET, "quantity": QUANTITY}
+        if used_utxos:
+            params["exclude_utxos"] = ",".join(used_utxos)
+        result = compose(api_url, f"{address}/compose/send", params)
+        tx_inputs = get_inputs(result["rawtransaction"])
+        used_utxos += tx_inputs
+        inputs.append(tx_inputs)
+    return time.time() - start_time, inputs
+
+
+def batch_compose(api_url, address, destination, count, chain_change):
+    transactions = [
+        {"type": "send", "destination": destination, "asset": ASSET, "quantity": QUANTITY}
+    ] * count
+    params = {"transactions": json.dumps(transactions), "chain_change": chain_change}
+    start_time = time.time()
+    result = compose(api_url, f"{address}/compose/batch", params)
+    duration = time.time() - start_time
+    inputs = [get_inputs(tx["rawtransaction"]) for tx in result["transactions"]]
+    return duration, inputs
+
+
+def report(name, duration, inputs):
+    all_inputs = [utxo for tx_inputs in inputs for utxo in tx_inputs]
+    assert len(all_inputs) == len(set(all_inputs)), f"{name}: an UTXO is spent twice"
+    print(
+        f"{name:<12} {len(inputs):>5} transactions {duration:>8.2f}s "
+        f"{len(inputs) / duration:>8.1f} tx/s"
+    )
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    api_url, address, destination = args[:3]
+    count = int(args[3]) if len(args) > 3 else 100
+    chain_change = "--chain-change" in sys.argv
+
+    report("sequential", *sequential_compose(api_url, address, destination, count))
+    time.sleep(UTXO_LOCKS_MAX_AGE)
+    report("batch", *batch_compose(api_url, address, destination, count, chain_change))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/python3
+
+# Compare `composer.prepare_inputs_and_change()` with the legacy input selection,
+# which built, dummy-signed and serialized a new transaction for each added input,
+# on synthetic wallets of small UTXOs of each script type. For every wallet both
+# must select the same inputs and return the same change, and the sizes computed
+# by `TransactionSizeEstimator` must match `get_size_info()` on the final transaction.
+#
+# Usage: python3 benchmarkcoinselection.py [<utxo_count> [<input_count>]]
+# where <input_count> is roughly the number of inputs needed to fund the transaction.
+
+import math
+import sys
+import time
+
+from bitcoinutils.script import Script
+from bitcoinutils.transactions import Transaction, TxOutput
+from counterpartycore.lib.api import composer
+
+PUBKEY = "02" + "11" * 32
+SCRIPT_PUB_KEYS = {
+    "P2PKH": "76a914" + "22" * 20 + "88ac",
+    "P2SH": "a914" + "33" * 20 + "87",
+    "P2MS": "5121" + PUBKEY + "21" + PUBKEY + "52ae",
+    "P2WPKH": "0014" + "44" * 20,
+    "P2WSH": "0020" + "55" * 32,
+    "P2TR": "5120" + "66" * 32,
+}
+UTXO_VALUE = 10000
+SAT_PER_VBYTE = 5
+
+
+def legacy_prepare_inputs_and_change(source, outputs, unspent_list, construct_params):
+    _exact_fee, sat_per_vbyte, max_fee = composer.prepare_fee_parameters(construct_params)
+    change_address = composer.get_change_address(None, source, construct_params)
+    outputs_total = sum(output.amount for output in outputs)
+    change_outputs = []
+    input_count = 1
+    while True:
+        if input_count > len(unspent_list):
+            raise composer.exceptions.ComposeError("Insufficient funds")
+        selected_utxos = unspent_list[:input_count]
+        inputs = composer.utxos_to_txins(selected_utxos)
+        btc_in = sum(utxo["value"] for utxo in selected_utxos)
+        change_amount = int(btc_in - outputs_total)
+        if change_amount < 0:
+            input_count += 1
+            continue
+        has_segwit = any(utxo["is_segwit"] for utxo in selected_utxos)
+        tx = Transaction(
+            inputs,
+            outputs + [composer.create_tx_output(change_amount, change_address, unspent_list, {})],
+            has_segwit=has_segwit,
+        )
+        needed_fee = sat_per_vbyte * composer.get_size_info(tx, selected_utxos)[0]
+        if max_fee is not None:
+            needed_fee = min(needed_fee, max_fee)
+        needed_fee = math.ceil(needed_fee)
+        if change_amount >= needed_fee:
+            change_amount = int(change_amount - needed_fee)
+            if change_amount > composer.dust_size(change_address, construct_params):
+                change_outputs.append(
+                    composer.create_tx_output(change_amount, change_address, unspent_list, {})
+                )
+            break
+        input_count += 1
+    return selected_utxos, btc_in, change_outputs
+
+
+def generate_wallet(script_pub_key, utxo_count):
+    return [
+        {
+            "txid": f"{index + 1:064x}",
+            "vout": index % 4,
+            "value": UTXO_VALUE + index,
+            "script_pub_key": script_pub_key,
+            "is_segwit": composer.is_segwit_output(script_pub_key),
+        }
+        for index in reversed(range(utxo_count))
+    ]
+
+
+def benchmark(output_type, utxo_count, input_count):
+    script_pub_key = SCRIPT_PUB_KEYS[output_type]
+    unspent_list = generate_wallet(script_pub_key, utxo_count)
+    outputs = [
+        TxOutput(
+            sum(utxo["value"] for utxo in unspent_list[:input_count]) * 9 // 10,
+            Script.from_raw(SCRIPT_PUB_KEYS["P2WPKH"], has_segwit=True),
+        ),
+        TxOutput(0, Script(["OP_RETURN", "00" * 40])),
+    ]
+    construct_params = {"sat_per_vbyte": SAT_PER_VBYTE, "change_address": script_pub_key}
+
+    start_time = time.time()
+    result = composer.prepare_inputs_and_change(
+        None, script_pub_key, outputs, unspent_list, construct_params
+    )
+    duration = time.time() - start_time
+
+    start_time = time.time()
+    legacy_result = legacy_prepare_inputs_and_change(
+        script_pub_key, outputs, unspent_list, construct_params
+    )
+    legacy_duration = time.time() - start_time
+
+    assert str(result) == str(legacy_result), f"{output_type}: selections differ"
+
+    selected_utxos, _btc_in, change_outputs = result
+    tx = Transaction(
+        composer.utxos_to_txins(selected_utxos),
+        outputs + change_outputs,
+        has_segwit=any(utxo["is_segwit"] for utxo in selected_utxos),
+    )
+    estimator = composer.TransactionSizeEstimator(outputs + change_outputs)
+    estimator.add_inputs(selected_utxos)
+    size_info = composer.get_size_info(tx, selected_utxos)
+    assert estimator.get_size_info() == size_info, f"{output_type}: sizes differ"
+
+    print(
+        f"{output_type:<8} {len(selected_utxos):>6} inputs {size_info[1]:>8} vbytes "
+        f"{legacy_duration:>9.3f}s -> {duration:>7.3f}s"
+    )
+
+
+def main():
+    utxo_count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    input_count = int(sys.argv[2]) if len(sys.argv) > 2 else 1000
+    for output_type in SCRIPT_PUB_KEYS:
+        benchmark(output_type, utxo_count, input_count)
+
+
+if __name__ == "__main__":
+    main()
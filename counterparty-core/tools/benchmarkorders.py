@@ -0,0 +1,187 @@
+#!/usr/bin/python3
+
+# Replay the order history of a Ledger DB (OPEN_ORDER, ORDER_UPDATE, ORDER_FILLED
+# and ORDER_MATCH events) against the legacy SQLite orders cache and against the
+# order books of `OrdersCache`. At each new open order, i.e. each call to
+# `messages.order.match()`, both must return the same counter-orders in the same
+# order and agree on the previous matches: `match()` being otherwise unchanged,
+# the ledger hashes are identical.
+#
+# Usage: python3 benchmarkorders.py <ledger_db> [<first_block_index> [<last_block_index>]]
+
+import fractions
+import hashlib
+import json
+import sys
+import time
+
+import apsw
+from counterpartycore.lib.ledger.caches import ORDER_FIELDS, OrdersCache
+from counterpartycore.lib.ledger.currentstate import CurrentState
+from counterpartycore.lib.utils import helpers
+
+ORDER_EVENTS = ("NEW_BLOCK", "OPEN_ORDER", "ORDER_UPDATE", "ORDER_FILLED", "ORDER_MATCH")
+
+
+def rowtracer(cursor, sql):
+    return {name: sql[index] for index, (name, _type) in enumerate(cursor.getdescription())}
+
+
+def get_memory_db():
+    db = apsw.Connection(":memory:")
+    db.setrowtrace(rowtracer)
+    db.execute(f"CREATE TABLE orders ({', '.join(ORDER_FIELDS)})")  # noqa: S608 # nosec B608
+    db.execute("CREATE TABLE order_matches (id TEXT, tx0_hash TEXT, tx1_hash TEXT)")
+    db.execute("CREATE INDEX order_matches_id_idx ON order_matches (id)")
+    return db
+
+
+class LegacyOrdersCache:
+    """Orders cache before the order books: an in-memory table sorted by SQLite and Python."""
+
+    def __init__(self):
+        self.last_cleaning_block_index = 0
+        self.cache_db = get_memory_db()
+        self.cache_db.execute("CREATE INDEX orders_tx_hash_idx ON orders (tx_hash)")
+        self.cache_db.execute(
+            "CREATE INDEX orders_get_asset_give_asset_idx ON orders (get_asset, give_asset, status)"
+        )
+
+    def clean_filled_orders(self):
+        if CurrentState().current_block_index() - self.last_cleaning_block_index < 50:
+            return
+        self.last_cleaning_block_index = CurrentState().current_block_index()
+        self.cache_db.execute(
+            "DELETE FROM orders WHERE status = 'filled' AND block_index < ?",
+            (CurrentState().current_block_index() - 50,),
+        )
+
+    def insert_order(self, order):
+        placeholders = ", ".join(f":{field}" for field in ORDER_FIELDS)
+        self.cache_db.execute(f"INSERT INTO orders VALUES ({placeholders})", order)  # noqa: S608 # nosec B608
+        self.clean_filled_orders()
+
+    def update_order(self, tx_hash, order):
+        if order["status"] == "expired":
+            self.cache_db.execute("DELETE FROM orders WHERE tx_hash = ?", (tx_hash,))
+            return
+        bindings = dict(order, tx_hash=tx_hash, block_index=CurrentState().current_block_index())
+        set_data = ", ".join(f"{key} = :{key}" for key in bindings if key != "tx_hash")
+        self.cache_db.execute(f"UPDATE orders SET {set_data} WHERE tx_hash = :tx_hash", bindings)  # noqa: S608 # nosec B608
+        self.clean_filled_orders()
+
+    def insert_order_match(self, order_match):
+        self.cache_db.execute(
+            "INSERT INTO order_matches VALUES (:id, :tx0_hash, :tx1_hash)", order_match
+        )
+
+    def get_matching_orders(self, tx_hash, give_asset, get_asset):
+        orders = self.cache_db.execute(
+            """
+            SELECT * FROM orders
+            WHERE (tx_hash != ? AND give_asset = ? AND get_asset = ? AND status = 'open')
+            ORDER BY tx_index, tx_hash
+            """,
+            (tx_hash, get_asset, give_asset),
+        ).fetchall()
+        orders = sorted(orders, key=lambda x: x["tx_index"])
+        return sorted(
+            orders, key=lambda x: fractions.Fraction(x["get_quantity"], x["give_quantity"])
+        )
+
+    def order_match_exists(self, tx0_hash, tx1_hash):
+        query = "SELECT * FROM order_matches WHERE id = ? LIMIT 1"
+        return bool(
+            self.cache_db.execute(query, (helpers.make_id(tx0_hash, tx1_hash),)).fetchall()
+            or self.cache_db.execute(query, (helpers.make_id(tx1_hash, tx0_hash),)).fetchall()
+        )
+
+
+def replay_events(database_file, first_block_index, last_block_index):
+    db = apsw.Connection(database_file, flags=apsw.SQLITE_OPEN_READONLY)
+    db.setrowtrace(rowtracer)
+    events = ", ".join(f"'{event}'" for event in ORDER_EVENTS)
+    cursor = db.execute(
+        f"""
+        SELECT block_index, event, bindings FROM messages
+        WHERE event IN ({events}) AND block_index BETWEEN ? AND ?
+        ORDER BY message_index
+        """,  # noqa: S608 # nosec B608
+        (first_block_index, last_block_index),
+    )
+    for message in cursor:
+        yield message["block_index"], message["event"], json.loads(message["bindings"])
+
+
+def run_benchmark(database_file, first_block_index=0, last_block_index=2**31):
+    OrdersCache.reset_instance()
+    CurrentState().set_current_block_index(first_block_index, skip_lock_time=True)
+    legacy_cache = LegacyOrdersCache()
+    orders_cache = OrdersCache(get_memory_db())
+
+    durations = {"legacy": 0, "order book": 0}
+    digests = {"legacy": hashlib.sha256(), "order book": hashlib.sha256()}
+    match_count = 0
+    candidate_count = 0
+
+    for block_index, event, bindings in replay_events(
+        database_file, first_block_index, last_block_index
+    ):
+        if event == "NEW_BLOCK":
+            CurrentState().set_current_block_index(block_index, skip_lock_time=True)
+        elif event == "OPEN_ORDER":
+            order = {field: bindings[field] for field in ORDER_FIELDS}
+            legacy_cache.insert_order(order)
+            orders_cache.insert_order(order)
+            if order["status"] != "open":
+                continue
+            match_count += 1
+            args = (order["tx_hash"], order["give_asset"], order["get_asset"])
+
+            start_time = time.perf_counter()
+            legacy_candidates = [
+                (
+                    candidate["tx_hash"],
+                    legacy_cache.order_match_exists(candidate["tx_hash"], args[0]),
+                )
+                for candidate in legacy_cache.get_matching_orders(*args)
+            ]
+            durations["legacy"] += time.perf_counter() - start_time
+
+            start_time = time.perf_counter()
+            matched_orders = orders_cache.get_matched_orders(args[0])
+            candidates = [
+                (candidate["tx_hash"], candidate["tx_hash"] in matched_orders)
+                for candidate in orders_cache.get_matching_orders(*args, sort_by_price=True)
+            ]
+            durations["order book"] += time.perf_counter() - start_time
+
+            candidate_count += len(candidates)
+            digests["legacy"].update(repr(legacy_candidates).encode())
+            digests["order book"].update(repr(candidates).encode())
+            if legacy_candidates != candidates:
+                print(f"Divergence at block {block_index} for order {order['tx_hash']}")
+                print(f"  legacy: {legacy_candidates}")
+                print(f"  order book: {candidates}")
+                return False
+        elif event in ("ORDER_UPDATE", "ORDER_FILLED"):
+            # ORDER_FILLED events also contain the rowid of the updated order
+            tx_hash = bindings.pop("tx_hash")
+            bindings.pop("rowid", None)
+            legacy_cache.update_order(tx_hash, bindings)
+            orders_cache.update_order(tx_hash, bindings)
+        elif event == "ORDER_MATCH":
+            legacy_cache.insert_order_match(bindings)
+            orders_cache.insert_order_match(bindings)
+
+    print(f"Replayed {match_count} matches against {candidate_count} counter-orders")
+    for name, duration in durations.items():
+        print(f"  {name}: {duration:.2f}s, digest {digests[name].hexdigest()}")
+    OrdersCache.reset_instance()
+    return digests["legacy"].digest() == digests["order book"].digest()
+
+
+if __name__ == "__main__":
+    block_range = [int(block_index) for block_index in sys.argv[2:4]]
+    if not run_benchmark(sys.argv[1], *block_range):
+        sys.exit(1)
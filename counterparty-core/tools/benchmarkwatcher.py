@@ -0,0 +1,102 @@
+#!/usr/bin/python3
+
+# Measure the latency between a commit in the Ledger DB and its visibility
+# by the API Watcher, with the 100ms polling loop and with the notification
+# sent by the ledger process after each commit.
+
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+import apsw
+
+BLOCKS_COUNT = 50
+BLOCK_INTERVAL = 0.05
+POLLING_INTERVAL = 0.1
+LEDGER_UPDATED_TIMEOUT = 1
+
+
+def get_connection(database_file):
+    db = apsw.Connection(database_file)
+    db.execute("PRAGMA journal_mode = WAL")
+    db.setbusytimeout(5000)
+    return db
+
+
+def ledger_process(database_file, ledger_updated_event, ready_event):
+    db = get_connection(database_file)
+    ready_event.wait()
+    for block_index in range(1, BLOCKS_COUNT + 1):
+        # variable delay to not be in phase with the polling loop
+        time.sleep(BLOCK_INTERVAL + (block_index % 7) / 100)
+        with db:
+            db.execute(
+                "INSERT INTO blocks (block_index, commit_time) VALUES (?, ?)",
+                (block_index, time.time()),
+            )
+        if ledger_updated_event is not None:
+            ledger_updated_event.set()
+    db.close()
+
+
+def watch(database_file, ledger_updated_event):
+    db = get_connection(database_file)
+    latencies = []
+    last_block_index = 0
+    wake_ups = 0
+    while last_block_index < BLOCKS_COUNT:
+        wake_ups += 1
+        new_blocks = db.execute(
+            "SELECT block_index, commit_time FROM blocks WHERE block_index > ?",
+            (last_block_index,),
+        ).fetchall()
+        now = time.time()
+        for block_index, commit_time in new_blocks:
+            latencies.append(now - commit_time)
+            last_block_index = block_index
+        if new_blocks:
+            continue
+        if ledger_updated_event is None:
+            time.sleep(POLLING_INTERVAL)
+        else:
+            ledger_updated_event.wait(timeout=LEDGER_UPDATED_TIMEOUT)
+            ledger_updated_event.clear()
+    db.close()
+    return latencies, wake_ups
+
+
+def run_benchmark(notify):
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_file = os.path.join(tmp_dir, "ledger.db")
+        db = get_connection(database_file)
+        db.execute("CREATE TABLE blocks (block_index INTEGER PRIMARY KEY, commit_time REAL)")
+        db.close()
+
+        ledger_updated_event = multiprocessing.Event() if notify else None
+        ready_event = multiprocessing.Event()
+        process = multiprocessing.Process(
+            target=ledger_process, args=(database_file, ledger_updated_event, ready_event)
+        )
+        process.start()
+        ready_event.set()
+        start_time = time.time()
+        latencies, wake_ups = watch(database_file, ledger_updated_event)
+        duration = time.time() - start_time
+        process.join()
+
+    latencies = sorted(latencies)
+    print(f"{'notification' if notify else 'polling'}:")
+    print(f"  blocks: {len(latencies)} in {duration:.2f}s, wake ups: {wake_ups}")
+    print(f"  mean latency: {statistics.mean(latencies) * 1000:.2f}ms")
+    print(f"  median latency: {statistics.median(latencies) * 1000:.2f}ms")
+    print(f"  p99 latency: {latencies[int(len(latencies) * 0.99)] * 1000:.2f}ms")
+    print(f"  max latency: {latencies[-1] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    modes = sys.argv[1:] or ["polling", "notification"]
+    for mode in modes:
+        run_benchmark(mode == "notification")
@@ -3,7 +3,7 @@ use super::config::Config;
 use pyo3::{
     exceptions::PyException,
     types::{PyAnyMethods, PyBytes, PyDict, PyTuple},
-    IntoPy, PyObject, Python,
+    Bound, IntoPy, PyObject, PyResult, Python,
 };
 
 #[derive(Clone)]
@@ -171,6 +171,40 @@ impl IntoPy<PyObject> for Transaction {
     }
 }
 
+impl Transaction {
+    /// Convert a single field, used by `BlockView` to materialize transactions lazily.
+    #[allow(deprecated)]
+    pub fn field_into_py(&self, name: &str, py: Python<'_>) -> Option<PyObject> {
+        Some(match name {
+            "version" => self.version.into_py(py),
+            "segwit" => self.segwit.into_py(py),
+            "coinbase" => self.coinbase.into_py(py),
+            "lock_time" => self.lock_time.into_py(py),
+            "tx_id" => self.tx_id.clone().into_py(py),
+            "tx_hash" => self.tx_hash.clone().into_py(py),
+            "vtxinwit" => self.vtxinwit.clone().into_py(py),
+            "parsed_vouts" => match &self.parsed_vouts {
+                Ok(parsed_vouts) => parsed_vouts.clone().into_py(py),
+                Err(error) => PyException::new_err(error.clone()).into_py(py),
+            },
+            "vin" => {
+                let vin_list: Vec<PyObject> =
+                    self.vin.iter().map(|vin| vin.clone().into_py(py)).collect();
+                vin_list.into_py(py)
+            }
+            "vout" => {
+                let vout_list: Vec<PyObject> = self
+                    .vout
+                    .iter()
+                    .map(|vout| vout.clone().into_py(py))
+                    .collect();
+                vout_list.into_py(py)
+            }
+            _ => return None,
+        })
+    }
+}
+
 #[derive(Clone)]
 pub struct Block {
     pub height: u32,
@@ -185,23 +219,29 @@ pub struct Block {
     pub transactions: Vec<Transaction>,
 }
 
+impl Block {
+    /// All the block fields except the transactions.
+    pub fn header_into_py<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = PyDict::new(py);
+        dict.set_item("height", self.height)?;
+        dict.set_item("block_index", self.height)?;
+        dict.set_item("version", self.version)?;
+        dict.set_item("hash_prev", &self.hash_prev)?;
+        dict.set_item("hash_merkle_root", &self.hash_merkle_root)?;
+        dict.set_item("block_time", self.block_time)?;
+        dict.set_item("bits", self.bits)?;
+        dict.set_item("nonce", self.nonce)?;
+        dict.set_item("block_hash", &self.block_hash)?;
+        dict.set_item("transaction_count", self.transaction_count)?;
+        Ok(dict)
+    }
+}
+
 #[allow(deprecated)]
 impl IntoPy<PyObject> for Block {
     #[allow(clippy::unwrap_used)]
     fn into_py(self, py: Python<'_>) -> PyObject {
-        let dict = PyDict::new(py);
-        dict.set_item("height", self.height).unwrap();
-        dict.set_item("block_index", self.height).unwrap();
-        dict.set_item("version", self.version).unwrap();
-        dict.set_item("hash_prev", self.hash_prev).unwrap();
-        dict.set_item("hash_merkle_root", self.hash_merkle_root)
-            .unwrap();
-        dict.set_item("block_time", self.block_time).unwrap();
-        dict.set_item("bits", self.bits).unwrap();
-        dict.set_item("nonce", self.nonce).unwrap();
-        dict.set_item("block_hash", self.block_hash).unwrap();
-        dict.set_item("transaction_count", self.transaction_count)
-            .unwrap();
+        let dict = self.header_into_py(py).unwrap();
 
         let transactions_list: Vec<PyObject> = self
             .transactions
@@ -23,6 +23,7 @@ use bitcoin::{blockdata::transaction::Transaction, Block};
 
 #[allow(deprecated)]
 use pyo3::prelude::*;
+use pyo3::types::PyDict;
 use types::pipeline::ChanOut;
 
 use self::{
@@ -84,11 +85,53 @@ impl Indexer {
         Ok(block.map(|b| b.into_py(py)).into_py(py))
     }
 
+    /// Same as `get_block_non_blocking` but the block stays on the Rust side,
+    /// see `BlockView`.
+    pub fn get_block_view_non_blocking(&self, py: Python<'_>) -> PyResult<PyObject> {
+        let block = get_block::new_non_blocking(self.stopper.clone(), self.chan.1.clone())?;
+        match block {
+            Some(block) => Ok(Py::new(py, BlockView { block: *block })?.into_any()),
+            None => Ok(py.None()),
+        }
+    }
+
     pub fn get_version(&self) -> PyResult<String> {
         Ok(env!("CARGO_PKG_VERSION").to_string())
     }
 }
 
+/// Decoded block kept on the Rust side: transaction fields are only converted
+/// to Python objects when they are read.
+#[pyclass]
+pub struct BlockView {
+    block: block::Block,
+}
+
+#[pymethods]
+impl BlockView {
+    pub fn header(&self, py: Python<'_>) -> PyResult<Py<PyDict>> {
+        Ok(self.block.header_into_py(py)?.unbind())
+    }
+
+    pub fn transaction_count(&self) -> usize {
+        self.block.transactions.len()
+    }
+
+    pub fn transaction_field(
+        &self,
+        index: usize,
+        name: &str,
+        py: Python<'_>,
+    ) -> PyResult<PyObject> {
+        let transaction = self.block.transactions.get(index).ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyIndexError, _>("Transaction index out of range")
+        })?;
+        transaction
+            .field_into_py(name, py)
+            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyKeyError, _>(name.to_string()))
+    }
+}
+
 #[pyclass]
 pub struct Deserializer {
     pub config: Config,
@@ -108,22 +151,52 @@ impl Deserializer {
         parse_vouts: bool,
         py: Python<'_>,
     ) -> PyResult<PyObject> {
-        let decoded_tx = hex::decode(tx_hex).map_err(|_| {
-            PyErr::new::<pyo3::exceptions::PyValueError, _>("Failed to decode hex transaction")
-        })?;
-        let transaction: Transaction = deserialize(&decoded_tx).map_err(|_| {
-            PyErr::new::<pyo3::exceptions::PyValueError, _>("Failed to deserialize transaction")
-        })?;
-
-        let deserialized_transaction = self::bitcoin_client::parse_transaction(
-            &transaction,
-            &self.config,
-            height,
-            parse_vouts,
-        );
+        let deserialized_transaction =
+            decode_transaction(tx_hex, &self.config, height, parse_vouts)?;
         return Ok(deserialized_transaction.into_py(py));
     }
 
+    /// Decode a batch of transactions on all the cores, without holding the GIL.
+    pub fn parse_transactions(
+        &self,
+        tx_hexes: Vec<String>,
+        height: u32,
+        parse_vouts: bool,
+        py: Python<'_>,
+    ) -> PyResult<PyObject> {
+        let config = &self.config;
+        let deserialized_transactions = py.allow_threads(|| {
+            let parallelism = std::thread::available_parallelism().map_or(1, |n| n.get());
+            let chunk_size = tx_hexes.len().div_ceil(parallelism).max(1);
+            std::thread::scope(|scope| {
+                let handles: Vec<_> = tx_hexes
+                    .chunks(chunk_size)
+                    .map(|chunk| {
+                        scope.spawn(move || {
+                            chunk
+                                .iter()
+                                .map(|tx_hex| {
+                                    decode_transaction(tx_hex, config, height, parse_vouts)
+                                })
+                                .collect::<Result<Vec<_>, _>>()
+                        })
+                    })
+                    .collect();
+                let mut deserialized_transactions = Vec::with_capacity(tx_hexes.len());
+                for handle in handles {
+                    let chunk = handle.join().map_err(|_| {
+                        PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+                            "Transaction decoding thread panicked",
+                        )
+                    })??;
+                    deserialized_transactions.extend(chunk);
+                }
+                Ok::<_, PyErr>(deserialized_transactions)
+            })
+        })?;
+        return Ok(deserialized_transactions.into_py(py));
+    }
+
     pub fn parse_block(
         &self,
         block_hex: &str,
@@ -142,11 +215,52 @@ impl Deserializer {
             self::bitcoin_client::parse_block(block, &self.config, height, parse_vouts);
         return Ok(deserialized_block?.into_py(py));
     }
+
+    /// Same as `parse_block` but returns a `BlockView`, used to check that the
+    /// lazily converted blocks are identical to the eagerly converted ones.
+    pub fn parse_block_view(
+        &self,
+        block_hex: &str,
+        height: u32,
+        parse_vouts: bool,
+        py: Python<'_>,
+    ) -> PyResult<PyObject> {
+        let decoded_block = hex::decode(block_hex).map_err(|_| {
+            PyErr::new::<pyo3::exceptions::PyValueError, _>("Failed to decode hex block")
+        })?;
+        let block: Block = deserialize(&decoded_block).map_err(|_| {
+            PyErr::new::<pyo3::exceptions::PyValueError, _>("Failed to deserialize transaction")
+        })?;
+
+        let block = self::bitcoin_client::parse_block(block, &self.config, height, parse_vouts)?;
+        Ok(Py::new(py, BlockView { block })?.into_any())
+    }
+}
+
+fn decode_transaction(
+    tx_hex: &str,
+    config: &Config,
+    height: u32,
+    parse_vouts: bool,
+) -> PyResult<block::Transaction> {
+    let decoded_tx = hex::decode(tx_hex).map_err(|_| {
+        PyErr::new::<pyo3::exceptions::PyValueError, _>("Failed to decode hex transaction")
+    })?;
+    let transaction: Transaction = deserialize(&decoded_tx).map_err(|_| {
+        PyErr::new::<pyo3::exceptions::PyValueError, _>("Failed to deserialize transaction")
+    })?;
+    Ok(self::bitcoin_client::parse_transaction(
+        &transaction,
+        config,
+        height,
+        parse_vouts,
+    ))
 }
 
 pub fn register_indexer_module(parent_module: &Bound<'_, PyModule>) -> PyResult<()> {
     let m = PyModule::new(parent_module.py(), "indexer")?;
     m.add_class::<Indexer>()?;
+    m.add_class::<BlockView>()?;
     m.add_class::<Deserializer>()?;
     parent_module.add_submodule(&m)?;
     Ok(())